@@ -0,0 +1,438 @@
+"""
+Bevo vs. OU — Batched Bot Environment
+=====================================
+Simulates N independent Bevos at once for training and evaluating playtesting
+bots, with the same per-frame physics as main.update_game. Each agent plays
+its own copy of the level: its own footballs, its own stomped enemies.
+
+State lives in NumPy arrays, one entry per agent:
+  x, y (rect top-left), vx, vy, on_ground, facing, lives, invuln, score,
+  collected (bitset of footballs picked up), alive (bitset of enemies left), t
+
+Platform collision runs for all agents together. Each agent only meets the
+platforms near it, in the same order as the game's Level.platforms_near.
+Enemies patrol on a fixed clock and ignore the player, so their drawn sprites
+are tabulated once per frame of an episode. Footballs and enemies are tested
+box against box for all agents; the few box hits go to the game's pixel masks.
+
+Gym-style interface (next-step autoreset, like gymnasium vector envs):
+  env = BotEnv(game, n=4096)
+  obs = env.reset()
+  obs, reward, done, info = env.step(actions)   # actions: ints of ACT_* bits
+
+Reward is the score gained that frame. An episode ends when the last life is
+lost, when the flag is reached, or after max_steps frames. A done agent's
+next step resets it and ignores its action.
+
+Usage (desktop only, not part of the web build; needs numpy):
+  python bot_env.py bench --agents 4096 --frames 600
+  python bot_env.py check --frames 2400    # against update_game, 64 agents
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+import warnings
+
+import numpy as np
+
+ACT_LEFT, ACT_RIGHT, ACT_JUMP = 1, 2, 4
+CAUSE_NONE, CAUSE_FALL, CAUSE_ENEMY = 0, 1, 2
+CAUSES = (None, "fall", "enemy")  # info["cause"] code -> Player.last_hurt_cause
+OBS_FIELDS = ("x", "y", "vx", "vy", "on_ground", "lives", "invuln", "footballs")
+DEFAULT_MAX_STEPS = 60 * 60  # one minute of game time, as in fuzz.py
+DEFAULT_AGENTS = {"bench": 4096, "check": 64}  # check replays each agent through update_game
+
+
+def load_game():
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    here = os.path.dirname(os.path.abspath(__file__))
+    os.chdir(here)
+    if here not in sys.path:
+        sys.path.insert(0, here)
+    warnings.simplefilter("ignore")
+    with contextlib.redirect_stdout(io.StringIO()):
+        import main as game
+        game.load_content()
+    return game
+
+
+def _bits(count):
+    return np.left_shift(np.uint64(1), np.arange(count, dtype=np.uint64))
+
+
+_BYTE_BITS = np.array([bin(b).count("1") for b in range(256)], np.int64)
+
+
+def _popcount(sets):
+    """Set bits per uint64 (np.bitwise_count needs NumPy 2)."""
+    return _BYTE_BITS[np.ascontiguousarray(sets).view(np.uint8)].reshape(-1, 8).sum(axis=1)
+
+
+class BotEnv:
+    """N Bevos on one level. See the module docstring for the interface."""
+
+    def __init__(self, game, n, level=1, max_steps=DEFAULT_MAX_STEPS):
+        self.game = game
+        self.n = n
+        self.max_steps = max_steps
+        lvl = game.LEVEL_1 if level == 1 else game.prefetcher.take(level)
+        with contextlib.redirect_stdout(io.StringIO()):
+            game.activate_level(lvl)
+        self.level = lvl
+
+        # Bevo: size, spawn point and the image per facing (None: plain block)
+        probe = game.Player()
+        self.w, self.h = probe.rect.size
+        self.spawn_x, self.spawn_y = probe.rect.topleft
+        self.images = (probe.img_l, probe.img_r)  # indexed by facing
+        self.fall_y = game.VIRTUAL_H + 80
+        flag = game.FLAG_RECT
+        self.flag = (flag.left, flag.top, flag.right, flag.bottom)
+
+        self._build_platforms(lvl.platforms)
+        self._build_footballs(game.FOOTBALLS)
+        self._build_enemy_table(lvl.build_enemies())  # fresh: the table advances them
+
+        self.x = np.zeros(n, np.int64)
+        self.y = np.zeros(n, np.int64)
+        self.vx = np.zeros(n)
+        self.vy = np.zeros(n)
+        self.on_ground = np.zeros(n, bool)
+        self.facing = np.ones(n, bool)  # True: facing right
+        self.lives = np.zeros(n, np.int64)
+        self.invuln = np.zeros(n, np.int64)
+        self.score = np.zeros(n, np.int64)
+        self.collected = np.zeros(n, np.uint64)
+        self.alive = np.zeros(n, np.uint64)
+        self.t = np.zeros(n, np.int64)
+        self.cause = np.zeros(n, np.int8)
+        self.done = np.zeros(n, bool)
+        self._obs = np.zeros((n, len(OBS_FIELDS)), np.float32)
+
+    # --- static tables -------------------------------------------------------
+    def _build_platforms(self, platforms):
+        """Platform edges plus, per (first column, extra columns) of a query,
+        the platforms platforms_near would return, padded with a far-away one."""
+        cell = self.game.GRID_CELL
+        count = len(platforms)
+        edges = np.array([(p.left, p.top, p.right, p.bottom) for p in platforms] + [(-10**9,) * 4], np.int64)
+        self.pl, self.pt, self.pr, self.pb = edges.T
+        grid = {}
+        for i, p in enumerate(platforms):
+            for col in range(p.left // cell, (p.right - 1) // cell + 1):
+                grid.setdefault(col, []).append(i)
+        # A query spans [left - w, right + w]: 3w wide
+        span = 3 * self.w // cell + 1
+        self.col_lo = min(grid) - span
+        cols = max(grid) + 1 - self.col_lo
+        # Row 0 is the empty query, for columns off the level
+        near = [[[] for _ in range(span + 1)] for _ in range(cols + 1)]
+        for c in range(cols):
+            for d in range(span + 1):
+                found = set()
+                for col in range(c + self.col_lo, c + self.col_lo + d + 1):
+                    found.update(grid.get(col, ()))
+                near[c + 1][d] = sorted(found)
+        depth = max(len(ids) for row in near for ids in row)
+        self.near = np.full((cols + 1, span + 1, depth), count, np.int64)
+        for c, row in enumerate(near):
+            for d, ids in enumerate(row):
+                self.near[c, d, :len(ids)] = ids
+        self.cell = cell
+
+    def _build_footballs(self, footballs):
+        if len(footballs) > 64:
+            raise ValueError(f"{len(footballs)} footballs do not fit the 64-bit collected set")
+        game = self.game
+        self.footballs = [r.copy() for r in footballs]
+        self.fb_draw = [game.football_draw_pos(r) for r in footballs]
+        edges = np.array([(r.left, r.top, r.right, r.bottom) for r in footballs], np.int64).reshape(-1, 4)
+        self.fl, self.ft, self.fr, self.fb = edges.T
+        self.fb_bits = _bits(len(footballs))
+
+    def _build_enemy_table(self, enemies):
+        """Each enemy's drawn sprite (image id, box) and rect top, for every
+        frame from 0 (spawn) to max_steps: enemies run on a clock of their own."""
+        if len(enemies) > 64:
+            raise ValueError(f"{len(enemies)} enemies do not fit the 64-bit alive set")
+        frames, count = self.max_steps + 1, len(enemies)
+        self.enemy_images = []
+        ids = {}
+        img = np.zeros((frames, count), np.int64)
+        box = np.zeros((4, frames, count), np.int64)
+        top = np.zeros((frames, count), np.int64)
+        dt = self.game.SIM_DT
+        for t in range(frames):
+            for j, e in enumerate(enemies):
+                if t:
+                    e.update(dt)
+                image, x, y = e.sprite()
+                if image not in ids:
+                    ids[image] = len(self.enemy_images)
+                    self.enemy_images.append(image)
+                w, h = (e.rect.size if image is None else image.get_size())
+                img[t, j] = ids[image]
+                box[:, t, j] = (x, y, x + w, y + h)
+                top[t, j] = e.rect.top
+        self.e_img, self.e_top = img, top
+        self.el, self.et, self.er, self.eb = box
+        self.e_bits = _bits(count)
+
+    # --- gym-style interface -------------------------------------------------
+    def reset(self, mask=None):
+        """Reset every agent (or those in the boolean mask); returns observations."""
+        m = slice(None) if mask is None else mask
+        self.x[m] = self.spawn_x
+        self.y[m] = self.spawn_y
+        self.vx[m] = 0.0
+        self.vy[m] = 0.0
+        self.on_ground[m] = False
+        self.facing[m] = True
+        self.lives[m] = 3
+        self.invuln[m] = 0
+        self.score[m] = 0
+        self.collected[m] = 0
+        self.alive[m] = np.uint64((1 << len(self.e_bits)) - 1) if len(self.e_bits) else 0
+        self.t[m] = 0
+        self.cause[m] = CAUSE_NONE
+        self.done[m] = False
+        return self.observe()
+
+    def observe(self):
+        obs = self._obs
+        obs[:, 0], obs[:, 1], obs[:, 2], obs[:, 3] = self.x, self.y, self.vx, self.vy
+        obs[:, 4], obs[:, 5], obs[:, 6] = self.on_ground, self.lives, self.invuln
+        obs[:, 7] = _popcount(self.collected)
+        return obs
+
+    def step(self, actions):
+        """Advance every agent one frame. actions: int array of ACT_* bits."""
+        actions = np.asarray(actions)
+        restart = self.done.copy()
+        before = self.score.copy()
+
+        self._move(actions)
+        self._pick_up()
+        self.invuln[self.invuln > 0] -= 1
+        self.t += 1
+        self._check_fail()
+        self._check_enemies()
+
+        fl, ft, fr, fb = self.flag
+        flag = (self.x < fr) & (fl < self.x + self.w) & (self.y < fb) & (ft < self.y + self.h)
+        truncated = (self.t >= self.max_steps) & ~flag & (self.lives > 0)
+        self.done = (self.lives <= 0) | flag | truncated
+        reward = self.score - before
+        info = {"flag": flag & ~restart, "truncated": truncated & ~restart, "cause": self.cause.copy()}
+
+        if restart.any():
+            self.reset(restart)
+            reward[restart] = 0
+        return self.observe(), reward, self.done.copy(), info
+
+    # --- one frame, in update_game's order -----------------------------------
+    def _move(self, actions):
+        left = (actions & ACT_LEFT) != 0
+        right = (actions & ACT_RIGHT) != 0
+        jump = (actions & ACT_JUMP) != 0
+        game = self.game
+        # handle_input
+        self.vx = np.where(left, -game.MOVE_SPEED, 0.0) + np.where(right, game.MOVE_SPEED, 0.0)
+        self.facing = np.where(right, True, np.where(left, False, self.facing))
+        jumping = jump & self.on_ground
+        self.vy[jumping] = game.JUMP_VEL
+        self.on_ground[jumping] = False
+        # apply_gravity, then each axis moves and is pushed out of platforms
+        self.vy = np.minimum(self.vy + game.GRAVITY, game.MAX_FALL_SPEED)
+        self.x += np.trunc(self.vx).astype(np.int64)
+        self._collide(horizontal=True)
+        self.y += np.trunc(self.vy).astype(np.int64)
+        self.on_ground[:] = False
+        self._collide(horizontal=False)
+
+    def _collide(self, horizontal):
+        """collide_axis over each agent's near platforms, in level order."""
+        w, h = self.w, self.h
+        c0 = (self.x - w) // self.cell - self.col_lo
+        d = (self.x + 2 * w) // self.cell - self.col_lo - c0
+        row = np.where((c0 >= 0) & (c0 < self.near.shape[0] - 1), c0 + 1, 0)
+        candidates = self.near[row, d]
+        for k in range(candidates.shape[1]):
+            idx = candidates[:, k]
+            pl, pt, pr, pb = self.pl[idx], self.pt[idx], self.pr[idx], self.pb[idx]
+            hit = (self.x < pr) & (pl < self.x + w) & (self.y < pb) & (pt < self.y + h)
+            if not hit.any():
+                continue
+            if horizontal:
+                self.x = np.where(hit & (self.vx > 0), pl - w, np.where(hit & (self.vx < 0), pr, self.x))
+                self.vx[hit] = 0.0
+            else:
+                down = hit & (self.vy > 0)
+                self.y = np.where(down, pt - h, np.where(hit & (self.vy < 0), pb, self.y))
+                self.on_ground |= down
+                self.vy[hit] = 0.0
+
+    def _pick_up(self):
+        if not len(self.fb_bits):
+            return
+        x, y = self.x[:, None], self.y[:, None]
+        left = (self.collected[:, None] & self.fb_bits) == 0
+        hits = left & (x < self.fr) & (self.fl < x + self.w) & (y < self.fb) & (self.ft < y + self.h)
+        touch = self.game.sprites_touch
+        for i, j in zip(*np.nonzero(hits)):
+            if touch(self.images[int(self.facing[i])], int(self.x[i]), int(self.y[i]),
+                     self.game.FOOTBALL_IMG, *self.fb_draw[j]):
+                self.collected[i] |= self.fb_bits[j]
+                self.score[i] += 100
+
+    def _hurt(self, mask, cause):
+        mask = mask & (self.invuln <= 0)
+        self.cause[mask] = cause
+        self.lives[mask] -= 1
+        self.invuln[mask] = self.game.FPS
+        self.y[mask] -= 10
+        np.maximum(self.lives, 0, out=self.lives)
+
+    def _check_fail(self):
+        fell = self.y > self.fall_y
+        if fell.any():
+            self._hurt(fell, CAUSE_FALL)
+            # spawn()
+            self.x[fell] = self.spawn_x
+            self.y[fell] = self.spawn_y
+            self.vx[fell] = 0.0
+            self.vy[fell] = 0.0
+            self.on_ground[fell] = False
+
+    def _check_enemies(self):
+        if not len(self.e_bits):
+            return
+        t = np.minimum(self.t, self.max_steps)
+        x, y = self.x[:, None], self.y[:, None]
+        alive = (self.alive[:, None] & self.e_bits) != 0
+        hits = (alive & (x < self.er[t]) & (self.el[t] < x + self.w)
+                & (y < self.eb[t]) & (self.et[t] < y + self.h))
+        if not hits.any():
+            return
+        touch = self.game.sprites_touch
+        stomp_vy = int(self.game.JUMP_VEL * 0.7)
+        for i in np.nonzero(hits.any(axis=1))[0]:
+            ti = t[i]
+            img, px, py = self.images[int(self.facing[i])], int(self.x[i]), int(self.y[i])
+            for j in np.nonzero(hits[i])[0]:  # in ENEMIES order, like check_enemy_collisions
+                if not touch(img, px, py, self.enemy_images[self.e_img[ti, j]], int(self.el[ti, j]), int(self.et[ti, j])):
+                    continue
+                if self.vy[i] > 0 and self.y[i] + self.h - self.e_top[ti, j] < 16:
+                    self.vy[i] = stomp_vy
+                    self.alive[i] &= ~self.e_bits[j]
+                    self.score[i] += 200
+                elif self.invuln[i] <= 0:  # hurt(), for one agent
+                    self.cause[i] = CAUSE_ENEMY
+                    self.lives[i] = max(0, self.lives[i] - 1)
+                    self.invuln[i] = self.game.FPS
+                    self.y[i] -= 10
+                break
+
+
+# ------------------------------
+# Benchmark and check against the game
+# ------------------------------
+def random_actions(rng, n, frames):
+    """(frames, n) action bits in fuzz.py's style: held for a few frames, biased right."""
+    out = np.zeros((frames, n), np.int64)
+    for i in range(n):
+        f = 0
+        while f < frames:
+            right = rng.random() < 0.65
+            left = not right and rng.random() < 0.5
+            jump = rng.random() < 0.35
+            hold = rng.randint(4, 45)
+            out[f:f + hold, i] = (ACT_LEFT if left else 0) | (ACT_RIGHT if right else 0) | (ACT_JUMP if jump else 0)
+            f += hold
+    return out
+
+
+def bench(game, args):
+    env = BotEnv(game, args.agents, level=args.level)
+    actions = random_actions(random.Random(args.seed), args.agents, args.frames)
+    env.reset()
+    start = time.perf_counter()
+    episodes = 0
+    for f in range(args.frames):
+        _, _, done, _ = env.step(actions[f])
+        episodes += int(done.sum())
+    elapsed = time.perf_counter() - start
+    steps = args.agents * args.frames
+    print(f"{args.agents} agents x {args.frames} frames in {elapsed:.2f}s: "
+          f"{steps / elapsed:,.0f} agent-steps/s ({steps / elapsed * 60 / 1e6:.1f}M/min), {episodes} episodes ended")
+
+
+def check(game, args):
+    """Play the same inputs through BotEnv and, one agent at a time, update_game;
+    report the first frame each agent disagrees (position, velocity, lives, score, footballs)."""
+    frames = min(args.frames, DEFAULT_MAX_STEPS)
+    env = BotEnv(game, args.agents, level=args.level, max_steps=frames)
+    actions = random_actions(random.Random(args.seed), args.agents, frames)
+    env.reset()
+    trace = []
+    ended = np.full(args.agents, frames, np.int64)
+    for f in range(frames):
+        _, _, done, _ = env.step(actions[f])
+        trace.append(np.stack([env.x, env.y, np.round(env.vx * 100), np.round(env.vy * 100),
+                               env.lives, env.score, env.observe()[:, 7]], axis=1).astype(np.int64))
+        ended[done & (ended == frames)] = f
+        if (ended < frames).all():
+            break
+
+    level = env.level
+    mismatched = 0
+    for i in range(args.agents):
+        random.seed(args.seed + i)
+        player = game.Player()
+        with contextlib.redirect_stdout(io.StringIO()):
+            game.reset_game(player)
+            if level is not game.LEVEL_1:
+                game.activate_level(level)
+                player.coins_total = len(game.FOOTBALLS)
+                player.spawn()
+        for f in range(min(ended[i] + 1, len(trace))):
+            a = int(actions[f, i])
+            game.update_game(player, game.SIM_DT, bool(a & ACT_LEFT), bool(a & ACT_RIGHT), bool(a & ACT_JUMP))
+            ref = (player.rect.x, player.rect.y, round(player.vx * 100), round(player.vy * 100),
+                   player.lives, player.score, player.coins_collected)
+            got = tuple(int(v) for v in trace[f][i])
+            if ref != got:
+                mismatched += 1
+                print(f"agent {i} frame {f}: game {ref} env {got}")
+                break
+            if player.lives == 0 or game.flag_reached or game.current_level is not level:
+                break
+    print(f"{args.agents} agents, {len(trace)} frames: {mismatched} mismatched")
+    return mismatched
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batched Bevo simulation for bots.")
+    parser.add_argument("command", choices=("bench", "check"))
+    parser.add_argument("--agents", type=int, help="default: 4096 for bench, 64 for check")
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--level", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    if args.agents is None:
+        args.agents = DEFAULT_AGENTS[args.command]
+    game = load_game()
+    if args.command == "bench":
+        bench(game, args)
+    elif check(game, args):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
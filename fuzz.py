@@ -0,0 +1,164 @@
+"""
+Bevo vs. OU — Headless Playthrough Farm
+=======================================
+Stress-tests the level and physics by running many scripted or random input
+sequences through the real game simulation (main.update_game), fanned out over
+a process pool with one worker per core.
+
+Each worker initializes pygame once with the dummy video/audio drivers, imports
+main.py and loads the level and assets, then reuses that state for every
+playthrough it is handed. Results stream back as compact CSV rows:
+
+  seed,death_cause,flag,level,furthest_x,footballs,frames
+
+A playthrough runs the whole campaign: `level` is the last level reached,
+`flag` is set only by the final level's flag, and furthest_x and footballs
+count across levels (each finished level adds its flag's x to the distance).
+
+Usage (desktop only, not part of the web build):
+  python fuzz.py --runs 2000 --frames 3600
+  python fuzz.py --script inputs.json --out results.csv
+
+A script file is a JSON list of sequences; each sequence is a list of
+[left, right, jump, hold_frames] segments.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import time
+import warnings
+from collections import Counter, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+PlaythroughResult = namedtuple("PlaythroughResult", "seed death_cause flag level furthest_x footballs frames")
+
+DEFAULT_FRAMES = 60 * 60  # one minute of game time per playthrough
+
+# Worker-local state, set up once per process by _init_worker()
+_game = None
+_player = None
+
+
+def _init_worker():
+    global _game, _player
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    # main.py lives next to this file and loads assets with relative paths
+    here = os.path.dirname(os.path.abspath(__file__))
+    os.chdir(here)
+    if here not in sys.path:
+        sys.path.insert(0, here)
+    warnings.simplefilter("ignore")  # dummy-driver renderer/font warnings, once per worker
+    with contextlib.redirect_stdout(io.StringIO()):
+        import main as game
+        game.load_content()
+        _player = game.Player()
+    _game = game
+
+
+def random_inputs(rng):
+    """Endless (left, right, jump) stream: random actions held for a few frames, biased to the right."""
+    while True:
+        right = rng.random() < 0.65
+        left = not right and rng.random() < 0.5
+        jump = rng.random() < 0.35
+        for _ in range(rng.randint(4, 45)):
+            yield left, right, jump
+
+
+def scripted_inputs(segments):
+    for left, right, jump, hold in segments:
+        for _ in range(int(hold)):
+            yield bool(left), bool(right), bool(jump)
+
+
+def play(job):
+    """Run one headless playthrough in a worker. job = (seed, segments or None, max_frames)."""
+    seed, segments, max_frames = job
+    game, player = _game, _player
+    # Confetti and anything else drawing from the global RNG stay reproducible per seed
+    random.seed(seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        game.reset_game(player)
+
+    inputs = scripted_inputs(segments) if segments is not None else random_inputs(random.Random(seed))
+    dt = 1.0 / game.FPS
+    level = game.current_level
+    offset = 0  # campaign distance covered by the levels already finished
+    footballs = 0
+    furthest_x = player.rect.x
+    death_cause = ""
+    frames = 0
+    while frames < max_frames:
+        left, right, jump = next(inputs, (False, False, False))
+        collected = player.coins_collected
+        game.update_game(player, dt, left, right, jump)
+        frames += 1
+        if game.current_level is not level:  # flag reached with levels to go
+            offset += level.flag.x
+            footballs += collected
+            level = game.current_level
+        furthest_x = max(furthest_x, offset + player.rect.x)
+        if player.lives == 0:
+            death_cause = player.last_hurt_cause or "unknown"
+            break
+        if game.flag_reached:
+            break
+    return PlaythroughResult(seed, death_cause, game.flag_reached, level.number, furthest_x,
+                             footballs + player.coins_collected, frames)
+
+
+def build_jobs(args):
+    if args.script:
+        with open(args.script) as f:
+            sequences = json.load(f)
+        return [(args.seed + i, seq, args.frames) for i, seq in enumerate(sequences)]
+    return [(args.seed + i, None, args.frames) for i in range(args.runs)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fan headless playthroughs out across all cores.")
+    parser.add_argument("--runs", type=int, default=1000, help="random playthroughs to run (ignored with --script)")
+    parser.add_argument("--frames", type=int, default=DEFAULT_FRAMES, help="frame cap per playthrough")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first playthrough")
+    parser.add_argument("--script", help="JSON file of scripted input sequences")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes (default: every core)")
+    parser.add_argument("--out", help="write CSV rows here instead of stdout")
+    args = parser.parse_args(argv)
+
+    jobs = build_jobs(args)
+    # Small chunks keep results streaming while still amortizing IPC
+    chunksize = max(1, min(64, len(jobs) // (args.workers * 8)))
+    out = open(args.out, "w") if args.out else sys.stdout
+    causes = Counter()
+    best_level = 0
+    best_x = 0
+    total_frames = 0
+    start = time.perf_counter()
+    try:
+        out.write(",".join(PlaythroughResult._fields) + "\n")
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker) as pool:
+            for r in pool.map(play, jobs, chunksize=chunksize):
+                out.write(f"{r.seed},{r.death_cause},{int(r.flag)},{r.level},{r.furthest_x},{r.footballs},{r.frames}\n")
+                causes["flag" if r.flag else (r.death_cause or "timeout")] += 1
+                best_level = max(best_level, r.level)
+                best_x = max(best_x, r.furthest_x)
+                total_frames += r.frames
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    elapsed = time.perf_counter() - start
+    summary = ", ".join(f"{k}={v}" for k, v in sorted(causes.items()))
+    print(f"{len(jobs)} playthroughs on {args.workers} workers in {elapsed:.1f}s "
+          f"({total_frames / max(elapsed, 1e-9):,.0f} frames/s) | {summary} | furthest level={best_level}, x={best_x}",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,34 @@
+import time
+_IMPORT_T0 = time.perf_counter()  # startup report baseline
+
 import pygame
 import asyncio
+import bisect
+import math
+import os
+import queue
 import random
+import sys
+import threading
+import weakref
+from collections import Counter, deque, namedtuple
 
 """
 Bevo vs. OU — Web/HTML5 Build (PyGBag ready)
 =============================================
 - Runs in desktop & mobile browsers (iPhone/iPad Safari supported).
-- Responsive: renders to a virtual canvas (900x540) then scales to the window.
+- Responsive: on desktop draws straight at window resolution through a scale
+  factor, with sprites pre-scaled per resolution bucket (--render=native); on
+  the web, with --render=virtual, or with --pipeline (which always uses it),
+  renders to a 900x540 canvas then scales it.
 - On‑screen mobile controls (Left / Right / Jump) + keyboard support.
-- Audio (grunt.wav) is initialized AFTER first tap (required by iOS Safari).
+- Idles (no simulation, rare or no presents) on static screens and hidden tabs.
+- Fixed 60 Hz simulation with paced presents: browser-frame aligned on the web,
+  sleep-then-spin on desktop (--pacing=browser|busy|hybrid); F3 shows jitter.
+- A run of LEVEL_COUNT levels; the next one is built and baked a slice at a
+  time in each frame's spare time, so reaching a flag switches at once.
+- Audio (grunt.wav) is initialized AFTER first tap (required by iOS Safari);
+  missing sound files are skipped.
 
 File layout for web build:
   main.py
@@ -17,11 +37,22 @@ File layout for web build:
     ou_defender.png
     football.png
     grunt.wav
+    freesansbold.ttf   (bundled UI font; avoids a system font scan)
 
 Build for the web:
   pip install pygbag
   pygbag main.py
   # Deploy the generated ./build folder as a static site (e.g., Render Static Site)
+
+Desktop-only tools (not loaded by the web build):
+  python fuzz.py --runs 1000   # headless playthrough farm, one worker per core
+  python main.py --alloc-trace # per-frame allocation report (or BEVO_ALLOC_TRACE=1)
+  python main.py --watch       # apply PLATFORMS / ENEMY_LAYOUT edits while playing (or BEVO_WATCH=1)
+  python main.py --pipeline    # simulate the next frame while this one is drawn (or BEVO_PIPELINE=1);
+                               # always renders through the virtual canvas: --render=native is ignored
+  python netsync.py demo       # co-op state sync (snapshots or lockstep) over a loopback relay
+  python bot_env.py bench      # batched NumPy Bevos for bot training (needs numpy)
+  python profile_scenarios.py zone7  # cProfile + sampled flamegraph stacks of a scenario
 """
 
 # ------------------------------
@@ -51,20 +82,342 @@ AS_ENEMY = "assets/ou_defender.png"
 AS_FOOTBALL = "assets/football.png"
 AS_GRUNT = "assets/grunt.wav"
 AS_BG = "assets/stadium_background.png"  # <-- your stadium image
+AS_FONT = "assets/freesansbold.ttf"
+AS_GOLD_HAT = "assets/gold_hat.png"
+AS_CONFETTI = "assets/orange_confetti.png"
 BG_IMG_SLOW = None
 BG_IMG_FAST = None
 
 
-pygame.init()
+class StartupTimer:
+    """Named checkpoints since main.py started importing, reported once the game is playable."""
+
+    def __init__(self, t0):
+        self.t0 = t0
+        self.last = t0
+        self.marks = []  # (name, ms spent in this step)
+
+    def mark(self, name):
+        now = time.perf_counter()
+        self.marks.append((name, (now - self.last) * 1000.0))
+        self.last = now
+
+    def report(self):
+        parts = [f"{name} {ms:.0f}ms" for name, ms in self.marks]
+        first = None
+        elapsed = 0.0
+        for name, ms in self.marks:
+            elapsed += ms
+            if name == "first frame":
+                first = elapsed
+        head = f"startup: first frame at {first:.0f}ms, " if first is not None else "startup: "
+        return head + f"playable at {elapsed:.0f}ms | " + " | ".join(parts)
+
+
+startup = StartupTimer(_IMPORT_T0)
+startup.mark("import")
+
+# Only what the first frame needs: the display and one bundled font. The mixer
+# is opened on the first tap (AudioManager.unlock) and content loads after the
+# first frame is on screen (see CONTENT_STEPS).
+# Render modes:
+#   native:  the frame is drawn straight into the window, scaled from virtual
+#            (900x540) coordinates; sprites are pre-scaled once per window size
+#            bucket, so nothing is resampled per frame and sharpness follows the
+#            display.
+#   virtual: the frame is drawn into the 900x540 canvas, which is then scaled
+#            to the window (SDL does it for the SCALED window). Web default.
+# Pick one with --render=<name> or BEVO_RENDER. Pipelined frames (desktop:
+# --pipeline or BEVO_PIPELINE=1, see FramePipeline) always use the virtual
+# canvas: native mode makes its pre-scaled copies while compositing, which
+# would share them between the two threads.
+RENDER_MODES = ("native", "virtual")
+PIPELINE = sys.platform != "emscripten" and ("--pipeline" in sys.argv or bool(os.environ.get("BEVO_PIPELINE")))
+
+
+def render_mode():
+    for arg in sys.argv[1:]:
+        if arg.startswith("--render="):
+            name = arg.split("=", 1)[1]
+            break
+    else:
+        name = os.environ.get("BEVO_RENDER")
+    if PIPELINE:
+        if name == "native":
+            print("--pipeline renders through the virtual canvas; ignoring --render=native")
+        return "virtual"
+    if not name:
+        name = "virtual" if sys.platform == "emscripten" else "native"
+    return name if name in RENDER_MODES else "virtual"
+
+
+NATIVE_RENDER = render_mode() == "native"
+WINDOW_FILL = 0.8  # native mode opens at up to this share of the desktop
+
 
-# Display surface is dynamic/responsive; we render to a fixed virtual surface
-screen = pygame.display.set_mode((VIRTUAL_W, VIRTUAL_H), pygame.SCALED | pygame.RESIZABLE)
-virtual = pygame.Surface((VIRTUAL_W, VIRTUAL_H)).convert_alpha()
+def fitted_window_size():
+    """The biggest 900x540-shaped window within WINDOW_FILL of the desktop, never below 900x540."""
+    try:
+        w, h = pygame.display.get_desktop_sizes()[0]
+    except (pygame.error, IndexError):
+        return VIRTUAL_W, VIRTUAL_H
+    scale = max(1.0, min(w / VIRTUAL_W, h / VIRTUAL_H) * WINDOW_FILL)
+    return round(VIRTUAL_W * scale), round(VIRTUAL_H * scale)
+
+
+pygame.display.init()
+if NATIVE_RENDER:
+    # The display surface follows the window; frames are drawn at its size, so
+    # open it as big as the display comfortably allows (sharp on high-DPI screens)
+    screen = pygame.display.set_mode(fitted_window_size(), pygame.RESIZABLE)
+else:
+    # Display surface is dynamic/responsive; we render to a fixed virtual surface
+    screen = pygame.display.set_mode((VIRTUAL_W, VIRTUAL_H), pygame.SCALED | pygame.RESIZABLE)
+virtual = pygame.Surface((VIRTUAL_W, VIRTUAL_H)).convert()  # opaque: the background covers it
 clock = pygame.time.Clock()
-font = pygame.font.SysFont("consolas", 20)
+startup.mark("display")
+
+pygame.font.init()
+_fonts = {}
+
+
+def get_font(size, bold=False):
+    """Bundled font at `size`, cached. Falls back to pygame's built-in default font."""
+    key = (size, bold)
+    f = _fonts.get(key)
+    if f is None:
+        try:
+            f = pygame.font.Font(AS_FONT, size)
+        except Exception:
+            f = pygame.font.Font(None, size)
+        f.set_bold(bold)
+        _fonts[key] = f
+    return f
+
+
+font = get_font(20)
+startup.mark("font")
+
+# ------------------------------
+# Surface memory budget
+# ------------------------------
+# Per-category pixel budgets (MB). Going over one calls that category's
+# reclaimers (evict a cache, degrade an effect) until it fits again.
+SURFACE_BUDGETS_MB = {
+    "background": 32,
+    "sprites": 24,
+    "particles": 8,
+    "ui": 4,
+    "caches": 8,
+    "frame": 8,
+    "level": 20,
+    "native": 6,  # per unit of scale squared: NativeView.fit sizes it to the window
+}
+
+
+class SurfaceRegistry:
+    """Accounts for the pixel memory of long-lived surfaces, by category.
+
+    track() records a surface until it is garbage collected (weakref.finalize),
+    so caches and particles can simply drop references. Per-frame temporaries
+    are not tracked.
+    """
+
+    def __init__(self, budgets_mb):
+        self.budgets = {cat: mb * 1024 * 1024 for cat, mb in budgets_mb.items()}
+        self.bytes = dict.fromkeys(budgets_mb, 0)
+        self.counts = dict.fromkeys(budgets_mb, 0)
+        self.peak = dict.fromkeys(budgets_mb, 0)
+        self.reclaimers = {cat: [] for cat in budgets_mb}
+        self._live = {}  # id(surface) -> category
+        self._enforcing = False
+
+    def track(self, surf, category):
+        key = id(surf)
+        if key in self._live:
+            return surf
+        nbytes = surf.get_pitch() * surf.get_height()
+        self._live[key] = category
+        self.bytes[category] += nbytes
+        self.counts[category] += 1
+        self.peak[category] = max(self.peak[category], self.bytes[category])
+        weakref.finalize(surf, self._release, key, category, nbytes)
+        if self.bytes[category] > self.budgets[category]:
+            self.enforce(category)
+        return surf
+
+    def _release(self, key, category, nbytes):
+        self._live.pop(key, None)
+        self.bytes[category] -= nbytes
+        self.counts[category] -= 1
+
+    def set_budget(self, category, mb):
+        """Change a category's budget, reclaiming now if it no longer fits."""
+        self.budgets[category] = mb * 1024 * 1024
+        self.enforce(category)
+
+    def on_over_budget(self, category, reclaim):
+        """Register reclaim() to free memory in `category`; called in registration order."""
+        self.reclaimers[category].append(reclaim)
+
+    def enforce(self, category):
+        if self._enforcing:
+            return
+        self._enforcing = True
+        try:
+            # Keep going round the reclaimers while they still free something
+            while self.bytes[category] > self.budgets[category]:
+                before = self.bytes[category]
+                for reclaim in self.reclaimers[category]:
+                    reclaim()
+                    if self.bytes[category] <= self.budgets[category]:
+                        break
+                if self.bytes[category] >= before:
+                    break
+        finally:
+            self._enforcing = False
+
+    def total(self):
+        return sum(self.bytes.values())
+
+    def summary_lines(self):
+        mb = 1024 * 1024
+        lines = [f"surfaces {self.total() / mb:.1f}MB"]
+        for cat, used in self.bytes.items():
+            lines.append(f"{cat} {used / mb:.1f}/{self.budgets[cat] / mb:.0f}MB x{self.counts[cat]}")
+        return lines
+
+
+surfaces = SurfaceRegistry(SURFACE_BUDGETS_MB)
+surfaces.track(virtual, "frame")
+
+
+# ------------------------------
+# Allocation tracking (diagnostic: python main.py --alloc-trace, or BEVO_ALLOC_TRACE=1)
+# ------------------------------
+# Target: a steady-state gameplay frame creates no Surfaces and leaves no new
+# Python blocks behind. tracemalloc makes every frame far slower; desktop only.
+ALLOC_TRACE = "--alloc-trace" in sys.argv or bool(os.environ.get("BEVO_ALLOC_TRACE"))
+ALLOC_WARMUP_FRAMES = 120  # caches fill during the first couple of seconds of play
+ALLOC_TOP_SITES = 6
+SURFACE_FUNCS = ("rotate", "rotozoom", "scale", "smoothscale", "scale_by", "smoothscale_by", "flip", "scale2x")
+
+
+def _call_site(depth):
+    f = sys._getframe(depth + 1)
+    return f"{f.f_code.co_name}:{f.f_lineno}"
+
+
+class AllocTracker:
+    """Per-frame allocation report grouped by call site.
+
+    Python allocations come from a tracemalloc snapshot of this file taken by
+    begin_frame() and another taken by end_frame(), diffed by line: a line
+    that holds more blocks at the end of the frame than at its start allocated
+    them during the frame. tracemalloc sees every thread, so the (pipelined)
+    present thread's blocks in this file count too. Surfaces are
+    counted by swapping in counting versions of pygame.Surface, the
+    pygame.transform functions and Font.render (every font comes from
+    get_font). Once warmed up, each gameplay frame that allocates is flagged;
+    a line is printed at most once a second and totals at exit.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.frame_surfaces = Counter()  # "what in where" -> Surfaces created this frame
+        self.total_surfaces = Counter()  # same, summed over flagged frames
+        self.total_blocks = Counter()    # file:line -> blocks over flagged frames
+        self.total_bytes = Counter()     # file:line -> bytes over flagged frames
+        self.frames = 0
+        self.steady = 0
+        self.flagged = 0
+        self.last_print = -FPS
+        self._snapshot = None
+        self._filters = None
+
+    def start(self):
+        global font
+        import tracemalloc
+        self._tracemalloc = tracemalloc
+        self._filters = [tracemalloc.Filter(True, __file__)]
+        made = self.frame_surfaces
+
+        def counting(name, fn):
+            def counted(*args, **kwargs):
+                out = fn(*args, **kwargs)
+                if not any(a is out for a in args):  # scaling into a dest surface allocates nothing
+                    made[f"{name} in {_call_site(1)}"] += 1
+                return out
+            return counted
+
+        for name in SURFACE_FUNCS:
+            if hasattr(pygame.transform, name):
+                setattr(pygame.transform, name, counting(name, getattr(pygame.transform, name)))
+
+        class CountingSurface(pygame.Surface):
+            def __init__(self, *args, **kwargs):
+                made[f"Surface in {_call_site(1)}"] += 1
+                super().__init__(*args, **kwargs)
+
+        class CountingFont(pygame.font.Font):
+            def render(self, *args, **kwargs):
+                made[f"render in {_call_site(1)}"] += 1
+                return super().render(*args, **kwargs)
+
+        pygame.Surface = CountingSurface
+        pygame.font.Font = CountingFont
+        _fonts.clear()
+        font = get_font(20)
+        tracemalloc.start()
+        self.enabled = True
+
+    def begin_frame(self):
+        """Open a frame: remember what this file holds before it runs."""
+        self.frame_surfaces.clear()
+        self._snapshot = self._tracemalloc.take_snapshot().filter_traces(self._filters)
+
+    def end_frame(self, steady):
+        """Close a frame; `steady` is True for normal gameplay (not loading, idle, dying or won)."""
+        snap = self._tracemalloc.take_snapshot().filter_traces(self._filters)
+        self.frames += 1
+        if self._snapshot is None or not steady or self.frames <= ALLOC_WARMUP_FRAMES:
+            return
+        self.steady += 1
+        made = self.frame_surfaces
+        here = sys._getframe(1).f_lineno  # the call to this method holds a block or two itself
+        grown = [d for d in snap.compare_to(self._snapshot, "lineno")
+                 if d.count_diff > 0 and d.traceback[0].lineno != here]
+        if grown or made:
+            self.flagged += 1
+            self.total_surfaces.update(made)
+            for d in grown:
+                self.total_blocks[self._line(d)] += d.count_diff
+                self.total_bytes[self._line(d)] += d.size_diff
+            if self.frames - self.last_print >= FPS:
+                self.last_print = self.frames
+                sites = [f"{n} {site}" for site, n in made.most_common()]
+                sites += [f"+{d.count_diff} blocks ({d.size_diff:+}B) at {self._line(d)}" for d in grown]
+                print(f"alloc: frame {self.frames}: " + ", ".join(sites[:ALLOC_TOP_SITES]))
+
+    @staticmethod
+    def _line(stat):
+        frame = stat.traceback[0]
+        return f"{os.path.basename(frame.filename)}:{frame.lineno}"
+
+    def report(self):
+        lines = [f"alloc: {self.flagged}/{self.steady} steady-state frames allocated "
+                 f"(surfaces, or lines holding more blocks after the frame than before)"]
+        for site, n in self.total_surfaces.most_common(ALLOC_TOP_SITES):
+            lines.append(f"  {n} x {site}")
+        for site, n in self.total_blocks.most_common(ALLOC_TOP_SITES):
+            lines.append(f"  +{n} blocks ({self.total_bytes[site]:+}B) at {site}")
+        return "\n".join(lines)
+
+
+alloc_tracker = AllocTracker()
 
 # ------------------------------
-# Assets (loaded on start; grunt sound deferred until first tap)
+# Assets (loaded right after the first frame; grunt sound deferred until first tap)
 # ------------------------------
 PLAYER_HEIGHT = 72
 ENEMY_HEIGHT = 64
@@ -72,19 +425,56 @@ FOOTBALL_HEIGHT = 24
 
 BEVO_RIGHT = BEVO_LEFT = None
 ENEMY_RIGHT = ENEMY_LEFT = None
+ENEMY_FLEX = {}  # enemy sprite -> its pre-scaled flexing version
+FLEX_SCALE = 1.12
 FOOTBALL_IMG = None
-GRUNT_SFX = None
-mixer_ready = False  # set True after first tap
+FOOTBALL_PICKUP_MASK = None  # the football's pixels inside its pickup rect
+SPRITE_MASKS = {}  # sprite -> its collision mask, one per drawn variant (facing, flex)
+
+
+def build_masks(*imgs):
+    for img in imgs:
+        SPRITE_MASKS[img] = pygame.mask.from_surface(img)
+
+
+def clipped_mask(img, size):
+    """img's mask cut down to a centred rect of `size`, as a pickup rect sits under its sprite."""
+    clip = pygame.Mask(img.get_size())
+    clip.draw(pygame.Mask(size, fill=True), (img.get_width() // 2 - size[0] // 2, img.get_height() // 2 - size[1] // 2))
+    return SPRITE_MASKS[img].overlap_mask(clip, (0, 0))
+
+
+def sprites_touch(img_a, ax, ay, img_b, bx, by):
+    """Pixel-exact test for two sprites whose bounds already overlap.
+
+    Only call this after a rect hit; a missing image (plain block fallback)
+    counts as solid, so the rect result stands.
+    """
+    if img_a is None or img_b is None:
+        return True
+    return SPRITE_MASKS[img_a].overlap(SPRITE_MASKS[img_b], (bx - ax, by - ay)) is not None
+
+
+def flex_sprite(img):
+    w = int(img.get_width() * FLEX_SCALE)
+    h = int(img.get_height() * FLEX_SCALE)
+    return pygame.transform.smoothscale(img, (w, h))
 
 
 def load_images():
-    global BEVO_RIGHT, BEVO_LEFT, ENEMY_RIGHT, ENEMY_LEFT, FOOTBALL_IMG
+    global BEVO_RIGHT, BEVO_LEFT, ENEMY_RIGHT, ENEMY_LEFT, FOOTBALL_IMG, FOOTBALL_PICKUP_MASK
     try:
         bevo_raw = pygame.image.load(AS_BEVO).convert_alpha()
         s = PLAYER_HEIGHT / bevo_raw.get_height()
         w = max(16, int(bevo_raw.get_width() * s))
         BEVO_RIGHT = pygame.transform.smoothscale(bevo_raw, (w, PLAYER_HEIGHT))
-        BEVO_LEFT = pygame.transform.flip(BEVO_RIGHT, True, False)
+        BEVO_LEFT = static_sprite(pygame.transform.flip(BEVO_RIGHT, True, False))
+        static_sprite(BEVO_RIGHT)
+        view.source(BEVO_RIGHT, bevo_raw)
+        view.source(BEVO_LEFT, bevo_raw, mirrored=True)
+        surfaces.track(BEVO_RIGHT, "sprites")
+        surfaces.track(BEVO_LEFT, "sprites")
+        build_masks(BEVO_RIGHT, BEVO_LEFT)
     except Exception:
         BEVO_RIGHT = BEVO_LEFT = None
 
@@ -94,6 +484,16 @@ def load_images():
         w = max(16, int(e_raw.get_width() * s))
         ENEMY_RIGHT = pygame.transform.smoothscale(e_raw, (w, ENEMY_HEIGHT))
         ENEMY_LEFT = pygame.transform.flip(ENEMY_RIGHT, True, False)
+        ENEMY_FLEX[ENEMY_RIGHT] = static_sprite(flex_sprite(ENEMY_RIGHT))
+        ENEMY_FLEX[ENEMY_LEFT] = static_sprite(flex_sprite(ENEMY_LEFT))
+        static_sprite(ENEMY_RIGHT)
+        static_sprite(ENEMY_LEFT)
+        for img, mirrored in ((ENEMY_RIGHT, False), (ENEMY_LEFT, True)):
+            view.source(img, e_raw, mirrored)
+            view.source(ENEMY_FLEX[img], e_raw, mirrored)
+        for img in (ENEMY_RIGHT, ENEMY_LEFT, *ENEMY_FLEX.values()):
+            surfaces.track(img, "sprites")
+        build_masks(ENEMY_RIGHT, ENEMY_LEFT, *ENEMY_FLEX.values())
     except Exception:
         ENEMY_RIGHT = ENEMY_LEFT = None
 
@@ -101,103 +501,376 @@ def load_images():
         fb_raw = pygame.image.load(AS_FOOTBALL).convert_alpha()
         s = FOOTBALL_HEIGHT / fb_raw.get_height()
         w = max(10, int(fb_raw.get_width() * s))
-        FOOTBALL_IMG = pygame.transform.smoothscale(fb_raw, (w, FOOTBALL_HEIGHT))
+        FOOTBALL_IMG = static_sprite(pygame.transform.smoothscale(fb_raw, (w, FOOTBALL_HEIGHT)))
+        view.source(FOOTBALL_IMG, fb_raw)
+        surfaces.track(FOOTBALL_IMG, "sprites")
+        build_masks(FOOTBALL_IMG)
+        FOOTBALL_PICKUP_MASK = clipped_mask(FOOTBALL_IMG, football_rect(pygame.Rect(0, 0, 0, 0)).size)
     except Exception:
-        FOOTBALL_IMG = None
+        FOOTBALL_IMG = FOOTBALL_PICKUP_MASK = None
     
     global BG_IMG_SLOW, BG_IMG_FAST
     try:
         bg_raw = pygame.image.load(AS_BG).convert()
         # Use WORLD_WIDTH if you added it; otherwise fall back to screen width
         bg_w = int(globals().get("WORLD_WIDTH", VIRTUAL_W))
-        BG_IMG_SLOW = pygame.transform.scale(bg_raw, (bg_w, VIRTUAL_H))
-        BG_IMG_FAST = pygame.transform.scale(bg_raw, (bg_w, VIRTUAL_H))
+        # Both parallax layers use the same picture, so they share one 12000px-wide copy
+        BG_IMG_FAST = surfaces.track(pygame.transform.scale(bg_raw, (bg_w, VIRTUAL_H)), "background")
+        BG_IMG_SLOW = BG_IMG_FAST
     except Exception:
         BG_IMG_SLOW = BG_IMG_FAST = None
 
 
+def degrade_background():
+    """Over budget: keep the background at 16 bits per pixel (half the memory, slower blits)."""
+    global BG_IMG_SLOW, BG_IMG_FAST
+    if BG_IMG_FAST is None or BG_IMG_FAST.get_bitsize() <= 16:
+        return
+    slow_shared = BG_IMG_SLOW is BG_IMG_FAST
+    BG_IMG_FAST = surfaces.track(BG_IMG_FAST.convert(16), "background")
+    BG_IMG_SLOW = BG_IMG_FAST if slow_shared else None
+
 
+surfaces.on_over_budget("background", degrade_background)
 
-load_images()
 
 # ------------------------------
 # Utility
 # ------------------------------
 
-def draw_text(surf, text, x, y, color=UI):
-    surf.blit(font.render(text, True, color), (x, y))
+# Draw layers, back to front. The win animation sits under the characters,
+# as it always has.
+(LAYER_BG, LAYER_PLATFORMS, LAYER_PICKUPS, LAYER_FX, LAYER_ENEMIES, LAYER_PLAYER,
+ LAYER_HUD, LAYER_OVERLAY) = range(8)
+# Layers drawn in virtual-canvas coordinates; all others are world coordinates
+# and get the camera applied.
+SCREEN_LAYERS = (LAYER_FX, LAYER_HUD, LAYER_OVERLAY)
+
+
+class RenderQueue:
+    """Collects one frame of blits and draws them layer by layer with Surface.blits.
+
+    Submission order is kept within a layer. World-layer blits that fall
+    entirely outside the view are dropped at submit time.
+    """
+
+    def __init__(self):
+        self.layers = [[] for _ in range(LAYER_OVERLAY + 1)]
+        self.world = [layer not in SCREEN_LAYERS for layer in range(LAYER_OVERLAY + 1)]
+        self.camera_x = 0
+        self.clear_color = None  # set when nothing opaque covers the frame
+
+    def begin(self, camera_x):
+        self.camera_x = camera_x
+        self.clear_color = None
+        for items in self.layers:
+            items.clear()
+
+    def submit(self, layer, surf, x, y):
+        if self.world[layer]:
+            x -= self.camera_x
+            if x >= VIRTUAL_W or x + surf.get_width() <= 0:
+                return
+        self.layers[layer].append((surf, (x, y)))
+
+    def snapshot(self):
+        """A frozen copy of the queued frame, to flush on another thread while this queue moves on."""
+        snap = RenderQueue()
+        snap.layers = [tuple(items) for items in self.layers]
+        snap.camera_x = self.camera_x
+        snap.clear_color = self.clear_color
+        return snap
+
+    def flush(self, target):
+        if self.clear_color is not None:
+            target.fill(self.clear_color)
+        for items in self.layers:
+            if items:
+                target.blits(items, doreturn=False)
+
+    def flush_native(self, target, view):
+        """Draw the frame into the window at view.rect, each surface swapped for its pre-scaled copy."""
+        for bar in view.bars:
+            target.fill((0, 0, 0), bar)
+        clip = target.get_clip()
+        target.set_clip(view.rect)
+        if self.clear_color is not None:
+            target.fill(self.clear_color, view.rect)
+        s = view.scale
+        ox, oy = view.rect.topleft
+        kept = view.kept
+        for items in self.layers:
+            if not items:
+                continue
+            blits = []
+            for surf, (x, y) in items:
+                if surf in kept:
+                    blits.append((surf, (ox + round(x * s), oy + round(y * s))))
+                elif surf.get_width() > WIDE_W:
+                    blits.extend(view.strips(surf, x, y))
+                else:
+                    blits.append((view.scaled(surf), (ox + round(x * s), oy + round(y * s))))
+            target.blits(blits, doreturn=False)
+        target.set_clip(clip)
+
+
+rq = RenderQueue()
+
+
+# ------------------------------
+# Native-resolution rendering (see RENDER_MODES)
+# ------------------------------
+SCALE_BUCKETS = 16       # scale factors are rounded down to a multiple of 1/SCALE_BUCKETS
+WIDE_W = 2 * VIRTUAL_W   # surfaces wider than this (background, ground) are scaled in strips
+STRIP_W = 128            # virtual px per pre-scaled strip
+
+
+class NativeView:
+    """Where the 900x540 virtual frame lands in the window, and the surfaces pre-scaled for it.
+
+    The scale factor is the largest that fits the window, rounded down to a
+    bucket so that resizing by a few pixels keeps the pre-scaled copies; the
+    frame is centred between black bars. Sprites registered with source() are
+    scaled from their full-size artwork, so they get sharper on bigger
+    displays. Wide surfaces are scaled a strip at a time as they scroll into
+    view. Copies live in the "native" budget (sized to the scale), least recently drawn evicted
+    first, until the bucket changes. Surfaces already at window resolution
+    (text, the win screen's upscale() layer) are marked with keep() and
+    blitted as they are.
+    """
+
+    def __init__(self):
+        self.size = None
+        self.scale = 1.0
+        self.rect = pygame.Rect(0, 0, VIRTUAL_W, VIRTUAL_H)
+        self.bars = []
+        self.kept = weakref.WeakSet()
+        self._sources = {}  # sprite -> (full-size source, mirrored)
+        self._scaled = {}   # surface, or (surface, strip index) -> copy; oldest first
+        self._layer = None  # upscale() buffer
+
+    def fit(self, size):
+        """Follow the window size; a new scale bucket re-scales the sprites now."""
+        if size == self.size:
+            return
+        self.size = size
+        w, h = size
+        scale = max(1, int(min(w / VIRTUAL_W, h / VIRTUAL_H) * SCALE_BUCKETS)) / SCALE_BUCKETS
+        vw, vh = round(VIRTUAL_W * scale), round(VIRTUAL_H * scale)
+        r = self.rect = pygame.Rect((w - vw) // 2, (h - vh) // 2, vw, vh)
+        self.bars = [bar for bar in (pygame.Rect(0, 0, w, r.top), pygame.Rect(0, r.bottom, w, h - r.bottom),
+                                     pygame.Rect(0, r.top, r.left, r.h), pygame.Rect(r.right, r.top, w - r.right, r.h))
+                     if bar.w > 0 and bar.h > 0]
+        if scale != self.scale:
+            self.scale = scale
+            self._scaled.clear()
+            surfaces.set_budget("native", SURFACE_BUDGETS_MB["native"] * scale * scale)
+            for sprite in self._sources:
+                self.scaled(sprite)
+
+    def source(self, sprite, raw, mirrored=False):
+        """Scale `sprite` from `raw`, its full-size artwork (kept in native mode only)."""
+        if NATIVE_RENDER:
+            self._sources[sprite] = (surfaces.track(raw, "sprites"), mirrored)
+        return sprite
+
+    def keep(self, surf):
+        """Mark a surface drawn at window resolution already."""
+        self.kept.add(surf)
+        return surf
+
+    def px(self, v):
+        """Virtual px to window px."""
+        return max(1, round(v * self.scale))
+
+    def _scale(self, surf, size):
+        source = self._sources.get(surf)
+        if source is not None:
+            raw, mirrored = source
+            out = pygame.transform.smoothscale(raw, size)
+            if mirrored:
+                out = pygame.transform.flip(out, True, False)
+        elif surf.get_colorkey() is not None or surf.get_bitsize() < 24:
+            out = pygame.transform.scale(surf, size)  # exact colours: keys stay keys
+        else:
+            out = pygame.transform.smoothscale(surf, size)
+        if out.get_flags() & pygame.SRCALPHA:
+            static_sprite(out)
+        return out
+
+    def _store(self, key, out):
+        self._scaled[key] = surfaces.track(out, "native")
+        return out
+
+    def scaled(self, surf):
+        out = self._scaled.pop(surf, None)
+        if out is None:
+            return self._store(surf, self._scale(surf, (self.px(surf.get_width()), self.px(surf.get_height()))))
+        self._scaled[surf] = out  # now the most recently drawn
+        return out
+
+    def strips(self, surf, x, y):
+        """(copy, window pos) for each strip of a wide surface at virtual (x, y) that is in view."""
+        s = self.scale
+        ox = self.rect.x + round(x * s)
+        oy = self.rect.y + round(y * s)
+        w, h = surf.get_size()
+        first = max(0, int(-x // STRIP_W))
+        last = min((w - 1) // STRIP_W, int((VIRTUAL_W - 1 - x) // STRIP_W))
+        for i in range(first, last + 1):
+            x0 = i * STRIP_W
+            left = round(x0 * s)  # strip edges are rounded once, so neighbours always meet
+            key = (surf, i)
+            out = self._scaled.pop(key, None)
+            if out is None:
+                part = surf.subsurface((x0, 0, min(STRIP_W, w - x0), h))
+                out = self._store(key, self._scale(part, (round((x0 + part.get_width()) * s) - left, self.px(h))))
+            else:
+                self._scaled[key] = out
+            yield out, (ox + left, oy)
+
+    def upscale(self, layer):
+        """A virtual-size alpha layer scaled to the frame, into a reused buffer."""
+        size = self.rect.size
+        if self._layer is None or self._layer.get_size() != size:
+            self._layer = self.keep(surfaces.track(pygame.Surface(size, pygame.SRCALPHA), "native"))
+        return pygame.transform.smoothscale(layer, size, self._layer)
+
+    def evict(self):
+        """Over budget: drop the least recently drawn copy."""
+        if self._scaled:
+            del self._scaled[next(iter(self._scaled))]
+
+
+view = NativeView()
+surfaces.on_over_budget("native", view.evict)
+
+_solid_cache = {}
+
+
+def solid_surface(color, size):
+    """Cached block of color: opaque for RGB, uniformly translucent for RGBA."""
+    key = (color, size)
+    surf = _solid_cache.get(key)
+    if surf is None:
+        if len(color) == 4:
+            surf = pygame.Surface(size, pygame.SRCALPHA)
+        else:
+            surf = pygame.Surface(size).convert()
+        surf.fill(color)
+        _solid_cache[key] = surfaces.track(surf, "caches")
+    return surf
+
+
+def static_sprite(surf):
+    """Mark an alpha sprite that is never drawn on for RLE-accelerated blitting."""
+    surf.set_alpha(255, pygame.RLEACCEL)
+    return surf
+
+
+TEXT_CACHE_MAX = 64
+_text_cache = {}
+
+
+def text_surface(text, color=UI, size=20, bold=False):
+    """Rendered text, cached so unchanged HUD lines cost a dict lookup instead of a render."""
+    key = (text, color, size, bold)
+    surf = _text_cache.get(key)
+    if surf is None:
+        if len(_text_cache) >= TEXT_CACHE_MAX:
+            del _text_cache[next(iter(_text_cache))]  # oldest first
+        f = font if (size, bold) == (20, False) else get_font(size, bold)
+        surf = surfaces.track(f.render(text, True, color), "ui")
+        _text_cache[key] = surf
+    return surf
+
+
+def text_blit(text, color=UI, size=20, bold=False):
+    """text_surface() for submitting: rendered at the window's scale in native mode."""
+    if not NATIVE_RENDER:
+        return text_surface(text, color, size, bold)
+    return view.keep(text_surface(text, color, view.px(size), bold))
+
+
+def draw_text(rq, text, x, y, color=UI, layer=LAYER_HUD):
+    rq.submit(layer, text_blit(text, color), x, y)
 
 # ------------------------------
 # Level geometry
 # ------------------------------
+class FootballPlatform(pygame.Rect):
+    """A level 1 platform with a football on it: the spot is part of the entry,
+    so it stays with the platform however the list is edited."""
+
+
 PLATFORMS = [
     pygame.Rect(0, VIRTUAL_H - 40, 7000, 40),  # full ground floor extended to 7000px
 
     # === ZONE 1 (0-1000): Tutorial & Path Selection ===
     # Lower path (easy route)
-    pygame.Rect(100,  VIRTUAL_H - 100, 200, 20),   # first step up
+    FootballPlatform(100,  VIRTUAL_H - 100, 200, 20),   # first step up
     pygame.Rect(400,  VIRTUAL_H - 120, 180, 20),   # gentle rise
     pygame.Rect(650,  VIRTUAL_H - 160, 200, 20),   # continue up
-    pygame.Rect(900,  VIRTUAL_H - 140, 160, 20),   # slight drop
+    FootballPlatform(900,  VIRTUAL_H - 140, 160, 20),   # slight drop
     
     # Upper path (challenge route)
     pygame.Rect(200,  VIRTUAL_H - 280, 140, 20),   # high jump start
     pygame.Rect(480,  VIRTUAL_H - 360, 160, 20),   # very high platform
-    pygame.Rect(720,  VIRTUAL_H - 320, 180, 20),   # stay high
+    FootballPlatform(720,  VIRTUAL_H - 320, 180, 20),   # stay high
     pygame.Rect(980,  VIRTUAL_H - 400, 140, 20),   # sky platform
 
     # === ZONE 2 (1000-2000): Multi-Path Divergence ===
     # Lower-middle path
     pygame.Rect(1100, VIRTUAL_H - 180, 180, 20),
-    pygame.Rect(1350, VIRTUAL_H - 200, 160, 20),
+    FootballPlatform(1350, VIRTUAL_H - 200, 160, 20),
     pygame.Rect(1600, VIRTUAL_H - 160, 200, 20),
     pygame.Rect(1850, VIRTUAL_H - 220, 180, 20),
     
     # Middle path (main route)
-    pygame.Rect(1200, VIRTUAL_H - 280, 160, 20),
+    FootballPlatform(1200, VIRTUAL_H - 280, 160, 20),
     pygame.Rect(1450, VIRTUAL_H - 320, 180, 20),
     pygame.Rect(1700, VIRTUAL_H - 300, 160, 20),
-    pygame.Rect(1900, VIRTUAL_H - 340, 180, 20),
+    FootballPlatform(1900, VIRTUAL_H - 340, 180, 20),
     
     # Upper path (continues high)
     pygame.Rect(1150, VIRTUAL_H - 420, 140, 20),
     pygame.Rect(1400, VIRTUAL_H - 460, 160, 20),
-    pygame.Rect(1650, VIRTUAL_H - 440, 180, 20),
+    FootballPlatform(1650, VIRTUAL_H - 440, 180, 20),
     pygame.Rect(1950, VIRTUAL_H - 480, 140, 20),   # near ceiling
 
     # === ZONE 3 (2000-3000): Interconnected Maze ===
     # Connecting platforms (path switching opportunities)
     pygame.Rect(2100, VIRTUAL_H - 160, 120, 20),   # low connector
-    pygame.Rect(2100, VIRTUAL_H - 260, 120, 20),   # mid connector  
+    FootballPlatform(2100, VIRTUAL_H - 260, 120, 20),   # mid connector  
     pygame.Rect(2100, VIRTUAL_H - 380, 120, 20),   # high connector
     
     # Lower maze section
     pygame.Rect(2300, VIRTUAL_H - 140, 180, 20),
-    pygame.Rect(2550, VIRTUAL_H - 180, 160, 20),
+    FootballPlatform(2550, VIRTUAL_H - 180, 160, 20),
     pygame.Rect(2800, VIRTUAL_H - 120, 200, 20),
     
     # Middle maze section
     pygame.Rect(2350, VIRTUAL_H - 280, 160, 20),
-    pygame.Rect(2580, VIRTUAL_H - 320, 180, 20),
+    FootballPlatform(2580, VIRTUAL_H - 320, 180, 20),
     pygame.Rect(2850, VIRTUAL_H - 260, 180, 20),
     
     # Upper maze section
     pygame.Rect(2280, VIRTUAL_H - 420, 140, 20),
-    pygame.Rect(2500, VIRTUAL_H - 460, 160, 20),
+    FootballPlatform(2500, VIRTUAL_H - 460, 160, 20),
     pygame.Rect(2750, VIRTUAL_H - 400, 180, 20),
 
     # === ZONE 4 (3000-4000): Vertical Challenge Tower ===
     # Multi-tier climbing section
     pygame.Rect(3100, VIRTUAL_H - 140, 160, 20),   # base level
-    pygame.Rect(3350, VIRTUAL_H - 200, 140, 20),   # step up
+    FootballPlatform(3350, VIRTUAL_H - 200, 140, 20),   # step up
     pygame.Rect(3200, VIRTUAL_H - 280, 160, 20),   # zigzag back
     pygame.Rect(3450, VIRTUAL_H - 340, 140, 20),   # continue up
-    pygame.Rect(3300, VIRTUAL_H - 420, 160, 20),   # near top
+    FootballPlatform(3300, VIRTUAL_H - 420, 160, 20),   # near top
     pygame.Rect(3550, VIRTUAL_H - 460, 140, 20),   # peak platform
     
     # Alternative lower route through zone 4
     pygame.Rect(3650, VIRTUAL_H - 160, 200, 20),   # bypass low
-    pygame.Rect(3900, VIRTUAL_H - 200, 180, 20),   # gentle climb  # top “sky box”
+    FootballPlatform(3900, VIRTUAL_H - 200, 180, 20),   # gentle climb  # top “sky box”
 
     # === ZONE 5 (4000-5000): Final Approaches ===
     # Multiple final paths to flag
@@ -205,17 +878,17 @@ PLATFORMS = [
     # High dramatic approach
     pygame.Rect(4100, VIRTUAL_H - 400, 160, 20),   # high start
     pygame.Rect(4350, VIRTUAL_H - 360, 180, 20),   # descent begins
-    pygame.Rect(4600, VIRTUAL_H - 280, 160, 20),   # coming down
+    FootballPlatform(4600, VIRTUAL_H - 280, 160, 20),   # coming down
     pygame.Rect(4820, VIRTUAL_H - 200, 180, 20),   # final high platform
     
     # Middle steady approach  
     pygame.Rect(4150, VIRTUAL_H - 260, 180, 20),   # mid-level start
-    pygame.Rect(4400, VIRTUAL_H - 240, 160, 20),   # steady progress
+    FootballPlatform(4400, VIRTUAL_H - 240, 160, 20),   # steady progress
     pygame.Rect(4650, VIRTUAL_H - 220, 180, 20),   # approach flag level
     
     # Lower safe approach
     pygame.Rect(4200, VIRTUAL_H - 160, 200, 20),   # low but safe
-    pygame.Rect(4500, VIRTUAL_H - 140, 160, 20),   # easy progression
+    FootballPlatform(4500, VIRTUAL_H - 140, 160, 20),   # easy progression
     pygame.Rect(4750, VIRTUAL_H - 120, 180, 20),   # safe final jump
     
     # Victory platform (where flag sits)
@@ -223,25 +896,25 @@ PLATFORMS = [
 
     # === ZONE 6 (5000-6000): Extended Challenge Gauntlet ===
     # Lower tier platforms
-    pygame.Rect(5100, VIRTUAL_H - 120, 180, 20),   # continuation from zone 5
+    FootballPlatform(5100, VIRTUAL_H - 120, 180, 20),   # continuation from zone 5
     pygame.Rect(5350, VIRTUAL_H - 140, 160, 20),   # gentle rise
     pygame.Rect(5600, VIRTUAL_H - 180, 200, 20),   # step up
-    pygame.Rect(5850, VIRTUAL_H - 160, 180, 20),   # slight drop
+    FootballPlatform(5850, VIRTUAL_H - 160, 180, 20),   # slight drop
     
     # Middle tier platforms
     pygame.Rect(5150, VIRTUAL_H - 240, 160, 20),   # mid-level progression
     pygame.Rect(5400, VIRTUAL_H - 280, 180, 20),   # climb higher
-    pygame.Rect(5650, VIRTUAL_H - 320, 160, 20),   # peak middle
+    FootballPlatform(5650, VIRTUAL_H - 320, 160, 20),   # peak middle
     pygame.Rect(5900, VIRTUAL_H - 260, 200, 20),   # descent back
     
     # Upper tier platforms (high skill)
     pygame.Rect(5200, VIRTUAL_H - 380, 140, 20),   # high start
-    pygame.Rect(5450, VIRTUAL_H - 420, 160, 20),   # very high
+    FootballPlatform(5450, VIRTUAL_H - 420, 160, 20),   # very high
     pygame.Rect(5700, VIRTUAL_H - 460, 140, 20),   # near ceiling
     pygame.Rect(5950, VIRTUAL_H - 400, 180, 20),   # high descent
     
     # Connector platforms for path switching
-    pygame.Rect(5300, VIRTUAL_H - 200, 120, 20),   # low-mid connector
+    FootballPlatform(5300, VIRTUAL_H - 200, 120, 20),   # low-mid connector
     pygame.Rect(5550, VIRTUAL_H - 340, 120, 20),   # mid-high connector
     pygame.Rect(5800, VIRTUAL_H - 220, 120, 20),   # another low-mid connector
 
@@ -249,25 +922,25 @@ PLATFORMS = [
     # Epic staircase section (multiple routes to grand finale)
     
     # Lower epic route
-    pygame.Rect(6100, VIRTUAL_H - 140, 160, 20),   # epic start low
+    FootballPlatform(6100, VIRTUAL_H - 140, 160, 20),   # epic start low
     pygame.Rect(6350, VIRTUAL_H - 120, 180, 20),   # steady low
     pygame.Rect(6600, VIRTUAL_H - 160, 160, 20),   # rise slightly
-    pygame.Rect(6850, VIRTUAL_H - 180, 200, 20),   # final low approach
+    FootballPlatform(6850, VIRTUAL_H - 180, 200, 20),   # final low approach
     
     # Middle epic route
     pygame.Rect(6150, VIRTUAL_H - 260, 180, 20),   # epic start mid
     pygame.Rect(6400, VIRTUAL_H - 300, 160, 20),   # climb up
-    pygame.Rect(6650, VIRTUAL_H - 280, 180, 20),   # plateau
+    FootballPlatform(6650, VIRTUAL_H - 280, 180, 20),   # plateau
     pygame.Rect(6900, VIRTUAL_H - 240, 160, 20),   # final mid approach
     
     # Upper epic route (extreme challenge)
     pygame.Rect(6120, VIRTUAL_H - 420, 140, 20),   # epic start high
-    pygame.Rect(6380, VIRTUAL_H - 460, 160, 20),   # maximum height
+    FootballPlatform(6380, VIRTUAL_H - 460, 160, 20),   # maximum height
     pygame.Rect(6620, VIRTUAL_H - 480, 140, 20),   # ceiling platform
     pygame.Rect(6870, VIRTUAL_H - 440, 180, 20),   # epic descent
     
     # Grand finale connecting platforms
-    pygame.Rect(6050, VIRTUAL_H - 180, 120, 20),   # zone 6-7 connector low
+    FootballPlatform(6050, VIRTUAL_H - 180, 120, 20),   # zone 6-7 connector low
     pygame.Rect(6050, VIRTUAL_H - 320, 120, 20),   # zone 6-7 connector mid
     pygame.Rect(6050, VIRTUAL_H - 380, 120, 20),   # zone 6-7 connector high
     
@@ -287,7 +960,8 @@ PLATFORMS = [
 
 
 #FLAG_RECT = pygame.Rect(VIRTUAL_W - 70, VIRTUAL_H - 160, 20, 120)
-FLAG_RECT = pygame.Rect(WORLD_WIDTH - 70, VIRTUAL_H - 160, 20, 120)
+# On the final victory platform: past it there is only a fall (and a respawn)
+FLAG_RECT = pygame.Rect(PLATFORMS[-1].right - 50, PLATFORMS[-1].top - 120, 20, 120)
 
 
 FOOTBALLS = []
@@ -302,6 +976,59 @@ death_animation_active = False
 death_animation_time = 0.0
 death_launch_velocity = -18  # Initial upward velocity for death launch
 
+# Confetti pieces share pre-scaled images (a few size buckets) instead of each
+# holding a private smoothscaled copy of the 1275x850 source.
+CONFETTI_BUCKETS = 6
+CONFETTI_MAX = 400       # live pieces; lowered if particle memory runs over budget
+_confetti_images = {}
+
+
+def confetti_image(img, size_scale):
+    span = CONFETTI_BUCKETS - 1
+    bucket = round((min(max(size_scale, 0.3), 0.6) - 0.3) / 0.3 * span) if span else 0
+    key = (img, CONFETTI_BUCKETS, bucket)
+    scaled = _confetti_images.get(key)
+    if scaled is None:
+        scale = 0.3 + (0.3 * bucket / span if span else 0.15)
+        orig_w, orig_h = img.get_size()
+        new_w = max(5, int(orig_w * scale))
+        new_h = max(5, int(orig_h * scale))
+        scaled = surfaces.track(pygame.transform.smoothscale(img, (new_w, new_h)), "particles")
+        _confetti_images[key] = scaled
+    return scaled
+
+
+def degrade_confetti():
+    """Over budget: fewer size buckets and fewer live pieces."""
+    global CONFETTI_BUCKETS, CONFETTI_MAX
+    CONFETTI_BUCKETS = max(1, CONFETTI_BUCKETS // 2)
+    CONFETTI_MAX = max(25, CONFETTI_MAX // 2)
+    _confetti_images.clear()
+    del confetti_particles[CONFETTI_MAX:]
+    # Move survivors onto the new buckets so the old images are freed now
+    for p in confetti_particles:
+        if p.img is not None:
+            p.img = confetti_image(CONFETTI_IMG, p.size_scale)
+
+
+surfaces.on_over_budget("particles", degrade_confetti)
+
+
+CONFETTI_ROTATION_STEP = 10  # degrees; fallback blocks are cached per step
+_rotation_cache = {}
+
+
+def rotated_block(color, size, angle):
+    step = int(angle // CONFETTI_ROTATION_STEP) % (360 // CONFETTI_ROTATION_STEP)
+    key = (color, size, step)
+    surf = _rotation_cache.get(key)
+    if surf is None:
+        block = solid_surface(color + (255,), (size, size))
+        surf = surfaces.track(pygame.transform.rotate(block, step * CONFETTI_ROTATION_STEP), "caches")
+        _rotation_cache[key] = surf
+    return surf
+
+
 class ConfettiParticle:
     def __init__(self, x, y, img=None):
         self.x = x
@@ -317,11 +1044,8 @@ class ConfettiParticle:
         self.size_scale = random.uniform(0.3, 0.6)  # 30-60% of original size
         
         if img is not None:
-            # Scale down the confetti image
-            orig_w, orig_h = img.get_size()
-            new_w = max(5, int(orig_w * self.size_scale))
-            new_h = max(5, int(orig_h * self.size_scale))
-            self.img = pygame.transform.smoothscale(img, (new_w, new_h))
+            # Scaled-down confetti image, shared with other pieces of similar size
+            self.img = confetti_image(img, self.size_scale)
         else:
             # Fallback rectangle size
             self.img = None
@@ -351,81 +1075,199 @@ class ConfettiParticle:
         # Return True if particle should be removed
         return self.age >= self.life_time
     
-    def draw(self, surf):
+    def blit_item(self):
+        """(surface, top-left) of this frame's rotated piece, in virtual coordinates."""
         if self.img is not None:
             # Rotate the image
             rotated_img = pygame.transform.rotate(self.img, self.rotation)
-            # Calculate position to center the rotated image
-            rect = rotated_img.get_rect(center=(int(self.x), int(self.y)))
-            surf.blit(rotated_img, rect.topleft)
         else:
-            # Draw simple rotating rectangle
-            # Create a small surface for the rectangle
-            rect_surf = pygame.Surface((self.size, self.size), pygame.SRCALPHA)
-            pygame.draw.rect(rect_surf, self.color, (0, 0, self.size, self.size))
-            # Rotate and blit
-            rotated_rect = pygame.transform.rotate(rect_surf, self.rotation)
-            rect_pos = rotated_rect.get_rect(center=(int(self.x), int(self.y)))
-            surf.blit(rotated_rect, rect_pos.topleft)
+            # Simple rotating rectangle; tiny, so every rotation step is cached
+            rotated_img = rotated_block(self.color, self.size, self.rotation)
+        # Calculate position to center the rotated image
+        rect = rotated_img.get_rect(center=(int(self.x), int(self.y)))
+        return rotated_img, rect.topleft
+
+
+def football_rect(platform):
+    # Place football in center of platform, slightly above it
+    football_x = platform.centerx - 9  # center the 18px wide football
+    football_y = platform.top - 15     # place above platform
+    return pygame.Rect(football_x, football_y, 18, 12)
 
 
 def place_footballs():
     global FOOTBALLS
     FOOTBALLS = []
-    
-    # Place footballs on platforms throughout the extended 7000px level
-    # Distribute evenly across all elevated platforms (skip ground floor platform[0])
-    selected_platforms = [
-        # Zone 1 platforms
-        1, 2, 3, 4, 5, 6, 7, 8,
-        # Zone 2 platforms  
-        9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20,
-        # Zone 3 platforms
-        21, 22, 23, 24, 25, 26, 27, 28, 29, 30, 31, 32,
-        # Zone 4 platforms
-        33, 34, 35, 36, 37, 38, 39, 40,
-        # Zone 5 platforms  
-        41, 42, 43, 44, 45, 46, 47, 48, 49, 50, 51,
-        # Zone 6 platforms (NEW)
-        52, 53, 54, 55, 56, 57, 58, 59, 60, 61, 62, 63, 64,
-        # Zone 7 platforms (NEW)
-        65, 66, 67, 68, 69, 70, 71, 72, 73, 74, 75, 76, 77, 78, 79, 80, 81
-    ]
-    
-    # Select every 3rd platform to get good distribution (about 25-27 footballs total)
-    football_platforms = selected_platforms[::3]  # Every 3rd platform
-    
-    for platform_idx in football_platforms:
-        if platform_idx < len(PLATFORMS):
-            platform = PLATFORMS[platform_idx]
-            # Place football in center of platform, slightly above it
-            football_x = platform.centerx - 9  # center the 18px wide football
-            football_y = platform.top - 15     # place above platform
-            FOOTBALLS.append(pygame.Rect(football_x, football_y, 18, 12))
-
-
 
-
-
-place_footballs()
+    for platform in current_level.football_spots:
+        FOOTBALLS.append(football_rect(platform))
 
 # ------------------------------
-# Enemy with advanced patrol + flex/grunt
+# Audio (mixer unlocked on first tap, sounds decoded off the input path)
 # ------------------------------
 try:
     pygame.mixer.pre_init(44100, -16, 2, 512)
 except Exception:
     pass
 
+AUDIO_CHANNELS = 8  # total voice budget; a full horde shares these
+HEARING_RADIUS = VIRTUAL_W  # world px from the camera centre beyond which sounds are culled
+
+
+class AudioManager:
+    """Plays short effects through a fixed channel budget.
+
+    - unlock() only opens the mixer (iOS requires it inside a tap); decoding is
+      queued and done one sound per frame by pump(), so input is never stalled.
+    - Missing or undecodable files are remembered once; play() is then a no-op.
+    - Each sound has a voice cap, and when every channel is busy the quietest,
+      oldest voice is stolen if the new one is louder.
+    - Sounds are attenuated and panned by distance from the camera centre, and
+      culled entirely past HEARING_RADIUS.
+    """
+
+    def __init__(self, channels=AUDIO_CHANNELS, hearing_radius=HEARING_RADIUS):
+        self.num_channels = channels
+        self.hearing_radius = hearing_radius
+        self.listener_x = VIRTUAL_W // 2
+        self.ready = False
+        self.failed = False
+        self.specs = {}     # name -> (path, volume, max_voices)
+        self.sounds = {}    # name -> decoded pygame.mixer.Sound
+        self.pending = []   # names waiting to be decoded by pump()
+        self.missing = set()
+        self.channels = []
+        self.voices = []    # per channel: (name, gain, started_ms) or None
+
+    def register(self, name, path, volume=1.0, max_voices=2):
+        self.specs[name] = (path, volume, max_voices)
+        if not os.path.exists(path):
+            self.missing.add(name)
+        else:
+            self.pending.append(name)
+
+    def unlock(self):
+        """Open the mixer. Call from the first user gesture; cheap to call again."""
+        if self.ready or self.failed:
+            return
+        try:
+            pygame.mixer.init()
+            pygame.mixer.set_num_channels(self.num_channels)
+            self.channels = [pygame.mixer.Channel(i) for i in range(self.num_channels)]
+            self.voices = [None] * self.num_channels
+            self.ready = True
+        except Exception:
+            self.failed = True
+
+    def pump(self):
+        """Decode at most one queued sound. Called once per frame from the main loop."""
+        if not self.ready or not self.pending:
+            return
+        name = self.pending.pop(0)
+        try:
+            self.sounds[name] = pygame.mixer.Sound(self.specs[name][0])
+        except Exception:
+            self.missing.add(name)
+
+    def play(self, name, world_x=None):
+        snd = self.sounds.get(name)
+        if snd is None:
+            return  # not unlocked, not decoded yet, or missing
+        _, volume, max_voices = self.specs[name]
+
+        if world_x is None:
+            left = right = gain = 1.0
+        else:
+            d = world_x - self.listener_x
+            gain = 1.0 - abs(d) / self.hearing_radius
+            if gain <= 0.0:
+                return
+            pan = d / self.hearing_radius
+            left = gain * min(1.0, 1.0 - pan)
+            right = gain * min(1.0, 1.0 + pan)
+
+        slot = self._pick_channel(name, gain, max_voices)
+        if slot is None:
+            return
+        ch = self.channels[slot]
+        try:
+            ch.play(snd)
+            ch.set_volume(left * volume, right * volume)
+        except Exception:
+            return
+        self.voices[slot] = (name, gain, time.perf_counter())
+
+    def _pick_channel(self, name, gain, max_voices):
+        free = None
+        same = []   # busy slots already playing this sound
+        busy = []
+        for i, ch in enumerate(self.channels):
+            if not ch.get_busy():
+                self.voices[i] = None
+                if free is None:
+                    free = i
+                continue
+            busy.append(i)
+            if self.voices[i] is not None and self.voices[i][0] == name:
+                same.append(i)
+
+        if len(same) >= max_voices:
+            return self._steal(same, gain)
+        if free is not None:
+            return free
+        return self._steal(busy, gain)
+
+    def _steal(self, slots, gain):
+        """Quietest, then oldest, voice among slots if the new sound is louder."""
+        victim = None
+        for i in slots:
+            v = self.voices[i]
+            key = (v[1], v[2]) if v is not None else (0.0, 0.0)
+            if victim is None or key < victim[0]:
+                victim = (key, i)
+        if victim is None or victim[0][0] >= gain:
+            return None
+        self.channels[victim[1]].stop()
+        return victim[1]
+
+
+audio = AudioManager()
+audio.register("grunt", AS_GRUNT, volume=1.0, max_voices=2)
+
+# ------------------------------
+# Enemy with advanced patrol + flex/grunt
+# ------------------------------
+
+
+def _rect_step(v):
+    """Pixels a Rect actually moves when `v` is added to an integer coordinate."""
+    r = pygame.Rect(1000, 0, 1, 1)
+    r.left = 1000 + v
+    return r.left - 1000
+
+
+def _drain_pause(timer, dt, frames):
+    """Run up to `frames` pause ticks; returns (ticks used, timer left). Stops once the timer expires."""
+    if dt <= 0:
+        return frames, timer
+    used = 0
+    while used < frames:
+        timer -= dt
+        used += 1
+        if timer <= 0:
+            break
+    return used, timer
+
 
 class Enemy:
-    def __init__(self, start_x, y, speed=1.4):
-        # Find platform (match y to platform top)
-        self.platform = None
-        for p in PLATFORMS:
-            if abs(y - p.top) <= 1:
-                self.platform = p
-                break
+    def __init__(self, start_x, y, speed=1.4, platform=None):
+        # Find platform (match y to platform top) unless told which one
+        self.platform = platform
+        if platform is None:
+            for p in PLATFORMS:
+                if abs(y - p.top) <= 1:
+                    self.platform = p
+                    break
         if self.platform is None:
             self.platform = PLATFORMS[0]
             y = self.platform.top
@@ -445,9 +1287,14 @@ class Enemy:
 
         self.rect.left = max(self.left_bound, min(start_x, self.right_bound))
         self.rect.bottom = y
+        self.slot = None  # its enemy_layout entry, when built by Level.build_enemy
 
         self.vx = speed
         self.facing_right = True
+        # Whole-pixel distance one patrol frame actually moves (Rect rounds the float position)
+        self.step_r = _rect_step(abs(speed))
+        self.step_l = _rect_step(-abs(speed))
+        self._bounds = self.rect.copy()
 
         # Pause / flex state
         self.state = "move"          # or "pause"
@@ -455,17 +1302,21 @@ class Enemy:
         self.flex_this_pause = False
         self.next_flex_toggle = True  # every other turn
 
-    def _start_pause(self):
+    def fit_platform(self):
+        """Patrol the platform as it is now, after an edit moved or resized it."""
+        self.left_bound = self.platform.left
+        self.right_bound = self.platform.right - self.rect.width
+        self.rect.left = max(self.left_bound, min(self.rect.left, self.right_bound))
+        self.rect.bottom = self.platform.top
+
+    def _start_pause(self, silent=False):
         self.state = "pause"
         self.pause_timer = 1.0  # seconds
         self.flex_this_pause = self.next_flex_toggle
         self.next_flex_toggle = not self.next_flex_toggle
-        # Play grunt if allowed and available
-        if self.flex_this_pause and mixer_ready and (GRUNT_SFX is not None):
-            try:
-                GRUNT_SFX.play()
-            except Exception:
-                pass
+        # Grunt; the audio manager culls/attenuates by distance from the camera
+        if self.flex_this_pause and not silent:
+            audio.play("grunt", self.rect.centerx)
 
     def _end_pause_and_turn(self):
         self.vx = -self.vx
@@ -495,80 +1346,936 @@ class Enemy:
             else:
                 self.rect.left = next_left
 
-    def draw(self, surf):
-        if self.img_r is not None:
-            img = self.img_r if self.facing_right else self.img_l
-            if self.state == "pause" and self.flex_this_pause:
-                scale = 1.12
-                w = int(img.get_width() * scale)
-                h = int(img.get_height() * scale)
-                flex_img = pygame.transform.smoothscale(img, (w, h))
-                draw_x = self.rect.centerx - flex_img.get_width() // 2
-                draw_y = self.rect.bottom - flex_img.get_height()
-                surf.blit(flex_img, (draw_x, draw_y))
-            else:
-                surf.blit(img, self.rect.topleft)
+    def _steps_to_bound(self, left, going_right):
+        """Plain moves from `left` before the frame that reaches the bound (None if it never does)."""
+        if going_right:
+            vx, step, bound = abs(self.vx), self.step_r, self.right_bound
+            arrived = lambda k: left + k * step + vx >= bound
         else:
-            pygame.draw.rect(surf, (50, 50, 50), self.rect)
-
-    def draw_offset(self, surf, camera_x):
-        if self.img_r is not None:
-            img = self.img_r if self.facing_right else self.img_l
-            if self.state == "pause" and self.flex_this_pause:
-                scale = 1.12
-                w = int(img.get_width() * scale)
-                h = int(img.get_height() * scale)
-                flex_img = pygame.transform.smoothscale(img, (w, h))
-                draw_x = self.rect.centerx - flex_img.get_width() // 2 - camera_x
-                draw_y = self.rect.bottom - flex_img.get_height()
-                surf.blit(flex_img, (draw_x, draw_y))
-            else:
-                surf.blit(img, (self.rect.x - camera_x, self.rect.y))
+            vx, step, bound = -abs(self.vx), self.step_l, self.left_bound
+            arrived = lambda k: left + k * step + vx <= bound
+        if arrived(0):
+            return 0
+        if step == 0 or (step > 0) != going_right:
+            return None
+        # Closed-form estimate, then nudge to agree exactly with update()'s float test
+        k = max(0, math.ceil((bound - vx - left) / step))
+        while k > 0 and arrived(k - 1):
+            k -= 1
+        while not arrived(k):
+            k += 1
+        return k
+
+    def _cycle_frames(self, dt):
+        """Frames from arriving at a bound until arriving there again (None if the patrol stalls)."""
+        pause = _drain_pause(1.0, dt, 1 << 30)[0]
+        to_left = self._steps_to_bound(self.right_bound, False)
+        to_right = self._steps_to_bound(self.left_bound, True)
+        if to_left is None or to_right is None:
+            return None
+        return 2 * pause + (to_left + 1) + (to_right + 1)
+
+    def catch_up(self, frames, dt):
+        """Advance the patrol by `frames` updates of `dt` seconds without stepping through them.
+
+        Used when a sleeping enemy wakes up. Movement is per frame and pauses are
+        timed, as in update(), so the result matches per-frame updates exactly under
+        a fixed timestep. Whole patrol cycles are skipped with a modulo.
+        """
+        cycle = None
+        while frames > 0:
+            if self.state == "pause":
+                used, self.pause_timer = _drain_pause(self.pause_timer, dt, frames)
+                frames -= used
+                if self.pause_timer <= 0:
+                    self._end_pause_and_turn()
+                continue
+
+            going_right = self.vx > 0
+            steps = self._steps_to_bound(self.rect.left, going_right)
+            step = self.step_r if going_right else self.step_l
+            if steps is None or frames <= steps:
+                if steps is not None:
+                    self.rect.left += frames * step
+                return
+            frames -= steps + 1
+            self.rect.left = self.right_bound if going_right else self.left_bound
+            self._start_pause(silent=True)
+            # Just arrived at a bound: the state now repeats every cycle
+            if cycle is None:
+                cycle = self._cycle_frames(dt)
+                if cycle:
+                    frames %= cycle
+
+    def sprite(self):
+        """(image, x, y) as drawn this frame; image is None for the plain block fallback."""
+        if self.img_r is None:
+            return None, self.rect.x, self.rect.y
+        img = self.img_r if self.facing_right else self.img_l
+        if self.state == "pause" and self.flex_this_pause:
+            flex_img = ENEMY_FLEX[img]
+            # Flexing grows upward and outward from the feet
+            return flex_img, self.rect.centerx - flex_img.get_width() // 2, self.rect.bottom - flex_img.get_height()
+        return img, self.rect.x, self.rect.y
+
+    def bounds(self):
+        """Box of the sprite as drawn this frame (broadphase)."""
+        img, x, y = self.sprite()
+        if img is None:
+            self._bounds.update(self.rect)
         else:
-            pygame.draw.rect(surf, (50, 50, 50), pygame.Rect(self.rect.x - camera_x, self.rect.y, self.rect.w, self.rect.h))
+            self._bounds.update(x, y, img.get_width(), img.get_height())
+        return self._bounds
+
+    def queue_draw(self, rq):
+        img, x, y = self.sprite()
+        if img is None:
+            img = solid_surface((50, 50, 50), self.rect.size)
+        rq.submit(LAYER_ENEMIES, img, x, y)
 
 
-ENEMIES = [
+# (start_x, platform index, speed) for each OU defender
+ENEMY_LAYOUT = [
     # Zone 1 - placed on lower path platforms for easier introduction
-    Enemy(500,  PLATFORMS[2].top,  speed=1.1),   # on gentle rise platform (x=400)
-    Enemy(750,  PLATFORMS[4].top,  speed=1.1),   # on slight drop platform (x=900)
+    (500, 2, 1.1),   # on gentle rise platform (x=400)
+    (750, 4, 1.1),   # on slight drop platform (x=900)
 
     # Zone 2 - spread across different height paths  
-    Enemy(1200, PLATFORMS[9].top,  speed=1.2),   # lower-middle path (x=1100)
-    Enemy(1500, PLATFORMS[13].top, speed=1.3),   # middle path (x=1200)
-    Enemy(1750, PLATFORMS[16].top, speed=1.2),   # middle path (x=1900)
+    (1200, 9, 1.2),   # lower-middle path (x=1100)
+    (1500, 13, 1.3),   # middle path (x=1200)
+    (1750, 16, 1.2),   # middle path (x=1900)
 
     # Zone 3 - maze section enemies on connectors and main paths
-    Enemy(2120, PLATFORMS[21].top, speed=1.3),   # low connector platform (x=2100)
-    Enemy(2400, PLATFORMS[24].top, speed=1.3),   # lower maze section (x=2300)
-    Enemy(2600, PLATFORMS[27].top, speed=1.4),   # middle maze section (x=2350)
-    Enemy(2350, PLATFORMS[30].top, speed=1.3),   # upper maze section (x=2280)
+    (2120, 21, 1.3),   # low connector platform (x=2100)
+    (2400, 24, 1.3),   # lower maze section (x=2300)
+    (2600, 27, 1.4),   # middle maze section (x=2350)
+    (2350, 30, 1.3),   # upper maze section (x=2280)
 
     # Zone 4 - tower climbing challenges
-    Enemy(3200, PLATFORMS[33].top, speed=1.4),   # base level (x=3100)
-    Enemy(3400, PLATFORMS[34].top, speed=1.4),   # step up (x=3350)
-    Enemy(3500, PLATFORMS[36].top, speed=1.4),   # continue up (x=3450)
-    Enemy(3750, PLATFORMS[39].top, speed=1.3),   # bypass low (x=3650)
+    (3200, 33, 1.4),   # base level (x=3100)
+    (3400, 34, 1.4),   # step up (x=3350)
+    (3500, 36, 1.4),   # continue up (x=3450)
+    (3750, 39, 1.3),   # bypass low (x=3650)
 
     # Zone 5 - final approach guards
-    Enemy(4200, PLATFORMS[45].top, speed=1.4),   # middle steady approach (x=4150)
-    Enemy(4550, PLATFORMS[49].top, speed=1.5),   # lower safe approach (x=4500)
+    (4200, 45, 1.4),   # middle steady approach (x=4150)
+    (4550, 49, 1.5),   # lower safe approach (x=4500)
     
     # Zone 6 - extended challenge gauntlet
-    Enemy(5200, PLATFORMS[53].top, speed=1.3),   # lower tier (x=5100)
-    Enemy(5450, PLATFORMS[55].top, speed=1.4),   # middle tier (x=5400)
-    Enemy(5750, PLATFORMS[58].top, speed=1.5),   # upper tier (x=5700)
-    Enemy(5320, PLATFORMS[62].top, speed=1.3),   # connector platform (x=5300)
-    Enemy(5920, PLATFORMS[56].top, speed=1.4),   # middle tier end (x=5900)
+    (5200, 53, 1.3),   # lower tier (x=5100)
+    (5450, 55, 1.4),   # middle tier (x=5400)
+    (5750, 58, 1.5),   # upper tier (x=5700)
+    (5320, 62, 1.3),   # connector platform (x=5300)
+    (5920, 56, 1.4),   # middle tier end (x=5900)
     
     # Zone 7 - final epic challenge
-    Enemy(6200, PLATFORMS[66].top, speed=1.4),   # epic start low (x=6100)
-    Enemy(6450, PLATFORMS[68].top, speed=1.5),   # middle epic (x=6400)
-    Enemy(6700, PLATFORMS[71].top, speed=1.6),   # upper epic (x=6620)
-    Enemy(6250, PLATFORMS[76].top, speed=1.5),   # zigzag challenge (x=6200)
-    Enemy(6850, PLATFORMS[67].top, speed=1.5),   # final mid approach (x=6900)
-    Enemy(7000, PLATFORMS[80].top, speed=1.6),   # penultimate platform (x=6980)
+    (6200, 66, 1.4),   # epic start low (x=6100)
+    (6450, 68, 1.5),   # middle epic (x=6400)
+    (6700, 71, 1.6),   # upper epic (x=6620)
+    (6250, 76, 1.5),   # zigzag challenge (x=6200)
+    (6850, 67, 1.5),   # final mid approach (x=6900)
+    (7000, 80, 1.6),   # penultimate platform (x=6980)
 ]
+ENEMIES = []  # built by build_enemies() once assets are loaded
+
+
+def build_enemies():
+    return current_level.build_enemies()
+
+
+# ------------------------------
+# Levels (level 1 is the layout above; later ones are generated)
+# ------------------------------
+LEVEL_COUNT = 4
+GROUND_Y = VIRTUAL_H - 40
+GRID_CELL = 256           # world px per column of the platform index
+CHUNK_W = 512             # world px per baked platform chunk (one bake step each)
+CHUNK_KEY = (255, 0, 255)  # colorkey of the baked chunks
+
+
+class Level:
+    """One level's content plus what is pre-baked for it.
+
+    Baked (by the prefetcher, a step at a time): a column grid of platforms
+    for collision, the enemies, and the platforms drawn into a few wide
+    colorkeyed chunks so a frame blits a couple of chunks instead of every
+    platform. Footballs sit on platforms (the objects, not their indices), so
+    they stay put when the list is edited (see LevelWatcher).
+    """
+
+    def __init__(self, number, platforms, enemy_layout, football_spots, flag,
+                 ground_count=1, enemies_by_height=False):
+        self.number = number
+        self.platforms = platforms
+        self.enemy_layout = enemy_layout
+        self.football_spots = football_spots
+        self.flag = flag
+        self.ground_count = ground_count  # the first platforms are ground, drawn brown
+        # Level 1's layout was tuned with each defender put on the first platform
+        # at its platform's height, not always the platform it names
+        self.enemies_by_height = enemies_by_height
+        self.grid = None
+        self._order = {}         # id(platform) -> index in platforms
+        self._near = {}
+        self.enemies = None      # prebuilt for the first activation
+        self.chunks = {}         # x0 -> (surface, x, y) once baked
+        self.chunks_ready = False
+        self.stale = set()       # x0 of chunks to re-bake after an edit
+
+    def enemy_platform(self, slot):
+        """The platform build_enemy(slot) puts its defender on."""
+        platform = self.platforms[self.enemy_layout[slot][1]]
+        if self.enemies_by_height:  # the first at its height, as Enemy finds it
+            platform = next(p for p in self.platforms if abs(platform.top - p.top) <= 1)
+        return platform
+
+    def build_enemy(self, slot):
+        """The defender for enemy_layout[slot]."""
+        x, idx, speed = self.enemy_layout[slot]
+        enemy = Enemy(x, self.platforms[idx].top, speed=speed, platform=self.enemy_platform(slot))
+        enemy.slot = slot
+        return enemy
+
+    def build_enemies(self):
+        return [self.build_enemy(slot) for slot in range(len(self.enemy_layout))]
+
+    def take_enemies(self):
+        enemies = self.enemies if self.enemies is not None else self.build_enemies()
+        self.enemies = None
+        return enemies
+
+    def build_grid(self):
+        grid = {}
+        for p in self.platforms:
+            for col in range(p.left // GRID_CELL, (p.right - 1) // GRID_CELL + 1):
+                grid.setdefault(col, []).append(p)
+        self._order = {id(p): i for i, p in enumerate(self.platforms)}
+        self._near = {}
+        self.grid = grid
+
+    def _columns(self, cols):
+        """(index, platform) in level order for the platforms in grid columns `cols`."""
+        found = {}
+        for col in cols:
+            for p in self.grid.get(col, ()):
+                found[id(p)] = p
+        order = self._order
+        return sorted((order[key], p) for key, p in found.items())
+
+    def platforms_near(self, rect):
+        """Platforms that rect could touch while being pushed out of any of them,
+        in level order (collision resolution order matters)."""
+        if self.grid is None:
+            self.build_grid()
+        key = ((rect.left - rect.w) // GRID_CELL, (rect.right + rect.w) // GRID_CELL)
+        near = self._near.get(key)
+        if near is None:
+            near = self._near[key] = [p for _, p in self._columns(range(key[0], key[1] + 1))]
+        return near
+
+    def platforms_within(self, left, right):
+        """(index, platform) in level order for platforms overlapping world x [left, right)."""
+        if self.grid is None:
+            self.build_grid()
+        cols = range(left // GRID_CELL, (right - 1) // GRID_CELL + 1)
+        return [(i, p) for i, p in self._columns(cols) if p.right > left and p.left < right]
+
+    def reindex(self, moved, added, removed):
+        """Patch the grid, the near cache and the baked chunks for edited platforms.
+
+        `moved` holds (platform, its box before the edit), both objects kept
+        in place; only grid columns and chunks under an old or new box are
+        touched.
+        """
+        if self.grid is None:
+            return
+        boxes = []
+        for p, old in moved:
+            self._unindex(p, old)
+            boxes.append(old)
+        for p in removed:
+            self._unindex(p, p)
+            boxes.append(p)
+        for p in [p for p, _ in moved] + added:
+            for col in range(p.left // GRID_CELL, (p.right - 1) // GRID_CELL + 1):
+                self.grid.setdefault(col, []).append(p)
+            boxes.append(p)
+        if added or removed:
+            self._order = {id(p): i for i, p in enumerate(self.platforms)}
+        spans = [(b.left // GRID_CELL - 1, (b.right - 1) // GRID_CELL + 1) for b in boxes]
+        for key in [k for k in self._near if any(k[0] <= hi and lo <= k[1] for lo, hi in spans)]:
+            del self._near[key]
+        if self.chunks_ready or self.chunks:  # chunks not baked yet will see the edit
+            for b in boxes:
+                for x0 in range(b.left // CHUNK_W * CHUNK_W, b.right, CHUNK_W):
+                    self.chunks.pop(x0, None)
+                    self.stale.add(x0)
+
+    def _unindex(self, p, box):
+        for col in range(box.left // GRID_CELL, (box.right - 1) // GRID_CELL + 1):
+            members = self.grid.get(col)
+            if members is not None:
+                members[:] = [q for q in members if q is not p]
+
+    def rebake_stale(self):
+        """Re-bake one chunk an edit made stale; False if there is nothing to do."""
+        if not self.chunks_ready or not self.stale:
+            return False
+        x0 = self.stale.pop()
+        chunk = self.bake_chunk(x0)
+        if chunk is not None:
+            self.chunks[x0] = chunk
+        return True
+
+    def bake_chunk(self, x0):
+        members = self.platforms_within(x0, x0 + CHUNK_W)
+        if not members:
+            return None
+        # Only as big as the platforms in it, clipped to the chunk's columns
+        left = max(x0, min(p.left for _, p in members))
+        right = min(x0 + CHUNK_W, max(p.right for _, p in members))
+        top = min(p.top for _, p in members)
+        bottom = max(p.bottom for _, p in members)
+        surf = pygame.Surface((right - left, bottom - top)).convert()
+        surf.fill(CHUNK_KEY)
+        for i, p in members:  # in level order: same overdraw as drawing them one by one
+            surf.blit(platform_surface(p, GROUND_BROWN if i < self.ground_count else BLOCK), (p.x - left, p.y - top))
+        surf.set_colorkey(CHUNK_KEY, pygame.RLEACCEL)
+        _rle_primer.blit(surf, (0, 0))  # RLE-encode now rather than on its first on-screen blit
+        return surfaces.track(surf, "level"), left, top
+
+    def bake_steps(self, active):
+        """Generator of small baking steps; `active` levels already have enemies."""
+        if self.grid is None:
+            self.build_grid()
+            yield
+        if not active and self.enemies is None:
+            self.enemies = self.build_enemies()
+            yield
+        if not self.chunks_ready and not NATIVE_RENDER:  # chunks are a virtual-canvas saving
+            self.chunks = {}
+            self.stale.clear()
+            right = max(p.right for p in self.platforms)
+            for x0 in range(0, right, CHUNK_W):
+                chunk = self.bake_chunk(x0)
+                if chunk is not None:
+                    self.chunks[x0] = chunk
+                yield
+            self.chunks_ready = True
+
+    def drop_chunks(self):
+        self.chunks_ready = False
+        self.chunks = {}
+        self.stale.clear()
+
+
+_rle_primer = pygame.Surface((1, 1))
+
+
+def generate_level(number):
+    """A generated level: ground stretches with jumpable gaps, two tiers of
+    platforms above, defenders on the ground and wider platforms.
+
+    With JUMP_VEL, GRAVITY and MOVE_SPEED a jump rises about 150px and carries
+    about 180px, so gaps stay under max_gap and each tier sits 100-130px above
+    the last (leaving headroom to walk underneath).
+    """
+    rng = random.Random(number * 7919)
+    max_gap = 120
+    length = min(WORLD_WIDTH - 200, 5000 + 700 * number)
+    speed = 1.2 + 0.15 * number
+    grounds, floats, layout, spots = [], [], [], []
+
+    x = 0
+    while x < length:
+        w = 900 if x == 0 else rng.randint(500, 1100)  # a safe start
+        grounds.append(pygame.Rect(x, GROUND_Y, w, 40))
+        # Floats stay clear of both ends so jumps over the gaps have headroom
+        px, end = x + rng.randint(200, 320), x + w - 200
+        while px + 90 <= end:
+            low = pygame.Rect(px, GROUND_Y - rng.randint(100, 130), min(rng.randint(90, 200), end - px), 20)
+            floats.append(low)
+            tier = pygame.Rect(low.right + rng.randint(20, 80), low.top - rng.randint(100, 130),
+                               rng.randint(90, 160), 20)
+            if rng.random() < 0.4 and tier.right <= end:
+                floats.append(tier)
+            px = floats[-1].right + rng.randint(60, 160)
+        x += w + rng.randint(60, max_gap)
+
+    platforms = grounds + floats
+    for i, p in enumerate(platforms):
+        if i < len(grounds):
+            if i > 0:
+                for _ in range(rng.randint(1, 2)):
+                    layout.append((p.left + rng.randint(0, p.width - 80), i, speed))
+        else:
+            if p.width >= 150 and rng.random() < 0.3:
+                layout.append((p.left, i, speed))
+            if (i - len(grounds)) % 2 == 0:
+                spots.append(p)
+
+    last = grounds[-1]
+    flag = pygame.Rect(last.right - 70, VIRTUAL_H - 160, 20, 120)
+    return Level(number, platforms, layout, spots, flag, ground_count=len(grounds))
+
+
+# Footballs go on every FootballPlatform entry (elevated ones throughout the level)
+LEVEL_1 = Level(1, PLATFORMS, ENEMY_LAYOUT, [p for p in PLATFORMS if isinstance(p, FootballPlatform)],
+                FLAG_RECT, enemies_by_height=True)
+current_level = LEVEL_1
+PREFETCH_BUDGET_S = 0.002  # most a frame gives the prefetcher, taken from its slack
+
+
+class LevelPrefetcher:
+    """Builds and bakes the next level a slice at a time.
+
+    The work is a generator of small steps (generate the geometry, build the
+    grid, the enemies, one chunk). Once per frame, after present, the main loop
+    grants whatever slack is left (at most PREFETCH_BUDGET_S) and steps run
+    right there until the next one would not fit, on the thread that owns the
+    level caches and the surface registry. Asking for a level that is not done
+    yet finishes it on the spot.
+    """
+
+    def __init__(self):
+        self.number = None
+        self.level = None
+        self._steps = None
+        self._lock = threading.Lock()
+        self._step_cost = 0.0
+
+    def start(self, number):
+        """Prefetch level `number` (None: none) after finishing the current level's own bake."""
+        with self._lock:
+            if number == self.number:
+                return
+            self.number = number
+            self.level = None
+            self._steps = self._build(number)
+
+    def _build(self, number):
+        yield from current_level.bake_steps(active=True)
+        if number is None:
+            return
+        level = LEVEL_1 if number == 1 else generate_level(number)
+        yield
+        yield from level.bake_steps(active=False)
+        self.level = level
+
+    def pump(self, budget_s):
+        """Run steps for up to budget_s: one at least, then only while the
+        slowest recent step would still fit."""
+        start = time.perf_counter()
+        end = start + budget_s
+        with self._lock:
+            while self._steps is not None:
+                try:
+                    next(self._steps)
+                except StopIteration:
+                    self._steps = None
+                    break
+                now = time.perf_counter()
+                self._step_cost = max(now - start, self._step_cost * 0.9)
+                if now + self._step_cost >= end:
+                    break
+                start = now
+
+    def hold(self):
+        """The lock steps run under: hold it to change a level that may be baking."""
+        return self._lock
+
+    def take(self, number):
+        """Level `number`, finished now if the prefetch has not got there (a stall)."""
+        self.start(number)
+        self.pump(float("inf"))
+        return self.level
+
+    def grant(self, budget_s):
+        """Spend up to budget_s of this frame's slack on steps, now."""
+        if self._steps is None or budget_s <= 0:
+            return
+        self.pump(budget_s)
+
+
+prefetcher = LevelPrefetcher()
+
+
+def activate_level(level):
+    """Make `level` the one being played and start prefetching the next."""
+    global current_level, PLATFORMS, ENEMY_LAYOUT, FLAG_RECT
+    current_level = level
+    PLATFORMS, ENEMY_LAYOUT, FLAG_RECT = level.platforms, level.enemy_layout, level.flag
+    place_footballs()
+    ENEMIES[:] = level.take_enemies()
+    enemy_scheduler.rebuild(ENEMIES)
+    # Players are entered by update_game; drop any from before, a replaced Player() too
+    broadphase.clear()
+    prefetcher.start(level.number + 1 if level.number < LEVEL_COUNT else None)
+
+
+def advance_level(player):
+    """Flag reached with levels to go: switch to the (prefetched) next level."""
+    activate_level(prefetcher.take(current_level.number + 1))
+    player.coins_collected = 0
+    player.coins_total = len(FOOTBALLS)
+    player.spawn()
+
+
+def drop_level_chunks():
+    """Over budget: unbake chunks, the prefetched level's first; drawing falls
+    back to platform by platform."""
+    for level in (prefetcher.level, LEVEL_1, current_level):
+        if level is not None and level.chunks_ready:
+            level.drop_chunks()
+            return
+
+
+surfaces.on_over_budget("level", drop_level_chunks)
+
+
+# ------------------------------
+# Level hot reload (desktop: python main.py --watch, or BEVO_WATCH=1)
+# ------------------------------
+WATCH = "--watch" in sys.argv or bool(os.environ.get("BEVO_WATCH"))
+WATCH_POLL_S = 0.25
+WATCHED_LISTS = ("PLATFORMS", "ENEMY_LAYOUT")  # level 1's, as written in this file
+
+
+def diff_entries(old, new):
+    """For each entry of `new`, the index of the `old` entry it continues (None
+    for a new one). Unchanged runs match by value; within a changed run entries
+    are paired in order, so an entry edited in place keeps its identity."""
+    import difflib  # watch mode only
+    n = min(len(old), len(new))
+    lo = 0
+    while lo < n and old[lo] == new[lo]:
+        lo += 1
+    hi_old, hi_new = len(old), len(new)
+    while hi_old > lo and hi_new > lo and old[hi_old - 1] == new[hi_new - 1]:
+        hi_old -= 1
+        hi_new -= 1
+    match = list(range(lo)) + [None] * (hi_new - lo) + list(range(hi_old, len(old)))
+    matcher = difflib.SequenceMatcher(None, old[lo:hi_old], new[lo:hi_new], autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag in ("equal", "replace"):
+            for k in range(min(i2 - i1, j2 - j1)):
+                match[lo + j1 + k] = lo + i1 + k
+    return match
+
+
+class LevelWatcher:
+    """Reloads level 1's PLATFORMS and ENEMY_LAYOUT from this file while the game runs.
+
+    A thread polls the file's mtime. On a change it reads just those two
+    assignments (entry by entry, see read_list; nothing else in the file
+    runs) and diffs them against the last version it read.
+    Session.frame applies the patches before each frame in pump(): edited
+    platforms are updated in place, so the footballs and defenders on them
+    follow, and only the grid columns, near-cache entries and baked chunks
+    under an edited platform are redone (stale chunks are re-baked one per
+    frame). Defenders whose entry changed, or whose entry now resolves to
+    another platform, are rebuilt; the player stays put. A football goes with
+    its FootballPlatform entry, so one written in, moved or taken out appears,
+    follows or disappears just as it would after a restart.
+    """
+
+    def __init__(self, path, level):
+        self.path = path
+        self.level = level
+        self.patches = deque()  # (list name, entries, diff_entries match), thread -> main loop
+        # The thread's own copies: the lists as last read
+        spots = {id(p) for p in level.football_spots}
+        self._seen = {"PLATFORMS": [(*p, id(p) in spots) for p in level.platforms],
+                      "ENEMY_LAYOUT": [tuple(e) for e in level.enemy_layout]}
+        self._namespace = dict(globals())  # what the lists may refer to (pygame, VIRTUAL_H...)
+        self._compiled = {}  # entry tokens -> value
+        self._mtime = os.stat(path).st_mtime_ns
+
+    def start(self):
+        threading.Thread(target=self._thread, name="level-watch", daemon=True).start()
+
+    def _thread(self):
+        while True:
+            time.sleep(WATCH_POLL_S)
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+                if mtime == self._mtime:
+                    continue
+                self._mtime = mtime
+                with open(self.path, encoding="utf-8") as f:
+                    source = f.read()
+                for name in WATCHED_LISTS:
+                    entries = self.read_list(source, name)
+                    if entries != self._seen[name]:
+                        self.patches.append((name, entries, diff_entries(self._seen[name], entries)))
+                        self._seen[name] = entries
+            except Exception as exc:  # a half-saved or broken edit: keep the last good one
+                print(f"watch: {exc!r}")
+
+    def read_list(self, source, name):
+        """Entries of the top-level `name = [...]` list in `source`, as tuples.
+
+        Each entry is compiled on its own and remembered by its tokens, so a
+        save costs one tokenize pass (plain Python: the game keeps the GIL
+        between tokens) plus compiling the entries that changed.
+        """
+        import io, re, tokenize  # watch mode only
+        found = re.search(rf"^{name}\s*=", source, re.M)
+        if found is None:
+            raise ValueError(f"{name} is not assigned at the top level")
+        line0 = source.count("\n", 0, found.start())
+        entries, entry, depth = [], [], 0
+        expect = [name, "=", "["]  # the statement around the entries
+        tokens = tokenize.generate_tokens(io.StringIO(source[found.start():]).readline)
+        for n, tok in enumerate(tokens):
+            if n % 1024 == 0:
+                time.sleep(0)  # let the game thread in
+            if tok.type in (tokenize.COMMENT, tokenize.NL):
+                continue
+            if tok.type == tokenize.NEWLINE:
+                break
+            if depth == 0:
+                if not expect or tok.string != expect.pop(0):
+                    raise ValueError(f"{name} is not a plain [...] list")
+                depth = 1 if tok.string == "[" else 0
+                continue
+            if tok.type == tokenize.OP and tok.string in "([{":
+                depth += 1
+            elif tok.type == tokenize.OP and tok.string in ")]}":
+                depth -= 1
+            if depth == 0:  # the closing ]
+                expect = []
+            elif depth == 1 and tok.string == ",":
+                entries.append((row, " ".join(entry)))
+                entry = []
+            else:
+                if not entry:
+                    row = line0 + tok.start[0]
+                entry.append(tok.string)  # strings only: no token objects for the GC to scan
+        if entry:
+            entries.append((row, " ".join(entry)))
+
+        values = []
+        for row, key in entries:
+            value = self._compiled.get(key)
+            if value is None:
+                try:
+                    value = eval(compile(key, self.path, "eval"), self._namespace)
+                except Exception as exc:
+                    raise ValueError(f"line {row}: {key}: {exc!r}") from None
+                # A platform entry: its box, then whether it holds a football
+                value = (*value, isinstance(value, FootballPlatform)) if name == "PLATFORMS" else tuple(value)
+                self._compiled[key] = value
+            values.append(value)
+        return values
+
+    def pump(self, player):
+        """Apply the edits read so far, then re-bake one stale chunk. True if anything changed."""
+        changed = bool(self.patches)
+        while self.patches:
+            name, entries, match = self.patches.popleft()
+            t0 = time.perf_counter()
+            with prefetcher.hold():
+                if name == "PLATFORMS":
+                    summary = self.apply_platforms(entries, match, player)
+                else:
+                    summary = self.apply_layout(entries, match)
+            print(f"watch: {name}: {summary} in {(time.perf_counter() - t0) * 1000:.2f}ms")
+        if self.level.stale:
+            with prefetcher.hold():
+                changed = self.level.rebake_stale() or changed
+        return changed
+
+    def apply_platforms(self, entries, match, player):
+        level = self.level
+        old = level.platforms
+        kept = set(match)
+        removed = [p for i, p in enumerate(old) if i not in kept]
+        platforms, moved, added, spots = [], [], [], []
+        for (*box, spot), i in zip(entries, match):
+            if i is None:
+                p = pygame.Rect(box)
+                added.append(p)
+            else:
+                p = old[i]
+                if list(p) != box:
+                    moved.append((p, p.copy()))
+                    p.update(box)
+            platforms.append(p)
+            if spot:
+                spots.append(p)
+        old[:] = platforms  # in place: PLATFORMS is this list
+        level.reindex(moved, added, removed)
+
+        gone = {id(p) for p in removed}
+        if level is current_level:
+            had = {id(p) for p in level.football_spots}
+            has = {id(p) for p in spots}
+            was = {id(p): before for p, before in moved}
+            for p, before in moved:
+                if id(p) in had and id(p) in has:
+                    self._move_football(football_rect(before), football_rect(p))
+            for p in level.football_spots:
+                if id(p) not in has:  # unmarked, or the platform is gone
+                    self._move_football(football_rect(was.get(id(p), p)), None)
+            for p in spots:
+                if id(p) not in had:
+                    FOOTBALLS.append(football_rect(p))
+            player.coins_total = player.coins_collected + len(FOOTBALLS)
+
+            moved_ids = {id(p) for p, _ in moved}
+            enemies = []
+            for e in ENEMIES:
+                if e.slot is not None and self._enemy_platform(e.slot) is not e.platform:
+                    # Its platform is gone, shifted in the list, or (by height) no longer first
+                    e = self._build_enemy(e.slot)
+                elif id(e.platform) in gone:
+                    e = None
+                elif id(e.platform) in moved_ids:
+                    e.fit_platform()
+                if e is not None:
+                    enemies.append(e)
+            self._set_enemies(enemies)
+        else:
+            level.enemies = None  # built afresh when it is next played
+        level.football_spots = spots
+        return f"{len(moved)} moved, {len(added)} added, {len(removed)} removed"
+
+    def apply_layout(self, entries, match):
+        level = self.level
+        old = level.enemy_layout
+        same = {i: j for j, i in enumerate(match) if i is not None and old[i] == entries[j]}
+        old[:] = entries  # in place: ENEMY_LAYOUT is this list
+        fresh = sorted(set(range(len(entries))) - set(same.values()))
+        if level is not current_level:
+            level.enemies = None
+            return f"{len(fresh)} entries changed"
+        enemies = []
+        for e in ENEMIES:
+            if e.slot is None:
+                enemies.append(e)
+            elif e.slot in same:  # a defender already taken out stays out
+                e.slot = same[e.slot]
+                enemies.append(e)
+        for slot in fresh:
+            e = self._build_enemy(slot)
+            if e is not None:
+                enemies.append(e)
+        enemies.sort(key=lambda e: (e.slot is None, e.slot or 0))
+        self._set_enemies(enemies)
+        return f"{len(fresh)} defenders rebuilt"
+
+    def _build_enemy(self, slot):
+        try:
+            return self.level.build_enemy(slot)
+        except IndexError:
+            print(f"watch: ENEMY_LAYOUT[{slot}] names a platform that does not exist")
+            return None
+
+    def _enemy_platform(self, slot):
+        try:
+            return self.level.enemy_platform(slot)
+        except IndexError:
+            return None  # _build_enemy reports it
+
+    @staticmethod
+    def _move_football(before, after):
+        for i, r in enumerate(FOOTBALLS):
+            if r == before:
+                if after is None:
+                    del FOOTBALLS[i]
+                else:
+                    r.update(after)
+                return
+
+    @staticmethod
+    def _set_enemies(enemies):
+        ENEMIES[:] = enemies
+        enemy_scheduler.rebuild(ENEMIES)
+
+
+
+
+# ------------------------------
+# Broadphase (sweep and prune along x)
+# ------------------------------
+class SweepAndPrune:
+    """Candidate colliding pairs among moving entities.
+
+    Entities provide bounds() -> Rect for this frame. Their boxes stay in a
+    list sorted by left edge; motion here is mostly horizontal and small per
+    frame, so an insertion sort restores the order in near-linear time. One
+    sweep then pairs each box with the ones after it until their left edges pass
+    its right edge. remove() only marks the entry, so it is safe while pairs
+    are being handled; the list is compacted on the next update().
+    """
+
+    def __init__(self):
+        self.entries = []  # [left, right, top, bottom, entity, alive], sorted by left
+        self._index = {}   # id(entity) -> entry
+        self._removed = 0
+        self.pairs = []    # (a, b) with overlapping boxes as of the last update, a sorted first
+
+    def add(self, entity):
+        if id(entity) not in self._index:
+            entry = [0, 0, 0, 0, entity, True]
+            self._index[id(entity)] = entry
+            self.entries.append(entry)  # sorted into place on the next update
+
+    def remove(self, entity):
+        entry = self._index.pop(id(entity), None)
+        if entry is not None:
+            entry[5] = False
+            self._removed += 1
+
+    def clear(self):
+        """Forget every entity."""
+        self.entries = []
+        self._index = {}
+        self._removed = 0
+        self.pairs.clear()
+
+    def update(self):
+        if self._removed:
+            self.entries = [en for en in self.entries if en[5]]
+            self._removed = 0
+        entries = self.entries
+        for en in entries:
+            b = en[4].bounds()
+            en[0], en[1], en[2], en[3] = b.left, b.right, b.top, b.bottom
+
+        for i in range(1, len(entries)):
+            en = entries[i]
+            left = en[0]
+            j = i - 1
+            while j >= 0 and entries[j][0] > left:
+                entries[j + 1] = entries[j]
+                j -= 1
+            entries[j + 1] = en
+
+        pairs = self.pairs
+        pairs.clear()
+        n = len(entries)
+        for i in range(n):
+            a = entries[i]
+            right, top, bottom = a[1], a[2], a[3]
+            for j in range(i + 1, n):
+                b = entries[j]
+                if b[0] >= right:
+                    break
+                if b[2] < bottom and top < b[3]:
+                    pairs.append((a[4], b[4]))
+
+    def partners(self, entity):
+        """Entities paired with `entity` in the last update and not removed since."""
+        index = self._index
+        for a, b in self.pairs:
+            if a is entity:
+                other = b
+            elif b is entity:
+                other = a
+            else:
+                continue
+            if id(other) in index:
+                yield other
+
+
+broadphase = SweepAndPrune()
+
+
+# ------------------------------
+# Enemy sleeping (only enemies near the camera run their patrol)
+# ------------------------------
+ENEMY_ACTIVE_RADIUS = VIRTUAL_W  # world px from the camera centre
+
+
+class EnemyScheduler:
+    """Keeps enemies whose patrol span is near the camera awake; the rest sleep.
+
+    Patrols are periodic, so a sleeping enemy just remembers the enemy clock when
+    it fell asleep and is caught up in closed form (Enemy.catch_up) when it
+    wakes. Per-frame cost is proportional to the awake enemies, which are also
+    the only ones that can be on screen or touch the player, so only awake
+    enemies are entered into the broadphase.
+    """
+
+    def __init__(self, broadphase):
+        self.broadphase = broadphase
+        self.frames = 0       # enemy updates run so far
+        self.time = 0.0       # seconds covered by those updates
+        self.last_dt = None
+        self.dt_since = 0     # clock value since which every update used last_dt
+        self.by_left = []     # enemies sorted by left patrol bound
+        self.lefts = []
+        self.max_span = 0
+        self.awake = []       # awake enemies, in ENEMIES order
+        self._awake_ids = set()
+
+    def rebuild(self, enemies):
+        self.by_left = sorted(enemies, key=lambda e: e.left_bound)
+        self.lefts = [e.left_bound for e in self.by_left]
+        self.max_span = max((e.right_bound + e.rect.w - e.left_bound for e in enemies), default=0)
+        for e in self.awake:
+            self.broadphase.remove(e)
+        for order, e in enumerate(enemies):
+            e.order = order
+            self._sleep(e)
+        self.awake = []
+        self._awake_ids = set()
+
+    def remove(self, enemy):
+        i = bisect.bisect_left(self.lefts, enemy.left_bound)
+        while self.by_left[i] is not enemy:
+            i += 1
+        del self.by_left[i], self.lefts[i]
+        if id(enemy) in self._awake_ids:
+            self._awake_ids.discard(id(enemy))
+            self.awake.remove(enemy)
+            self.broadphase.remove(enemy)
+
+    def _sleep(self, e):
+        e.sleep_frame = self.frames
+        e.sleep_time = self.time
+
+    def _wake(self, e):
+        frames = self.frames - e.sleep_frame
+        if frames <= 0:
+            return
+        if e.sleep_frame >= self.dt_since:
+            dt = self.last_dt  # fixed timestep while asleep: exact catch-up
+        else:
+            dt = (self.time - e.sleep_time) / frames
+        e.catch_up(frames, dt)
+
+    def update(self, dt, center_x):
+        lo = bisect.bisect_left(self.lefts, center_x - ENEMY_ACTIVE_RADIUS - self.max_span)
+        hi = bisect.bisect_right(self.lefts, center_x + ENEMY_ACTIVE_RADIUS)
+        near_left = center_x - ENEMY_ACTIVE_RADIUS
+        wanted = [e for e in self.by_left[lo:hi] if e.right_bound + e.rect.w >= near_left]
+        wanted_ids = {id(e) for e in wanted}
+        if wanted_ids != self._awake_ids:
+            for e in self.awake:
+                if id(e) not in wanted_ids:
+                    self._sleep(e)
+                    self.broadphase.remove(e)
+            for e in wanted:
+                if id(e) not in self._awake_ids:
+                    self._wake(e)
+                    self.broadphase.add(e)
+            wanted.sort(key=lambda e: e.order)
+            self.awake = wanted
+            self._awake_ids = wanted_ids
+
+        for e in self.awake:
+            e.update(dt)
+        if dt != self.last_dt:
+            self.last_dt = dt
+            self.dt_since = self.frames
+        self.frames += 1
+        self.time += dt
+
+
+enemy_scheduler = EnemyScheduler(broadphase)
 
 
 # ------------------------------
@@ -588,6 +2295,7 @@ class Player:
         self.death_vx = 0
         self.death_vy = 0
         self.death_started = False
+        self.last_hurt_cause = None  # "fall" or "enemy", for playthrough reports
         self.spawn()
 
     def spawn(self):
@@ -645,15 +2353,17 @@ class Player:
         self.handle_input(left, right, jump)
         self.apply_gravity()
         self.rect.x += int(self.vx)
-        self.collide_axis(PLATFORMS, 'x')
+        self.collide_axis(current_level.platforms_near(self.rect), 'x')
         self.rect.y += int(self.vy)
         self.on_ground = False
-        self.collide_axis(PLATFORMS, 'y')
-
-        global FOOTBALLS
-        for fb in FOOTBALLS[:]:
-            if self.rect.colliderect(fb):
-                FOOTBALLS.remove(fb)
+        self.collide_axis(current_level.platforms_near(self.rect), 'y')
+
+        # Backwards by index: removing while iterating without copying the list
+        img = self.sprite()
+        for i in range(len(FOOTBALLS) - 1, -1, -1):
+            fb = FOOTBALLS[i]
+            if self.rect.colliderect(fb) and football_touch(img, self.rect.x, self.rect.y, fb):
+                del FOOTBALLS[i]
                 self.coins_collected += 1  # Track collected count
                 self.score += 100
 
@@ -662,18 +2372,10 @@ class Player:
         
         return False  # Not dying, so return False
 
-    def draw(self, surf):
-        if self.invuln_timer > 0 and (self.invuln_timer // 4) % 2 == 0:
-            return
-        if BEVO_RIGHT is not None:
-            img = self.img_r if self.facing_right else self.img_l
-            surf.blit(img, self.rect.topleft)
-        else:
-            pygame.draw.rect(surf, (220, 20, 60), self.rect)
-
-    def hurt(self):
+    def hurt(self, cause=None):
         if self.invuln_timer > 0:
             return
+        self.last_hurt_cause = cause
         self.lives -= 1
         self.invuln_timer = FPS
         self.rect.y -= 10
@@ -709,14 +2411,22 @@ class Player:
         # Return True if Bevo has fallen off screen
         return self.rect.top > VIRTUAL_H + 100
 
-    def draw_offset(self, surf, camera_x):
+    def sprite(self):
+        """Current image, drawn at rect.topleft (None for the plain block fallback)."""
+        if self.img_r is None:
+            return None
+        return self.img_r if self.facing_right else self.img_l
+
+    def bounds(self):
+        return self.rect
+
+    def queue_draw(self, rq):
         if self.invuln_timer > 0 and (self.invuln_timer // 4) % 2 == 0:
             return
         if BEVO_RIGHT is not None:
-            img = self.img_r if self.facing_right else self.img_l
-            surf.blit(img, (self.rect.x - camera_x, self.rect.y))
+            rq.submit(LAYER_PLAYER, self.sprite(), self.rect.x, self.rect.y)
         else:
-            pygame.draw.rect(surf, (220, 20, 60), pygame.Rect(self.rect.x - camera_x, self.rect.y, self.rect.w, self.rect.h))
+            rq.submit(LAYER_PLAYER, solid_surface((220, 20, 60), self.rect.size), self.rect.x, self.rect.y)
 
 # ------------------------------
 # Game helpers
@@ -737,58 +2447,15 @@ def reset_game(player):
     player.invuln_timer = 0
     player.is_dying = False
     player.death_started = False
+    player.last_hurt_cause = None
     player.coins_collected = 0  # Reset collected count
     
-    # Reset footballs ONCE and set the total count correctly
-    place_footballs()
-    # Always set to 27 - the correct total number of footballs for extended level
-    player.coins_total = 27
+    # Back to level 1: footballs and enemies to their original layout
+    activate_level(LEVEL_1)
+    player.coins_total = len(FOOTBALLS)
     print(f"DEBUG: Reset game - footballs placed: {len(FOOTBALLS)}, player.coins_total set to: {player.coins_total}")
     player.spawn()
 
-    # Reset enemies to original layout
-    ENEMIES[:] = [
-        # Zone 1 - placed on lower path platforms for easier introduction
-        Enemy(500,  PLATFORMS[2].top,  speed=1.1),   # on gentle rise platform (x=400)
-        Enemy(750,  PLATFORMS[4].top,  speed=1.1),   # on slight drop platform (x=900)
-
-        # Zone 2 - spread across different height paths  
-        Enemy(1200, PLATFORMS[9].top,  speed=1.2),   # lower-middle path (x=1100)
-        Enemy(1500, PLATFORMS[13].top, speed=1.3),   # middle path (x=1200)
-        Enemy(1750, PLATFORMS[16].top, speed=1.2),   # middle path (x=1900)
-
-        # Zone 3 - maze section enemies on connectors and main paths
-        Enemy(2120, PLATFORMS[21].top, speed=1.3),   # low connector platform (x=2100)
-        Enemy(2400, PLATFORMS[24].top, speed=1.3),   # lower maze section (x=2300)
-        Enemy(2600, PLATFORMS[27].top, speed=1.4),   # middle maze section (x=2350)
-        Enemy(2350, PLATFORMS[30].top, speed=1.3),   # upper maze section (x=2280)
-
-        # Zone 4 - tower climbing challenges
-        Enemy(3200, PLATFORMS[33].top, speed=1.4),   # base level (x=3100)
-        Enemy(3400, PLATFORMS[34].top, speed=1.4),   # step up (x=3350)
-        Enemy(3500, PLATFORMS[36].top, speed=1.4),   # continue up (x=3450)
-        Enemy(3750, PLATFORMS[39].top, speed=1.3),   # bypass low (x=3650)
-
-        # Zone 5 - final approach guards
-        Enemy(4200, PLATFORMS[45].top, speed=1.4),   # middle steady approach (x=4150)
-        Enemy(4550, PLATFORMS[49].top, speed=1.5),   # lower safe approach (x=4500)
-        
-        # Zone 6 - extended challenge gauntlet
-        Enemy(5200, PLATFORMS[53].top, speed=1.3),   # lower tier (x=5100)
-        Enemy(5450, PLATFORMS[55].top, speed=1.4),   # middle tier (x=5400)
-        Enemy(5750, PLATFORMS[58].top, speed=1.5),   # upper tier (x=5700)
-        Enemy(5320, PLATFORMS[62].top, speed=1.3),   # connector platform (x=5300)
-        Enemy(5920, PLATFORMS[56].top, speed=1.4),   # middle tier end (x=5900)
-        
-        # Zone 7 - final epic challenge
-        Enemy(6200, PLATFORMS[66].top, speed=1.4),   # epic start low (x=6100)
-        Enemy(6450, PLATFORMS[68].top, speed=1.5),   # middle epic (x=6400)
-        Enemy(6700, PLATFORMS[71].top, speed=1.6),   # upper epic (x=6620)
-        Enemy(6250, PLATFORMS[76].top, speed=1.5),   # zigzag challenge (x=6200)
-        Enemy(6850, PLATFORMS[67].top, speed=1.5),   # final mid approach (x=6900)
-        Enemy(7000, PLATFORMS[80].top, speed=1.6),   # penultimate platform (x=6980)
-    ]
-
 def reset_level(player):
     global flag_reached, win_animation_time, confetti_particles, death_animation_active, death_animation_time, FOOTBALLS
     flag_reached = False
@@ -801,104 +2468,129 @@ def reset_level(player):
     player.death_started = False
     player.coins_collected = 0  # Reset collected count
     
-    # Reset footballs and update count
-    place_footballs()
-    # Always set to 27 - the correct total number of footballs for extended level
-    player.coins_total = 27
+    # Replay the current level from its start
+    activate_level(current_level)
+    player.coins_total = len(FOOTBALLS)
     print(f"DEBUG: Reset level - footballs placed: {len(FOOTBALLS)}, player.coins_total set to: {player.coins_total}")
     player.spawn()
-    
-    ENEMIES[:] = [
-        # Zone 1 - placed on lower path platforms for easier introduction
-        Enemy(500,  PLATFORMS[2].top,  speed=1.1),   # on gentle rise platform (x=400)
-        Enemy(750,  PLATFORMS[4].top,  speed=1.1),   # on slight drop platform (x=900)
-
-        # Zone 2 - spread across different height paths  
-        Enemy(1200, PLATFORMS[9].top,  speed=1.2),   # lower-middle path (x=1100)
-        Enemy(1500, PLATFORMS[13].top, speed=1.3),   # middle path (x=1200)
-        Enemy(1750, PLATFORMS[16].top, speed=1.2),   # middle path (x=1900)
-
-        # Zone 3 - maze section enemies on connectors and main paths
-        Enemy(2120, PLATFORMS[21].top, speed=1.3),   # low connector platform (x=2100)
-        Enemy(2400, PLATFORMS[24].top, speed=1.3),   # lower maze section (x=2300)
-        Enemy(2600, PLATFORMS[27].top, speed=1.4),   # middle maze section (x=2350)
-        Enemy(2350, PLATFORMS[30].top, speed=1.3),   # upper maze section (x=2280)
-
-        # Zone 4 - tower climbing challenges
-        Enemy(3200, PLATFORMS[33].top, speed=1.4),   # base level (x=3100)
-        Enemy(3400, PLATFORMS[34].top, speed=1.4),   # step up (x=3350)
-        Enemy(3500, PLATFORMS[36].top, speed=1.4),   # continue up (x=3450)
-        Enemy(3750, PLATFORMS[39].top, speed=1.3),   # bypass low (x=3650)
-
-        # Zone 5 - final approach guards
-        Enemy(4200, PLATFORMS[45].top, speed=1.4),   # middle steady approach (x=4150)
-        Enemy(4550, PLATFORMS[49].top, speed=1.5),   # lower safe approach (x=4500)
-        
-        # Zone 6 - extended challenge gauntlet
-        Enemy(5200, PLATFORMS[53].top, speed=1.3),   # lower tier (x=5100)
-        Enemy(5450, PLATFORMS[55].top, speed=1.4),   # middle tier (x=5400)
-        Enemy(5750, PLATFORMS[58].top, speed=1.5),   # upper tier (x=5700)
-        Enemy(5320, PLATFORMS[62].top, speed=1.3),   # connector platform (x=5300)
-        Enemy(5920, PLATFORMS[56].top, speed=1.4),   # middle tier end (x=5900)
-        
-        # Zone 7 - final epic challenge
-        Enemy(6200, PLATFORMS[66].top, speed=1.4),   # epic start low (x=6100)
-        Enemy(6450, PLATFORMS[68].top, speed=1.5),   # middle epic (x=6400)
-        Enemy(6700, PLATFORMS[71].top, speed=1.6),   # upper epic (x=6620)
-        Enemy(6250, PLATFORMS[76].top, speed=1.5),   # zigzag challenge (x=6200)
-        Enemy(6850, PLATFORMS[67].top, speed=1.5),   # final mid approach (x=6900)
-        Enemy(7000, PLATFORMS[80].top, speed=1.6),   # penultimate platform (x=6980)
-    ]
-
-
-def draw_world(surf, camera_x):
-    # Parallax background (two layers at different speeds)
-    if BG_IMG_SLOW:
+
+
+_platform_cache = {}
+
+
+def platform_surface(p, color=BLOCK):
+    """Opaque pre-baked platform block (body plus lighter top edge), cached by size."""
+    key = (p.size, color)
+    surf = _platform_cache.get(key)
+    if surf is None:
+        surf = pygame.Surface(p.size).convert()
+        surf.fill(color)
+        if color == BLOCK:
+            surf.fill((170, 140, 100), (0, 0, p.w, 4))
+        _platform_cache[key] = surfaces.track(surf, "caches")
+    return surf
+
+
+def clear_draw_caches():
+    """Drop cached blocks; they are rebuilt on demand."""
+    _platform_cache.clear()
+    _solid_cache.clear()
+    _rotation_cache.clear()
+
+
+def draw_world(rq):
+    camera_x = rq.camera_x
+    # Parallax background (two layers at different speeds). The faster layer is
+    # opaque, so the slow one is only drawn where the fast one doesn't reach.
+    offset_fast = int(camera_x * 0.6)
+    fast_covers = (BG_IMG_FAST is not None and BG_IMG_FAST.get_height() >= VIRTUAL_H
+                   and BG_IMG_FAST.get_width() - offset_fast >= VIRTUAL_W)
+    if BG_IMG_SLOW and not fast_covers:
         # Slow layer (far background, e.g. distant stadium/sky)
         offset_slow = int(camera_x * 0.3)
-        surf.blit(BG_IMG_SLOW, (-offset_slow, 0))
+        rq.submit(LAYER_BG, BG_IMG_SLOW, camera_x - offset_slow, 0)
 
     if BG_IMG_FAST:
         # Faster layer (closer background, e.g. crowd/walls)
-        offset_fast = int(camera_x * 0.6)
-        surf.blit(BG_IMG_FAST, (-offset_fast, 0))
-
-    # Platforms
-    for p in PLATFORMS:
-        pygame.draw.rect(surf, BLOCK, (p.x - camera_x, p.y, p.w, p.h))
-        top = pygame.Rect(p.x - camera_x, p.y, p.w, 4)
-        pygame.draw.rect(surf, (170, 140, 100), top)
-
-    # Ground
-    pygame.draw.rect(surf, GROUND_BROWN, (PLATFORMS[0].x - camera_x, PLATFORMS[0].y, PLATFORMS[0].w, PLATFORMS[0].h))
+        rq.submit(LAYER_BG, BG_IMG_FAST, camera_x - offset_fast, 0)
+    if not fast_covers:
+        rq.clear_color = SKY
+
+    # Platforms: the baked chunks once ready, else one by one (ground first)
+    level = current_level
+    if level.chunks_ready:
+        for surf, x, y in level.chunks.values():
+            rq.submit(LAYER_PLATFORMS, surf, x, y)
+        for x0 in level.stale:  # edited, waiting to be re-baked
+            if x0 + CHUNK_W > camera_x and x0 < camera_x + VIRTUAL_W:
+                for i, p in level.platforms_within(x0, x0 + CHUNK_W):
+                    rq.submit(LAYER_PLATFORMS, platform_surface(p, GROUND_BROWN if i < level.ground_count else BLOCK), p.x, p.y)
+    else:
+        for i, p in enumerate(PLATFORMS):
+            rq.submit(LAYER_PLATFORMS, platform_surface(p, GROUND_BROWN if i < level.ground_count else BLOCK), p.x, p.y)
 
     # Footballs
     for r in FOOTBALLS:
         if FOOTBALL_IMG is not None:
-            pos = (r.centerx - FOOTBALL_IMG.get_width() // 2 - camera_x, r.centery - FOOTBALL_IMG.get_height() // 2)
-            surf.blit(FOOTBALL_IMG, pos)
+            rq.submit(LAYER_PICKUPS, FOOTBALL_IMG, *football_draw_pos(r))
         else:
-            pygame.draw.ellipse(surf, (200, 120, 40), pygame.Rect(r.x - camera_x, r.y, r.w, r.h))
+            rq.submit(LAYER_PICKUPS, football_fallback(r.size), r.x, r.y)
 
     # Flag
-    pygame.draw.rect(surf, FLAG, (FLAG_RECT.x - camera_x, FLAG_RECT.y, FLAG_RECT.w, FLAG_RECT.h))
-    pole = pygame.Rect(FLAG_RECT.centerx - 2 - camera_x, FLAG_RECT.top - 100, 4, 100)
-    pygame.draw.rect(surf, (200, 255, 200), pole)
+    rq.submit(LAYER_PICKUPS, solid_surface(FLAG, FLAG_RECT.size), FLAG_RECT.x, FLAG_RECT.y)
+    rq.submit(LAYER_PICKUPS, solid_surface((200, 255, 200), (4, 100)), FLAG_RECT.centerx - 2, FLAG_RECT.top - 100)
 
         # --- Draw Win Animation if Bevo Reached Flag ---
     if flag_reached:
-        draw_win_animation(surf)
+        draw_win_animation(rq)
+
+
+def football_draw_pos(r):
+    """Top-left of the football sprite, centred on its pickup rect."""
+    if FOOTBALL_IMG is None:
+        return r.x, r.y
+    return r.centerx - FOOTBALL_IMG.get_width() // 2, r.centery - FOOTBALL_IMG.get_height() // 2
+
+
+def football_touch(img, x, y, r):
+    """Pixel-exact pickup test for a sprite at (x, y) already overlapping pickup rect r.
+
+    Only the football's pixels inside r count, so the sprite drawn around it
+    does not widen the pickup.
+    """
+    if img is None or FOOTBALL_PICKUP_MASK is None:
+        return True
+    fx, fy = football_draw_pos(r)
+    return SPRITE_MASKS[img].overlap(FOOTBALL_PICKUP_MASK, (fx - x, fy - y)) is not None
+
+
+def football_fallback(size):
+    surf = _solid_cache.get(("football", size))
+    if surf is None:
+        surf = pygame.Surface(size, pygame.SRCALPHA)
+        pygame.draw.ellipse(surf, (200, 120, 40), surf.get_rect())
+        _solid_cache[("football", size)] = surfaces.track(surf, "caches")
+    return surf
+
+
+surfaces.on_over_budget("caches", clear_draw_caches)
 
 # --- Win Animation Setup and Functions ---
-try:
-    GOLD_HAT_IMG = pygame.image.load("assets/gold_hat.png").convert_alpha()
-except Exception:
-    GOLD_HAT_IMG = None
+GOLD_HAT_IMG = None
+CONFETTI_IMG = None
 
-try:
-    CONFETTI_IMG = pygame.image.load("assets/orange_confetti.png").convert_alpha()
-except Exception:
-    CONFETTI_IMG = None
+
+def load_win_assets():
+    global GOLD_HAT_IMG, CONFETTI_IMG
+    try:
+        GOLD_HAT_IMG = surfaces.track(pygame.image.load(AS_GOLD_HAT).convert_alpha(), "sprites")
+    except Exception:
+        GOLD_HAT_IMG = None
+
+    try:
+        CONFETTI_IMG = surfaces.track(pygame.image.load(AS_CONFETTI).convert_alpha(), "sprites")
+    except Exception:
+        CONFETTI_IMG = None
 
 def spawn_confetti():
     """Initialize confetti animation when flag is reached."""
@@ -910,19 +2602,44 @@ def spawn_confetti():
     screen_width = VIRTUAL_W  # Use virtual screen width
     num_particles = 50  # Number of confetti pieces
     
-    for i in range(num_particles):
+    for i in range(min(num_particles, CONFETTI_MAX)):
         # Spawn confetti across the top of the screen
         x = random.uniform(0, screen_width)
         y = random.uniform(-100, -20)  # Start above screen
         particle = ConfettiParticle(x, y, CONFETTI_IMG)
         confetti_particles.append(particle)
 
-def draw_win_animation(surf):
+_win_layer = None
+
+
+def win_layer(items):
+    """(surface, pos) items drawn on a transparent virtual-size layer."""
+    global _win_layer
+    if _win_layer is None:
+        _win_layer = surfaces.track(pygame.Surface((VIRTUAL_W, VIRTUAL_H), pygame.SRCALPHA), "frame")
+    _win_layer.fill((0, 0, 0, 0))
+    _win_layer.blits(items, doreturn=False)
+    return _win_layer
+
+
+def submit_win_fx(rq, items):
+    """Confetti and hat: in native mode dozens of big rotated and rescaled images
+    are far cheaper drawn at virtual size and scaled up once than each drawn at
+    window resolution."""
+    if NATIVE_RENDER and view.scale != 1:
+        if items:
+            rq.submit(LAYER_FX, view.upscale(win_layer(items)), 0, 0)
+        return
+    for surf, (x, y) in items:
+        rq.submit(LAYER_FX, surf, x, y)
+
+
+def draw_win_animation(rq):
     """Draw win animation on the screen with pulsing gold hat in center."""
-    import math
     global confetti_particles
     
-    sw, sh = surf.get_size()
+    sw, sh = VIRTUAL_W, VIRTUAL_H
+    fx = []  # confetti and hat, see submit_win_fx
     
     # Calculate pulsing scale using sine wave (creates smooth pulsing effect)
     pulse_speed = 3.0  # Speed of pulsing
@@ -934,7 +2651,7 @@ def draw_win_animation(surf):
     
     # Draw animated confetti particles FIRST (so they appear behind the hat)
     for particle in confetti_particles:
-        particle.draw(surf)
+        fx.append(particle.blit_item())
     
     # Draw gold hat in the center of the screen with pulsing effect (AFTER confetti, so it's in front)
     if GOLD_HAT_IMG is not None:
@@ -956,50 +2673,48 @@ def draw_win_animation(surf):
         hat_x = sw // 2 - scaled_w // 2
         hat_y = sh // 2 - scaled_h // 2 - 150  # Move up 150 pixels
         
-        surf.blit(scaled_hat, (hat_x, hat_y))
+        fx.append((scaled_hat, (hat_x, hat_y)))
+        submit_win_fx(rq, fx)
         
         # Add victory text underneath the hat - SIMPLER positioning
         victory_text = "Bevo Wins The Red River Rivalry"
         victory_font_size = 28  # Slightly larger for visibility
-        victory_font = pygame.font.SysFont("arial", victory_font_size, bold=True)  # Try Arial font
-        victory_surf = victory_font.render(victory_text, True, (255, 140, 0))  # Orange text
+        victory_surf = text_surface(victory_text, (255, 140, 0), victory_font_size, bold=True)  # Orange text
         victory_x = sw // 2 - victory_surf.get_width() // 2
         
         # Much simpler positioning: just place it in the bottom half of the screen
         victory_y = int(sh * 0.75) + 50  # 75% down the screen + 50 pixels lower
         
         # Draw a bright white background rectangle
-        text_bg_rect = pygame.Rect(victory_x - 10, victory_y - 5, victory_surf.get_width() + 20, victory_surf.get_height() + 10)
-        pygame.draw.rect(surf, (255, 255, 255), text_bg_rect)  # Bright white background
+        text_bg_size = (victory_surf.get_width() + 20, victory_surf.get_height() + 10)
+        rq.submit(LAYER_FX, solid_surface((255, 255, 255), text_bg_size), victory_x - 10, victory_y - 5)  # Bright white background
         
-        surf.blit(victory_surf, (victory_x, victory_y))
+        rq.submit(LAYER_FX, text_blit(victory_text, (255, 140, 0), victory_font_size, bold=True), victory_x, victory_y)
         
     else:
+        submit_win_fx(rq, fx)
         # Fallback text if no hat image - also pulsing and repositioned
         text_scale = int(20 * pulse_scale)
-        pulsing_font = pygame.font.SysFont("consolas", text_scale)
-        text_surf = pulsing_font.render("🏆 WINNER! 🏆", True, WHITE)
+        text_surf = text_surface("🏆 WINNER! 🏆", WHITE, text_scale)
         text_x = sw // 2 - text_surf.get_width() // 2
         text_y = sh // 2 - text_surf.get_height() // 2 - 150  # Move up 150 pixels
-        surf.blit(text_surf, (text_x, text_y))
+        rq.submit(LAYER_FX, text_blit("🏆 WINNER! 🏆", WHITE, text_scale), text_x, text_y)
         
         # Add victory text for fallback - simple positioning
         victory_text = "Bevo Wins The Red River Rivalry"
         victory_font_size = 28  # Fixed size
-        victory_font = pygame.font.SysFont("arial", victory_font_size, bold=True)
-        victory_surf = victory_font.render(victory_text, True, (255, 140, 0))  # Orange text
+        victory_surf = text_surface(victory_text, (255, 140, 0), victory_font_size, bold=True)  # Orange text
         victory_x = sw // 2 - victory_surf.get_width() // 2
         victory_y = int(sh * 0.75) + 50  # 75% down the screen + 50 pixels lower
         
         # Bright white background for visibility
-        text_bg_rect = pygame.Rect(victory_x - 10, victory_y - 5, victory_surf.get_width() + 20, victory_surf.get_height() + 10)
-        pygame.draw.rect(surf, (255, 255, 255), text_bg_rect)  # Bright white background
+        text_bg_size = (victory_surf.get_width() + 20, victory_surf.get_height() + 10)
+        rq.submit(LAYER_FX, solid_surface((255, 255, 255), text_bg_size), victory_x - 10, victory_y - 5)  # Bright white background
             
-        surf.blit(victory_surf, (victory_x, victory_y))
-        surf.blit(victory_surf, (victory_x, victory_y))
+        rq.submit(LAYER_FX, text_blit(victory_text, (255, 140, 0), victory_font_size, bold=True), victory_x, victory_y)
     
     # Occasionally spawn new confetti to keep the effect going
-    if win_animation_time > 1.0 and random.random() < 0.3:  # 30% chance each frame after 1 second
+    if win_animation_time > 1.0 and random.random() < 0.3 and len(confetti_particles) < CONFETTI_MAX:  # 30% chance each frame after 1 second
         # Add new confetti occasionally
         for i in range(random.randint(1, 3)):
             x = random.uniform(0, sw)
@@ -1007,30 +2722,60 @@ def draw_win_animation(surf):
             particle = ConfettiParticle(x, y, CONFETTI_IMG)
             confetti_particles.append(particle)
 
-def draw_hud(surf, player, msg=None):
-    draw_text(surf, f"Score: {player.score}", 12, 10)
+def draw_hud(rq, player, msg=None):
+    draw_text(rq, f"Score: {player.score}", 12, 10)
     # Use explicit collected count instead of calculation
-    draw_text(surf, f"Footballs: {player.coins_collected}/{player.coins_total}", 12, 34)
-    draw_text(surf, f"Lives: {player.lives}", 12, 58)
+    draw_text(rq, f"Footballs: {player.coins_collected}/{player.coins_total}", 12, 34)
+    draw_text(rq, f"Lives: {player.lives}", 12, 58)
+    draw_text(rq, f"Level: {current_level.number}/{LEVEL_COUNT}", 12, 82)
     if msg:
-        draw_text(surf, msg, VIRTUAL_W//2 - 200, 10, color=WHITE)
+        draw_text(rq, msg, VIRTUAL_W//2 - 200, 10, color=WHITE)
+
+
+def camera_for(player):
+    camera_x = player.rect.centerx - VIRTUAL_W // 2
+    return max(0, min(camera_x, WORLD_WIDTH - VIRTUAL_W))  # clamp camera
+
+
+def pacing_lines():
+    """The F3 lines about the window side: frame rate, pacing, input latency."""
+    return (
+        f"fps {clock.get_fps():.0f}",
+        pacer.summary(),
+        controls.latency.summary(),
+    )
+
+
+def draw_debug(rq, pacing):
+    """F3 readout in the top-right corner: `pacing` (see pacing_lines) and surface memory."""
+    lines = [*pacing, *surfaces.summary_lines()]
+    for i, line in enumerate(lines):
+        draw_text(rq, line, VIRTUAL_W - 12 - font.size(line)[0], 10 + i * 22, WHITE, LAYER_OVERLAY)
 
 
 def check_fail(player):
     if player.rect.top > VIRTUAL_H + 80:
-        player.hurt()
+        player.hurt("fall")
         player.spawn()
 
 
 def check_enemy_collisions(player):
-    for e in ENEMIES:
-        if player.rect.colliderect(e.rect):
+    # The broadphase only pairs boxes that overlap; the masks decide those few.
+    # Candidates are tried in ENEMIES order, like a plain scan would.
+    candidates = [e for e in broadphase.partners(player) if isinstance(e, Enemy)]
+    candidates.sort(key=lambda e: e.order)
+    p_img = player.sprite()
+    px, py = player.rect.topleft
+    for e in candidates:
+        img, x, y = e.sprite()
+        if sprites_touch(p_img, px, py, img, x, y):
             if player.vy > 0 and player.rect.bottom - e.rect.top < 16:
                 player.vy = int(JUMP_VEL * 0.7)
                 ENEMIES.remove(e)
+                enemy_scheduler.remove(e)
                 return "Stomped a Sooner! +200", 200
             else:
-                player.hurt()
+                player.hurt("enemy")
                 return "Hit by OU Defender! -1 life", 0
     return None, 0
 
@@ -1039,17 +2784,89 @@ def check_win(player):
     return player.rect.colliderect(FLAG_RECT) and len(FOOTBALLS) == 0
 
 
+def update_game(player, dt, left, right, jump):
+    """Advance the simulation by one frame.
+
+    Shared by the main loop and headless drivers (see fuzz.py) so both run the
+    exact same physics. Returns the enemy-contact message, if any.
+    """
+    global flag_reached, win_animation_time, confetti_particles, death_animation_active, death_animation_time
+
+    # Only allow player movement if not in death animation
+    player_input_left = left if not death_animation_active else False
+    player_input_right = right if not death_animation_active else False
+    player_input_jump = jump if not death_animation_active else False
+    
+    death_animation_finished = player.update(dt, player_input_left, player_input_right, player_input_jump)
+    
+    # Update death animation timer
+    if death_animation_active:
+        death_animation_time += dt
+        # Check if death animation is complete (Bevo fell off screen)
+        if death_animation_finished:
+            death_animation_active = False
+            death_animation_time = 0.0
+    
+    # Only update enemies if not in death animation
+    if not death_animation_active:
+        enemy_scheduler.update(dt, camera_for(player) + VIRTUAL_W // 2)
+
+    # Update win animation timer if flag is reached
+    if flag_reached:
+        win_animation_time += dt
+        
+        # Update confetti particles
+        particles_to_remove = []
+        for particle in confetti_particles:
+            if particle.update(dt):
+                particles_to_remove.append(particle)
+        
+        # Remove expired particles
+        for particle in particles_to_remove:
+            confetti_particles.remove(particle)
+
+    message = None
+    # Only check collisions and failures if not in death animation
+    if not death_animation_active:
+        check_fail(player)
+        broadphase.add(player)  # no-op once the player is in
+        broadphase.update()
+        m, delta = check_enemy_collisions(player)
+        if m:
+            message = m
+            player.score += delta
+
+        # Create bevo_rect alias for player rectangle
+        bevo_rect = player.rect
+        
+        # Flag collision detection
+        if bevo_rect.colliderect(FLAG_RECT):
+            if current_level.number < LEVEL_COUNT:
+                advance_level(player)
+                message = f"Level {current_level.number}!"
+            elif not flag_reached:
+                flag_reached = True
+                spawn_confetti()
+
+    return message
+
+
 # ------------------------------
 # Mobile controls (screen-space)
 # ------------------------------
-# We render buttons on the *final* scaled screen, but handle input via flags.
-move_left = False
-move_right = False
-jump_pressed = False
-
+# We render buttons on the *final* scaled screen; Controls samples them per frame.
 # Tap-to-start gating for audio on iOS
 started = False
 
+KEYS_LEFT = (pygame.K_LEFT, pygame.K_a)
+KEYS_RIGHT = (pygame.K_RIGHT, pygame.K_d)
+KEYS_JUMP = (pygame.K_UP, pygame.K_w, pygame.K_SPACE)
+INPUT_EVENTS = (
+    pygame.KEYDOWN, pygame.KEYUP,
+    pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEMOTION,
+    pygame.FINGERDOWN, pygame.FINGERMOTION, pygame.FINGERUP,
+)
+
 
 def screen_buttons(rect):
     """Return (left_rect, right_rect, jump_rect) in screen coords based on current size."""
@@ -1065,187 +2882,533 @@ def screen_buttons(rect):
     return left_rect, right_rect, jr
 
 
+class LatencyHistogram:
+    """Millisecond histogram with fixed buckets; cheap enough to record every frame."""
+
+    EDGES = (2, 4, 8, 12, 17, 25, 33, 50, 67, 100, 150, 250)  # bucket upper bounds (ms)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.EDGES) + 1)
+        self.total = 0
+        self.worst = 0
+
+    def record(self, ms):
+        self.counts[bisect.bisect_left(self.EDGES, ms)] += 1
+        self.total += 1
+        self.worst = max(self.worst, ms)
+
+    def percentile(self, p):
+        """Upper bound of the bucket holding the p-th percentile (the worst sample for the last bucket)."""
+        if not self.total:
+            return 0
+        need = p / 100.0 * self.total
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= need and c:
+                return min(self.EDGES[i], self.worst) if i < len(self.EDGES) else self.worst
+        return self.worst
+
+    def summary(self):
+        return (f"input->flip p50<={self.percentile(50)}ms p95<={self.percentile(95)}ms "
+                f"max={self.worst}ms n={self.total}")
+
+
+class Controls:
+    """Left/right/jump state, sampled right before each simulation step.
+
+    - Keyboard state comes from pygame.key.get_pressed(), so a lost KEYUP can't
+      leave Bevo running.
+    - Every finger (FINGERDOWN/MOTION/UP) is tracked on its own and holds
+      whichever on-screen button it is over, so run + jump works together.
+    - The mouse is one more pointer on desktop; SDL's synthetic mouse events
+      for touches are ignored so a finger isn't counted twice.
+    - Each presented frame records how old its oldest input event was.
+    """
+
+    def __init__(self):
+        self.pointers = {}  # pointer id -> button index (0 left, 1 right, 2 jump) or None
+        self.buttons = None
+        self.buttons_size = None
+        self.oldest_input_ms = None  # oldest input event not yet on screen
+        self.last_poll_ms = time.perf_counter() * 1000.0
+        self.latency = LatencyHistogram()
+
+    def _button_at(self, pos, screen_rect):
+        if screen_rect.size != self.buttons_size:
+            self.buttons = screen_buttons(screen_rect)
+            self.buttons_size = screen_rect.size
+        for i, r in enumerate(self.buttons):
+            if r.collidepoint(pos):
+                return i
+        return None
+
+    def handle_event(self, event, screen_rect):
+        if event.type not in INPUT_EVENTS:
+            return
+        if event.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEMOTION):
+            if getattr(event, "touch", False):
+                return  # emulated from a finger we already track
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                self.pointers["mouse"] = self._button_at(event.pos, screen_rect)
+            elif event.type == pygame.MOUSEBUTTONUP:
+                self.pointers.pop("mouse", None)
+            elif "mouse" in self.pointers:
+                self.pointers["mouse"] = self._button_at(event.pos, screen_rect)
+            else:
+                return  # hover, not input
+        elif event.type in (pygame.FINGERDOWN, pygame.FINGERMOTION, pygame.FINGERUP):
+            key = (event.touch_id, event.finger_id)
+            if event.type == pygame.FINGERUP:
+                self.pointers.pop(key, None)
+            else:
+                pos = (event.x * screen_rect.w, event.y * screen_rect.h)
+                self.pointers[key] = self._button_at(pos, screen_rect)
+
+        # pygame doesn't expose SDL event times, so assume the event arrived just
+        # after the previous poll (worst case)
+        stamp = self.last_poll_ms
+        if self.oldest_input_ms is None or stamp < self.oldest_input_ms:
+            self.oldest_input_ms = stamp
+
+    def polled(self):
+        self.last_poll_ms = time.perf_counter() * 1000.0
+
+    def sample(self):
+        keys = pygame.key.get_pressed()
+        held = set(self.pointers.values())
+        left = 0 in held or any(keys[k] for k in KEYS_LEFT)
+        right = 1 in held or any(keys[k] for k in KEYS_RIGHT)
+        jump = 2 in held or any(keys[k] for k in KEYS_JUMP)
+        return left, right, jump
+
+    def pending_input(self):
+        """Take the oldest input time not on screen yet (None: no input), for a
+        frame that is presented later (see FramePipeline)."""
+        stamp, self.oldest_input_ms = self.oldest_input_ms, None
+        return stamp
+
+    def presented(self):
+        """Call right after display.flip()."""
+        self.presented_input(self.pending_input())
+
+    def presented_input(self, stamp):
+        """A frame showing input from `stamp` (a pending_input() value) was just flipped."""
+        if stamp is not None:
+            self.latency.record(round(time.perf_counter() * 1000.0 - stamp))
+
+
+controls = Controls()
+
+
+# ------------------------------
+# Idle throttling (static screens, hidden or unfocused window)
+# ------------------------------
+IDLE_POLL_S = 0.05     # how often an idle loop wakes to check for events
+IDLE_REFRESH_S = 1.0   # a visible static screen is still re-presented this often
+
+WINDOW_HIDDEN_EVENTS = (pygame.WINDOWFOCUSLOST, pygame.WINDOWMINIMIZED, pygame.WINDOWHIDDEN)
+WINDOW_SHOWN_EVENTS = (pygame.WINDOWFOCUSGAINED, pygame.WINDOWRESTORED, pygame.WINDOWSHOWN)
+REDRAW_EVENTS = (pygame.VIDEORESIZE, pygame.VIDEOEXPOSE, pygame.WINDOWRESIZED,
+                 pygame.WINDOWSIZECHANGED, pygame.WINDOWEXPOSED)
+
+
+class IdleMode:
+    """Tells the loop when it may skip simulating and presenting frames.
+
+    While the window is hidden, minimized or unfocused nothing is simulated or
+    presented. On a visible static screen (before "Tap to Start", on "Game
+    Over") the simulation is paused and a frame is only presented after input,
+    a window change, or every IDLE_REFRESH_S.
+    """
+
+    def __init__(self):
+        self.hidden = False
+        self.dirty = True
+        self.last_present = 0.0
+
+    def handle_event(self, event):
+        if event.type in WINDOW_HIDDEN_EVENTS:
+            self.hidden = True
+        elif event.type in WINDOW_SHOWN_EVENTS:
+            self.hidden = False
+            self.dirty = True
+        elif event.type in INPUT_EVENTS or event.type in REDRAW_EVENTS:
+            self.dirty = True
+
+    def should_present(self, static):
+        if self.hidden:
+            return False
+        if not static:
+            return True
+        return self.dirty or time.perf_counter() - self.last_present >= IDLE_REFRESH_S
+
+    def presented(self):
+        self.dirty = False
+        self.last_present = time.perf_counter()
+
+
+idle = IdleMode()
+
+
+_button_blits = {}  # screen size -> prebuilt (surface, pos) list
+
+
+def button_blits(size):
+    """Button overlays and labels for a screen size, built once per size."""
+    items = _button_blits.get(size)
+    if items is None:
+        sw, sh = size
+        left_r, right_r, jump_r = screen_buttons(pygame.Rect((0, 0), size))
+        # Semi-transparent rects
+        overlay = solid_surface(BTN_BG, left_r.size)
+        # Jump circle
+        circ = pygame.Surface(jump_r.size, pygame.SRCALPHA)
+        pygame.draw.ellipse(circ, BTN_BG, circ.get_rect())
+        # Labels
+        lbl = get_font(max(14, int(0.04 * sh)))
+        items = [
+            (overlay, left_r.topleft),
+            (overlay, right_r.topleft),
+            (circ, jump_r.topleft),
+            (lbl.render("LEFT", True, BTN_BORDER), (left_r.x + 10, left_r.y + left_r.h//2 - 10)),
+            (lbl.render("RIGHT", True, BTN_BORDER), (right_r.x + 10, right_r.y + right_r.h//2 - 10)),
+            (lbl.render("JUMP", True, BTN_BORDER), (jump_r.x + 8, jump_r.y + jump_r.h//2 - 12)),
+        ]
+        for s, _ in items[2:]:
+            surfaces.track(s, "ui")
+        _button_blits.clear()  # only the current window size is worth keeping
+        _button_blits[size] = items
+    return items
+
+
 def draw_buttons(surf):
-    sw, sh = surf.get_size()
-    left_r, right_r, jump_r = screen_buttons(surf.get_rect())
-    # Draw semi-transparent rects
-    overlay = pygame.Surface((left_r.w, left_r.h), pygame.SRCALPHA)
-    overlay.fill(BTN_BG)
-    surf.blit(overlay, left_r.topleft)
-    surf.blit(overlay, right_r.topleft)
-    # Jump circle
-    circ = pygame.Surface((jump_r.w, jump_r.h), pygame.SRCALPHA)
-    pygame.draw.ellipse(circ, BTN_BG, circ.get_rect())
-    surf.blit(circ, jump_r.topleft)
-    # Labels
-    lbl = pygame.font.SysFont("consolas", max(14, int(0.04 * sh)))
-    surf.blit(lbl.render("LEFT", True, BTN_BORDER), (left_r.x + 10, left_r.y + left_r.h//2 - 10))
-    surf.blit(lbl.render("RIGHT", True, BTN_BORDER), (right_r.x + 10, right_r.y + right_r.h//2 - 10))
-    surf.blit(lbl.render("JUMP", True, BTN_BORDER), (jump_r.x + 8, jump_r.y + jump_r.h//2 - 12))
+    surf.blits(button_blits(surf.get_size()), doreturn=False)
 
 
 # ------------------------------
-# Async main loop (PyGBag friendly)
+# Frame pacing
 # ------------------------------
-async def main():
-    global move_left, move_right, jump_pressed, started, mixer_ready, GRUNT_SFX, flag_reached, win_animation_time, confetti_particles, death_animation_active, death_animation_time
+# Physics moves a fixed amount per simulation step, so the simulation always
+# runs at FPS steps a second in SIM_DT steps; pacing only decides when frames
+# are presented and how many steps each one carries.
+#   browser: the browser's requestAnimationFrame sets the cadence (pygbag
+#            resumes the loop once per display frame); an accumulator turns
+#            display time into sim steps, snapped to the measured refresh.
+#   busy:    spin until the deadline, exact but burns a core (like
+#            clock.tick_busy_loop, which rounds frames to whole ms: 62.5fps).
+#   hybrid:  sleep until SPIN_MARGIN_S before the deadline, then spin.
+# Pick one with --pacing=<name> or BEVO_PACING.
+PACING_STRATEGIES = ("browser", "busy", "hybrid")
+SIM_DT = 1.0 / FPS
+MAX_SIM_STEPS = 4         # per presented frame; time beyond that is dropped (a hitch)
+SPIN_MARGIN_S = 0.002     # OS sleeps overshoot by about this much
+SNAP_TOLERANCE_S = 0.0005  # intervals this close to whole refresh periods are snapped to them
+PACING_WINDOW = 240       # frames of interval history for the stats and refresh estimate
+MAX_CADENCE = 3           # at most this many sim steps per present when frames run long
+
+
+def pacing_strategy():
+    for arg in sys.argv[1:]:
+        if arg.startswith("--pacing="):
+            name = arg.split("=", 1)[1]
+            break
+    else:
+        name = os.environ.get("BEVO_PACING") or ("browser" if sys.platform == "emscripten" else "hybrid")
+    return name if name in PACING_STRATEGIES else "hybrid"
 
-    player = Player()
-    message = None
-    message_timer = 0
 
-    running = True
-    while running:
-        dt_ms = clock.tick(FPS)
-        dt = dt_ms / 1000.0
+class FrameStats:
+    """Presented-frame intervals plus dropped (sim frames never shown, beyond
+    the planned cadence; not counted while the cadence is unknown) and
+    duplicated (presents with no new sim step; on a display faster than FPS
+    some are expected) counts."""
 
-        # --- Events ---
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    running = False
-                if event.key == pygame.K_r:
-                    # Only allow reset if not in death animation, OR if death animation finished and player is dead
-                    if not death_animation_active and (player.lives > 0 or player.lives == 0):
-                        reset_game(player)
-                        message = "Game reset - good luck, Bevo!"
-                        message_timer = FPS
-                if event.key in (pygame.K_LEFT, pygame.K_a):
-                    move_left = True
-                if event.key in (pygame.K_RIGHT, pygame.K_d):
-                    move_right = True
-                if event.key in (pygame.K_UP, pygame.K_w, pygame.K_SPACE):
-                    jump_pressed = True
-                # First key press also starts audio on mobile
-                if not started:
-                    started = True
-                    # Lazy mixer init for iOS
-                    try:
-                        pygame.mixer.init()
-                        GRUNT_SFX = pygame.mixer.Sound(AS_GRUNT)
-                        GRUNT_SFX.set_volume(1.0)
-                        mixer_ready = True
-                    except Exception:
-                        mixer_ready = False
-
-            elif event.type == pygame.KEYUP:
-                if event.key in (pygame.K_LEFT, pygame.K_a):
-                    move_left = False
-                if event.key in (pygame.K_RIGHT, pygame.K_d):
-                    move_right = False
-                if event.key in (pygame.K_UP, pygame.K_w, pygame.K_SPACE):
-                    jump_pressed = False
-
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                # First interaction => enable audio
-                if not started:
-                    started = True
-                    try:
-                        pygame.mixer.init()
-                        GRUNT_SFX = pygame.mixer.Sound(AS_GRUNT)
-                        GRUNT_SFX.set_volume(1.0)
-                        mixer_ready = True
-                    except Exception:
-                        mixer_ready = False
-
-                sw, sh = screen.get_size()
-                left_r, right_r, jump_r = screen_buttons(screen.get_rect())
-                mx, my = event.pos
-                if left_r.collidepoint(mx, my):
-                    move_left = True
-                elif right_r.collidepoint(mx, my):
-                    move_right = True
-                elif jump_r.collidepoint(mx, my):
-                    jump_pressed = True
+    def __init__(self):
+        self.intervals = deque(maxlen=PACING_WINDOW)
+        self.dropped = 0
+        self.duplicated = 0
+
+    def record(self, interval, steps, lost, cadence=1):
+        self.intervals.append(interval)
+        if steps == 0:
+            self.duplicated += 1
+        elif cadence is not None and steps > cadence:
+            self.dropped += steps - cadence
+        self.dropped += lost
+
+    def jitter(self):
+        """Standard deviation of the frame interval, in seconds."""
+        n = len(self.intervals)
+        if n < 2:
+            return 0.0
+        mean = sum(self.intervals) / n
+        return math.sqrt(sum((i - mean) ** 2 for i in self.intervals) / n)
+
+    def percentile(self, q):
+        if not self.intervals:
+            return 0.0
+        ordered = sorted(self.intervals)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class FramePacer:
+    def __init__(self, strategy):
+        self.strategy = strategy
+        self.stats = FrameStats()
+        self.cadence = 1          # sim steps per present on the desktop strategies
+        self.refresh = None       # measured display period when it is steady (browser)
+        self.raf_cadence = None   # most sim steps one typical rAF interval carries (browser)
+        self.acc = 0.0
+        self.frames = 0
+        self._slow = self._fast = 0
+        self.reset()
+
+    def reset(self):
+        """Start afresh after loading or idling: that time is not simulated."""
+        now = time.perf_counter()
+        self.last = self.deadline = self.work_start = now
+        self.acc = 0.0
+        clock.tick()
+
+    async def next_frame(self):
+        """Wait for the next frame; returns how many SIM_DT steps it carries."""
+        if self.strategy == "browser":
+            await asyncio.sleep(0)  # returns on the next animation frame
+            clock.tick()
+            interval = self._advance()
+            if self.frames % 30 == 0:
+                self._measure_refresh()
+            if self.refresh:
+                periods = round(interval / self.refresh)
+                if periods and abs(interval - periods * self.refresh) < SNAP_TOLERANCE_S:
+                    interval = periods * self.refresh
+            self.acc += interval
+            steps = int(self.acc / SIM_DT + 1e-6)
+            self.acc -= steps * SIM_DT
+            cadence = self.raf_cadence
+        else:
+            # We are the clock: each frame is the next deadline on a fixed
+            # schedule and carries `cadence` steps, whatever the wake-up noise.
+            work = time.perf_counter() - self.work_start
+            target = self.cadence * SIM_DT
+            self.deadline += target
+            steps = self.cadence
+            now = time.perf_counter()
+            if now > self.deadline + target:
+                # Too far behind to catch up: simulate the missed time, restart the schedule
+                steps += int((now - self.deadline) / SIM_DT)
+                self.deadline = now
+            if self.strategy == "hybrid" and self.deadline - now > SPIN_MARGIN_S:
+                await asyncio.sleep(self.deadline - now - SPIN_MARGIN_S)
+            else:
+                await asyncio.sleep(0)
+            while time.perf_counter() < self.deadline:
+                pass
+            clock.tick()
+            interval = self._advance()
+            cadence = self.cadence
+            self._adapt_cadence(work, target)
+
+        lost = 0
+        if steps > MAX_SIM_STEPS:
+            lost = steps - MAX_SIM_STEPS
+            steps = MAX_SIM_STEPS
+            self.acc = 0.0
+        self.stats.record(interval, steps, lost, cadence)
+        return steps
+
+    def _advance(self):
+        now = time.perf_counter()
+        interval = now - self.last
+        self.last = self.work_start = now
+        self.frames += 1
+        return interval
+
+    def _measure_refresh(self):
+        """Fixed-refresh displays give steady rAF intervals; VRR ones don't, and
+        then raw time is used (the display follows our presents anyway)."""
+        recent = list(self.stats.intervals)[-60:]
+        if len(recent) < 60:
+            return
+        median = sorted(recent)[30]
+        steady = sum(abs(i - median) < SNAP_TOLERANCE_S * 2 for i in recent)
+        self.refresh = median if steady >= 48 else None
+        # A 50 Hz display alternates 1 and 2 steps a frame: 2 is on cadence, not a drop
+        self.raf_cadence = max(1, math.ceil((self.refresh or median) / SIM_DT - 0.1))
+
+    def _adapt_cadence(self, work, target):
+        """Frames that keep overrunning their slot present every other (third)
+        sim step for an even cadence; drop back once there is room again."""
+        if work > 0.95 * target and self.cadence < MAX_CADENCE:
+            self._slow += 1
+            self._fast = 0
+            if self._slow >= 30:
+                self.cadence += 1
+                self._slow = 0
+        elif self.cadence > 1 and work < 0.6 * (self.cadence - 1) * SIM_DT:
+            self._fast += 1
+            self._slow = 0
+            if self._fast >= 120:
+                self.cadence -= 1
+                self._fast = 0
+        else:
+            self._slow = self._fast = 0
 
-            elif event.type == pygame.MOUSEBUTTONUP:
-                sw, sh = screen.get_size()
-                left_r, right_r, jump_r = screen_buttons(screen.get_rect())
-                mx, my = event.pos
-                if left_r.collidepoint(mx, my):
-                    move_left = False
-                if right_r.collidepoint(mx, my):
-                    move_right = False
-                if jump_r.collidepoint(mx, my):
-                    jump_pressed = False
-
-        # --- Update ---
-        # Only allow player movement if not in death animation
-        player_input_left = move_left if not death_animation_active else False
-        player_input_right = move_right if not death_animation_active else False
-        player_input_jump = jump_pressed if not death_animation_active else False
-        
-        death_animation_finished = player.update(dt, player_input_left, player_input_right, player_input_jump)
-        
-        # Update death animation timer
-        if death_animation_active:
-            death_animation_time += dt
-            # Check if death animation is complete (Bevo fell off screen)
-            if death_animation_finished:
-                death_animation_active = False
-                death_animation_time = 0.0
-        
-        # Only update enemies if not in death animation
-        if not death_animation_active:
-            for e in ENEMIES:
-                e.update(dt)
+    def slack(self):
+        """Seconds left before the next frame is due."""
+        now = time.perf_counter()
+        if self.strategy == "browser":
+            return (self.refresh or SIM_DT) - (now - self.last)
+        return self.deadline + self.cadence * SIM_DT - now
 
-        # Update win animation timer if flag is reached
-        if flag_reached:
-            win_animation_time += dt
-            
-            # Update confetti particles
-            particles_to_remove = []
-            for particle in confetti_particles:
-                if particle.update(dt):
-                    particles_to_remove.append(particle)
-            
-            # Remove expired particles
-            for particle in particles_to_remove:
-                confetti_particles.remove(particle)
-
-        # Only check collisions and failures if not in death animation
-        if not death_animation_active:
-            check_fail(player)
-            m, delta = check_enemy_collisions(player)
-            if m:
-                message = m
-                message_timer = int(FPS * 1.2)
-                player.score += delta
-
-            # Create bevo_rect alias for player rectangle
-            bevo_rect = player.rect
-            
-            # Flag collision detection
-            if bevo_rect.colliderect(FLAG_RECT):
-                if not flag_reached:
-                    flag_reached = True
-                    spawn_confetti()
+    def summary(self):
+        rate = f"{1 / self.refresh:.0f}Hz" if self.refresh else f"{FPS // self.cadence}fps"
+        return (f"pace {self.strategy} {rate} jitter {self.stats.jitter() * 1000:.2f}ms "
+                f"p99 {self.stats.percentile(0.99) * 1000:.1f}ms "
+                f"drop {self.stats.dropped} dup {self.stats.duplicated}")
 
-        won = flag_reached
 
-        # --- Draw to virtual surface ---
-        # --- Camera logic ---
-        camera_x = player.rect.centerx - VIRTUAL_W // 2
-        camera_x = max(0, min(camera_x, WORLD_WIDTH - VIRTUAL_W))  # clamp camera
+pacer = FramePacer(pacing_strategy())
 
-        # --- Draw to virtual surface ---
-        draw_world(virtual, camera_x)
 
-        # Draw enemies with offset
-        for e in ENEMIES:
-            e.draw_offset(virtual, camera_x)
+# ------------------------------
+# Deferred content (loaded after the first frame is on screen)
+# ------------------------------
+def start_campaign():
+    activate_level(LEVEL_1)
+
 
-        # Draw player with offset
-        player.draw_offset(virtual, camera_x)
+CONTENT_STEPS = [
+    ("images", load_images),
+    ("level", start_campaign),
+    ("win assets", load_win_assets),
+]
+
+
+def load_content():
+    """Load all content in one go (headless tools); main() spreads CONTENT_STEPS over frames."""
+    for _, step in CONTENT_STEPS:
+        step()
 
 
+def present_virtual():
+    """Copy the virtual canvas to the window, scaling straight into the display surface."""
+    size = screen.get_size()
+    if size == virtual.get_size():
+        screen.blit(virtual, (0, 0))
+    else:
+        pygame.transform.smoothscale(virtual, size, screen)
+
+
+def present_frame(queued=rq):
+    """Draw the queued frame (rq, or a snapshot of it) into the window: straight
+    at window resolution in native mode, else through the virtual canvas."""
+    global screen
+    if not NATIVE_RENDER:
+        queued.flush(virtual)
+        present_virtual()
+        return
+    screen = pygame.display.get_surface()  # follows window resizes
+    view.fit(screen.get_size())
+    if view.scale == 1 and view.rect.size == screen.get_size():
+        queued.flush(screen)  # the window is the virtual size: nothing to scale
+    else:
+        queued.flush_native(screen, view)
+
+
+def render_frame(player, state_msg=None, show_debug=False, tap_overlay=False):
+    """Draw a frame into the window, ready to flip (profile_scenarios.py)."""
+    queue_frame(player, state_msg, pacing_lines() if show_debug else None, tap_overlay)
+    present_frame()
+    draw_buttons(screen)
+
+
+def queue_frame(player, state_msg=None, debug=None, tap_overlay=False):
+    """Queue a frame's draws in rq; `debug` is pacing_lines() for the F3 readout."""
+    rq.begin(camera_for(player))
+    draw_world(rq)
+
+    # Enemies (sleeping ones are off-screen) and player
+    for e in enemy_scheduler.awake:
+        e.queue_draw(rq)
+    player.queue_draw(rq)
+
+    draw_hud(rq, player, state_msg)
+    if debug is not None:
+        draw_debug(rq, debug)
+
+    # If not started (mobile), show tap overlay
+    if tap_overlay:
+        rq.submit(LAYER_OVERLAY, solid_surface((0, 0, 0, 120), (VIRTUAL_W, VIRTUAL_H)), 0, 0)
+        draw_text(rq, "Tap to Start (enables sound)", VIRTUAL_W//2 - 170, VIRTUAL_H//2 - 10, WHITE, LAYER_OVERLAY)
+
+
+def draw_boot_frame():
+    """The very first frame: needs nothing but the display and the bundled font."""
+    rq.begin(0)
+    rq.clear_color = SKY
+    draw_text(rq, "Tap to Start (enables sound)", VIRTUAL_W//2 - 170, VIRTUAL_H//2 - 10, WHITE, LAYER_OVERLAY)
+    present_frame()
+    pygame.display.flip()
+
+
+# ------------------------------
+# Frames: simulate, then draw (on one thread, or pipelined on two)
+# ------------------------------
+class Session:
+    """A run as the main loop plays it: the player, the message line, and each
+    frame's simulate-then-queue step. Pipelined, it lives on the simulation
+    thread and hears from the window only through frame()'s arguments."""
+
+    def __init__(self, watcher=None):
+        self.player = Player()
+        self.message = None
+        self.message_timer = 0
+        self.started = False
+        self.watcher = watcher
+
+    def static(self):
+        """Nothing moves before "Tap to Start" and on "Game Over"."""
+        return not self.started or (self.player.lives == 0 and not death_animation_active)
+
+    def frame(self, steps, inputs, started, reset, debug=None):
+        """Simulate a frame of `steps` steps and queue its draws in rq.
+
+        `inputs` holds one (left, right, jump) sample per step; on a static
+        screen they are not simulated. `started` and `reset` come from the
+        window's first tap and R key, `debug` is pacing_lines() while F3 is on.
+        """
+        if alloc_tracker.enabled:
+            alloc_tracker.begin_frame()
+        player = self.player
+        if started and not self.started:
+            self.started = True
+            audio.unlock()  # lazy mixer init for iOS; decoding happens later in audio.pump()
+        # Only allow reset if not in death animation, OR if death animation finished and player is dead
+        if reset and not death_animation_active and (player.lives > 0 or player.lives == 0):
+            reset_game(player)
+            self.message = "Game reset - good luck, Bevo!"
+            self.message_timer = FPS
+        if self.watcher is not None:
+            self.watcher.pump(player)
+
+        if not self.static():
+            for sample in inputs:
+                # Sounds are placed relative to what the player can see as they start
+                audio.listener_x = camera_for(player) + VIRTUAL_W // 2
+                m = update_game(player, SIM_DT, *sample)
+                if m:
+                    self.message = m
+                    self.message_timer = int(FPS * 1.2)
+
+        won = flag_reached
+        audio.pump()
+
         state_msg = None
-        if message_timer > 0:
-            state_msg = message
-            message_timer -= 1
+        if self.message_timer > 0:
+            state_msg = self.message
+            self.message_timer -= steps
         if player.lives == 0 and not death_animation_active:
             state_msg = "Game Over! Press R to retry"
         elif death_animation_active:
@@ -1253,27 +3416,195 @@ async def main():
         elif won:
             state_msg = "🏆 Bevo Wins the Red River Showdown! Tap R to replay"
 
-        draw_hud(virtual, player, state_msg)
+        queue_frame(player, state_msg, debug, tap_overlay=not self.started)
+        if alloc_tracker.enabled:
+            alloc_tracker.end_frame(self.started and not won and player.lives > 0 and not death_animation_active)
+
+    def produce(self, job):
+        """FramePipeline's half of a frame: simulate it and snapshot what to draw."""
+        self.frame(job.steps, job.inputs, job.started, job.reset, job.debug)
+        return FrameSnapshot(rq.snapshot(), tuple(button_blits(job.size)), self.static(), job.input_ms)
+
+
+# What the window sends the simulation thread for a frame, and what comes back.
+# Both are immutable: the surfaces a snapshot refers to are never drawn on again.
+FrameJob = namedtuple("FrameJob", "steps inputs started reset debug size input_ms")
+FrameSnapshot = namedtuple("FrameSnapshot", "queued buttons static input_ms")
+
+
+class FramePipeline:
+    """Simulates frame N+1 on a thread of its own while the window thread
+    composites and presents frame N (desktop, with --pipeline or BEVO_PIPELINE=1).
+
+    The window thread submit()s a FrameJob and collect()s the FrameSnapshot
+    that produce(job) returns. Each goes through a one-slot queue, so the
+    simulation runs at most one frame ahead, and the threads share nothing
+    mutable: the window thread owns the display, the virtual canvas and the
+    pacing, the simulation thread everything else. Blits hold the GIL, but
+    the smoothscale to the window and the flip do not, so a second core takes
+    those off the frame. Snapshots are released on the simulation thread,
+    two frames on, so the surfaces they held are finalized there too (see
+    SurfaceRegistry). An exception in produce() is raised by collect().
+    The window thread also grant()s prefetch time from its pacing slack; the
+    steps run on the simulation thread, which owns the level caches, between
+    jobs.
+    """
+
+    def __init__(self, produce):
+        self.produce = produce
+        self.last = None  # latest collected snapshot
+        self._jobs = queue.Queue(maxsize=1)
+        self._frames = queue.Queue(maxsize=1)
+        self._in_flight = False
+        self._thread = threading.Thread(target=self._run, name="simulation", daemon=True)
+        self._thread.start()
+
+    def submit(self, job):
+        """Start simulating a frame; collect() the one before it first."""
+        self._jobs.put(job)
+        self._in_flight = True
+
+    def collect(self):
+        """The submitted frame's snapshot, once ready; the last one if none is in flight."""
+        if self._in_flight:
+            self._in_flight = False
+            frame = self._frames.get()
+            if isinstance(frame, BaseException):
+                raise frame
+            self.last = frame
+        return self.last
+
+    def grant(self, budget_s):
+        """Queue budget_s of prefetching after the job in flight; dropped if the slot is taken."""
+        if budget_s > 0:
+            try:
+                self._jobs.put_nowait(budget_s)
+            except queue.Full:
+                pass  # prefetching can wait: take() finishes a level that is not ready
+
+    def close(self):
+        self.collect()
+        self.last = None
+        self._jobs.put(None)
+        self._thread.join()
+
+    def _run(self):
+        recent = deque(maxlen=2)  # snapshots the window thread may still hold
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            if isinstance(job, float):  # a grant() from the window thread
+                prefetcher.grant(job)
+                continue
+            try:
+                frame = self.produce(job)
+            except BaseException as exc:
+                self._frames.put(exc)
+                return
+            recent.append(frame)
+            self._frames.put(frame)
 
-        # If not started (mobile), show tap overlay
-        if not started:
-            overlay = pygame.Surface((VIRTUAL_W, VIRTUAL_H), pygame.SRCALPHA)
-            overlay.fill((0, 0, 0, 120))
-            virtual.blit(overlay, (0, 0))
-            draw_text(virtual, "Tap to Start (enables sound)", VIRTUAL_W//2 - 170, VIRTUAL_H//2 - 10, WHITE)
 
-        # --- Scale to screen & draw buttons ---
-        sw, sh = screen.get_size()
-        scaled = pygame.transform.smoothscale(virtual, (sw, sh))
-        screen.blit(scaled, (0, 0))
-        draw_buttons(screen)
-        pygame.display.flip()
+def present_snapshot(frame):
+    """Draw a FrameSnapshot into the window, ready to flip."""
+    present_frame(frame.queued)
+    screen.blits(frame.buttons, doreturn=False)
 
-        # Clear virtual surface for next frame
-        virtual.fill((0, 0, 0, 0))
 
-        await asyncio.sleep(0)  # yield to browser
+# ------------------------------
+# Async main loop (PyGBag friendly)
+# ------------------------------
+async def main():
+    global started
+
+    draw_boot_frame()
+    startup.mark("first frame")
+    for name, step in CONTENT_STEPS:
+        await asyncio.sleep(0)  # let the browser present between steps
+        step()
+        startup.mark(name)
+    print(startup.report())
+    watcher = None
+    if WATCH and sys.platform != "emscripten":
+        watcher = LevelWatcher(os.path.abspath(__file__), LEVEL_1)
+        watcher.start()
+    if ALLOC_TRACE:
+        alloc_tracker.start()
+
+    session = Session(watcher)
+    pipeline = FramePipeline(session.produce) if PIPELINE else None
+    show_debug = False
+
+    pacer.reset()  # don't count loading time as the first frame's dt
+    running = True
+    while running:
+        steps = await pacer.next_frame()
 
+        # --- Events ---
+        reset = False
+        screen_rect = screen.get_rect()
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    running = False
+                if event.key == pygame.K_r:
+                    reset = True  # if allowed, see Session.frame
+                if event.key == pygame.K_F3:
+                    show_debug = not show_debug
+
+            controls.handle_event(event, screen_rect)
+            idle.handle_event(event)
+            # First key press / tap starts the game, and audio on mobile
+            if not started and event.type in (pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN, pygame.FINGERDOWN):
+                started = True
+        controls.polled()
+        if watcher is not None and watcher.patches:
+            idle.dirty = True  # show the edit on a static screen too
+
+        # --- Idle: nothing changes on static screens, nothing is seen while hidden ---
+        if pipeline is None:
+            static = session.static()
+        else:
+            frame = pipeline.collect()  # simulated while the one before it was presented
+            static = frame is None or frame.static
+        if idle.hidden or static:
+            if not idle.should_present(static):
+                (pipeline or prefetcher).grant(IDLE_POLL_S * 0.5)  # nothing on screen to hitch
+                await asyncio.sleep(IDLE_POLL_S)
+                pacer.reset()  # the time spent idle is not simulated
+                continue
+
+        # --- Update and draw ---
+        inputs = tuple(controls.sample() for _ in range(steps))
+        debug = pacing_lines() if show_debug else None
+        if pipeline is None:
+            session.frame(steps, inputs, started, reset, debug)
+            present_frame()
+            draw_buttons(screen)
+            pygame.display.flip()
+            controls.presented()
+            idle.presented()
+            # Whatever is left of this frame (less the wake-up margin) goes to prefetching
+            prefetcher.grant(min(PREFETCH_BUDGET_S, pacer.slack() - 2 * SPIN_MARGIN_S))
+        else:
+            # The next frame simulates while this one is drawn; its inputs show a frame later
+            pipeline.submit(FrameJob(steps, inputs, started, reset, debug, screen.get_size(), controls.pending_input()))
+            if frame is not None:
+                present_snapshot(frame)
+                pygame.display.flip()
+                controls.presented_input(frame.input_ms)
+                idle.presented()
+                pipeline.grant(min(PREFETCH_BUDGET_S, pacer.slack() - 2 * SPIN_MARGIN_S))
+
+    if pipeline is not None:
+        pipeline.close()
+    print(controls.latency.summary())
+    print(pacer.summary())
+    if alloc_tracker.enabled:
+        print(alloc_tracker.report())
     # Don’t call pygame.quit() or sys.exit() in web build
     return
 
@@ -0,0 +1,727 @@
+"""
+Bevo vs. OU — State Sync for Co-op / Versus
+===========================================
+Two ways to keep several players' games in step:
+
+- Snapshots: one host simulates; every client gets compact binary snapshots
+  (SNAPSHOT_HZ a second), each delta-compressed field by field against the last
+  snapshot that client acknowledged. Clients send only their inputs and acks.
+  Enemies are sent only near that client's Bevo, so bandwidth stays in the low
+  KB/s with hundreds of enemies in the level.
+- Lockstep: every peer simulates; only inputs travel (one byte per frame per
+  player, INPUT_DELAY frames ahead), plus a state hash now and then to catch
+  desyncs. Needs identical content and seed on every peer.
+
+All messages go through a relay: a tiny TCP stand-in for the websocket server
+the web build would use, with the same one-message-per-frame framing.
+
+Usage (desktop only, not part of the web build):
+  python netsync.py serve --port 8765            # relay only
+  python netsync.py demo --mode snapshot --extra-enemies 300
+  python netsync.py demo --mode lockstep --frames 1800
+
+The demo starts a relay on localhost plus two peer processes and reports
+bytes/s per client, snapshot round-trip mismatches and lockstep desyncs.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import random
+import signal
+import struct
+import sys
+import warnings
+import zlib
+from collections import deque
+
+SNAPSHOT_HZ = 10
+INPUT_DELAY = 3        # lockstep: frames between sampling an input and simulating it
+HASH_EVERY = 30        # lockstep: frames between state hashes
+INTEREST_RADIUS = 700  # world px around a client's Bevo within which enemies are sent (a screen and a bit)
+HISTORY = 64           # snapshots kept per client while waiting for acks
+
+MSG_WELCOME, MSG_START, MSG_SNAPSHOT, MSG_ACK, MSG_INPUT, MSG_HASH, MSG_BYE = range(1, 8)
+BROADCAST = 255
+
+WELCOME = struct.Struct("<BBI")     # type, player id, seed
+SNAPSHOT_HEADER = struct.Struct("<BII")  # type, seq, baseline seq (0 = none)
+ACK = struct.Struct("<BBI")         # type, player id, seq
+INPUT = struct.Struct("<BBIB")      # type, player id, frame, input bits
+HASH = struct.Struct("<BBII")       # type, player id, frame, crc32
+FRAME = struct.Struct("<IB")        # relay framing: payload length, destination
+
+# Packed flag bits
+IN_LEFT, IN_RIGHT, IN_JUMP = 1, 2, 4
+P_FACING, P_GROUND, P_DYING = 1, 2, 4
+E_FACING, E_PAUSE, E_FLEX, E_NEXT_FLEX, E_DEAD = 1, 2, 4, 8, 16
+W_FLAG, W_DEATH_ANIM = 1, 2
+
+# Sections in wire order; every entity in a section is a tuple of ints
+SECTIONS = ("world", "players", "enemies")
+
+
+# ------------------------------
+# Varints
+# ------------------------------
+def _put_varint(out, n):
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _get_varint(buf, pos):
+    n = shift = 0
+    while True:
+        b = buf[pos]
+        pos += 1
+        n |= (b & 0x7F) << shift
+        if b < 0x80:
+            return n, pos
+        shift += 7
+
+
+def _zigzag(n):
+    return n * 2 if n >= 0 else -n * 2 - 1
+
+
+def _unzigzag(n):
+    return n >> 1 if not n & 1 else -(n >> 1) - 1
+
+
+# ------------------------------
+# Snapshot codec
+# ------------------------------
+def encode_snapshot(seq, snap, base_seq=0, base=None):
+    """Binary snapshot; with a baseline only changed fields are written, as zigzag deltas.
+
+    Per section: count of changed entities, then for each its id (delta from the
+    previous id), a bitmask of changed fields and their deltas; then the ids
+    that are gone since the baseline.
+    """
+    out = bytearray(SNAPSHOT_HEADER.pack(MSG_SNAPSHOT, seq, base_seq if base is not None else 0))
+    for name in SECTIONS:
+        cur = snap[name]
+        old = base[name] if base is not None else {}
+        changed = []
+        for eid in sorted(cur):
+            fields = cur[eid]
+            prev = old.get(eid)
+            if prev is None:
+                prev = (0,) * len(fields)
+            mask = 0
+            for i, (a, b) in enumerate(zip(fields, prev)):
+                if a != b:
+                    mask |= 1 << i
+            if mask or eid not in old:
+                changed.append((eid, mask, fields, prev))
+        _put_varint(out, len(changed))
+        last = 0
+        for eid, mask, fields, prev in changed:
+            _put_varint(out, eid - last)
+            last = eid
+            _put_varint(out, mask)
+            for i, (a, b) in enumerate(zip(fields, prev)):
+                if mask & (1 << i):
+                    _put_varint(out, _zigzag(a - b))
+        gone = sorted(eid for eid in old if eid not in cur)
+        _put_varint(out, len(gone))
+        last = 0
+        for eid in gone:
+            _put_varint(out, eid - last)
+            last = eid
+    return bytes(out)
+
+
+def decode_snapshot(data, baselines, widths):
+    """Inverse of encode_snapshot. baselines maps seq -> decoded snapshot; widths
+    maps section -> fields per entity. Returns (seq, snapshot); raises KeyError
+    if the baseline is unknown."""
+    _, seq, base_seq = SNAPSHOT_HEADER.unpack_from(data)
+    base = baselines[base_seq] if base_seq else None
+    pos = SNAPSHOT_HEADER.size
+    snap = {}
+    for name in SECTIONS:
+        old = base[name] if base is not None else {}
+        cur = dict(old)
+        count, pos = _get_varint(data, pos)
+        eid = 0
+        zeros = (0,) * widths[name]
+        for _ in range(count):
+            step, pos = _get_varint(data, pos)
+            eid += step
+            mask, pos = _get_varint(data, pos)
+            fields = list(old.get(eid, zeros))
+            for i in range(len(fields)):
+                if mask & (1 << i):
+                    d, pos = _get_varint(data, pos)
+                    fields[i] += _unzigzag(d)
+            cur[eid] = tuple(fields)
+        count, pos = _get_varint(data, pos)
+        eid = 0
+        for _ in range(count):
+            step, pos = _get_varint(data, pos)
+            eid += step
+            del cur[eid]
+        snap[name] = cur
+    return seq, snap
+
+
+# ------------------------------
+# Game state <-> snapshot fields
+# ------------------------------
+WIDTHS = {"world": 5, "players": 9, "enemies": 3}
+
+
+class NetLevel:
+    """What both ends know about the level once it is loaded: the original
+    footballs (sent as a bitmask of those left) and how many enemies there were
+    (stomped ones are sent as dead). Reloaded when the campaign moves on."""
+
+    def __init__(self, game):
+        self.frame = 0
+        self.load(game)
+
+    def load(self, game):
+        self.number = game.current_level.number
+        self.footballs = [r.copy() for r in game.FOOTBALLS]
+        self.football_ids = {(r.x, r.y): i for i, r in enumerate(self.footballs)}
+        self.enemy_count = len(game.ENEMIES)
+
+    def follow(self, game):
+        if game.current_level.number != self.number:
+            self.load(game)
+
+
+def world_fields(game, level):
+    flags = (W_FLAG if game.flag_reached else 0) | (W_DEATH_ANIM if game.death_animation_active else 0)
+    mask = 0
+    for r in game.FOOTBALLS:
+        mask |= 1 << level.football_ids[(r.x, r.y)]
+    return (level.frame, level.number, flags, int(game.win_animation_time * 1000), mask)
+
+
+def player_fields(p):
+    flags = (P_FACING if p.facing_right else 0) | (P_GROUND if p.on_ground else 0) | (P_DYING if p.is_dying else 0)
+    return (p.rect.x, p.rect.y, round(p.vx * 100), round(p.vy * 100), flags,
+            p.lives, p.score, p.coins_collected, p.invuln_timer)
+
+
+def enemy_fields(e):
+    flags = ((E_FACING if e.facing_right else 0) | (E_PAUSE if e.state == "pause" else 0)
+             | (E_FLEX if e.flex_this_pause else 0) | (E_NEXT_FLEX if e.next_flex_toggle else 0))
+    return (e.rect.left, flags, round(e.pause_timer * 100))
+
+
+def capture(game, level, players, interest_x=None):
+    """Snapshot of the shared state. With interest_x only enemies within
+    INTEREST_RADIUS of it are included (dead ones always are: they cost nothing
+    once acknowledged)."""
+    level.follow(game)
+    alive = set()
+    enemies = {}
+    for e in game.ENEMIES:
+        alive.add(e.order)
+        if interest_x is None or abs(e.rect.centerx - interest_x) <= INTEREST_RADIUS:
+            enemies[e.order] = enemy_fields(e)
+    for order in range(level.enemy_count):
+        if order not in alive:
+            enemies[order] = (0, E_DEAD, 0)
+    return {
+        "world": {0: world_fields(game, level)},
+        "players": {i: player_fields(p) for i, p in enumerate(players)},
+        "enemies": enemies,
+    }
+
+
+def apply_snapshot(game, level, players, snap):
+    """Write a snapshot into this process's game (a client showing the host's world)."""
+    level.frame, number, flags, win_ms, mask = snap["world"][0]
+    if number != level.number:
+        # The host reached a flag; the next level is usually prefetched already
+        game.activate_level(game.prefetcher.take(number))
+        level.load(game)
+    game.flag_reached = bool(flags & W_FLAG)
+    game.death_animation_active = bool(flags & W_DEATH_ANIM)
+    game.win_animation_time = win_ms / 1000.0
+    game.FOOTBALLS[:] = [r.copy() for i, r in enumerate(level.footballs) if mask & (1 << i)]
+
+    for i, (x, y, vx, vy, pflags, lives, score, coins, invuln) in snap["players"].items():
+        if i >= len(players):
+            continue
+        p = players[i]
+        p.rect.topleft = (x, y)
+        p.vx, p.vy = vx / 100, vy / 100
+        p.facing_right = bool(pflags & P_FACING)
+        p.on_ground = bool(pflags & P_GROUND)
+        p.is_dying = bool(pflags & P_DYING)
+        p.lives, p.score, p.coins_collected, p.invuln_timer = lives, score, coins, invuln
+
+    by_order = {e.order: e for e in game.ENEMIES}
+    for order, (x, eflags, pause_cs) in snap["enemies"].items():
+        e = by_order.get(order)
+        if e is None:
+            continue
+        if eflags & E_DEAD:
+            game.ENEMIES.remove(e)
+            game.enemy_scheduler.remove(e)
+            continue
+        e.rect.left = x
+        e.facing_right = bool(eflags & E_FACING)
+        e.vx = abs(e.vx) if e.facing_right else -abs(e.vx)
+        e.state = "pause" if eflags & E_PAUSE else "move"
+        e.flex_this_pause = bool(eflags & E_FLEX)
+        e.next_flex_toggle = bool(eflags & E_NEXT_FLEX)
+        e.pause_timer = pause_cs / 100
+
+
+def state_hash(game, level, players):
+    return zlib.crc32(encode_snapshot(0, capture(game, level, players)))
+
+
+# ------------------------------
+# Shared simulation step
+# ------------------------------
+def pack_input(left, right, jump):
+    return (IN_LEFT if left else 0) | (IN_RIGHT if right else 0) | (IN_JUMP if jump else 0)
+
+
+def unpack_input(bits):
+    return bool(bits & IN_LEFT), bool(bits & IN_RIGHT), bool(bits & IN_JUMP)
+
+
+def step_coop(game, players, dt, inputs):
+    """One frame for several Bevos sharing a level. The first drives the world
+    (enemies, camera-based sleeping, the flag); the others move first and are
+    entered into the broadphase, so update_game's one sweep pairs them all.
+    Returns the frame's enemy-contact message, the first Bevo's before the
+    others'; hits and deaths are already applied by check_enemy_collisions."""
+    number = game.current_level.number
+    others = players[1:]
+    for p, (left, right, jump) in zip(others, inputs[1:]):
+        if p.update(dt, left, right, jump):
+            # This Bevo has fallen off screen; the shared death animation ends
+            # unless the first one is dying too
+            p.is_dying = False
+            if not players[0].is_dying:
+                game.death_animation_active = False
+        elif not p.is_dying:
+            game.check_fail(p)
+            game.broadphase.add(p)
+    message = game.update_game(players[0], dt, *inputs[0])
+    if game.current_level.number != number:
+        for p in others:  # everyone starts the next level together
+            p.spawn()
+        return message
+    if game.death_animation_active:
+        return message  # the world is frozen and update_game did not sweep
+    for p in others:
+        if not p.is_dying:
+            m, delta = game.check_enemy_collisions(p)
+            p.score += delta
+            message = message or m
+    return message
+
+
+# ------------------------------
+# Host / client (snapshot mode) and lockstep peers
+# ------------------------------
+class SnapshotHost:
+    """Sends each client deltas against the last snapshot it acknowledged."""
+
+    def __init__(self, game, level, players, conn):
+        self.game, self.level, self.players, self.conn = game, level, players, conn
+        self.seq = 0
+        self.history = {}   # client id -> {seq: snapshot}
+        self.acked = {}     # client id -> acknowledged seq
+        self.inputs = {}    # client id -> latest input bits
+
+    def handle(self, msg):
+        kind = msg[0]
+        if kind == MSG_ACK:
+            _, pid, seq = ACK.unpack(msg)
+            if seq > self.acked.get(pid, 0) and seq in self.history.get(pid, {}):
+                self.acked[pid] = seq
+                # Older snapshots can no longer be a baseline
+                hist = self.history[pid]
+                for old in [s for s in hist if s < seq]:
+                    del hist[old]
+        elif kind == MSG_INPUT:
+            _, pid, frame, bits = INPUT.unpack(msg)
+            self.inputs[pid] = bits
+
+    def send_snapshots(self, clients):
+        self.seq += 1
+        for pid in clients:
+            snap = capture(self.game, self.level, self.players, self.players[pid].rect.centerx)
+            hist = self.history.setdefault(pid, {})
+            base_seq = self.acked.get(pid, 0)
+            data = encode_snapshot(self.seq, snap, base_seq, hist.get(base_seq))
+            hist[self.seq] = snap
+            if len(hist) > HISTORY:
+                del hist[min(hist)]
+            self.conn.send(data, pid)
+
+
+class SnapshotClient:
+    def __init__(self, pid, conn):
+        self.pid, self.conn = pid, conn
+        self.baselines = {}
+        self.latest = None
+
+    def handle(self, msg):
+        """Decode and acknowledge a snapshot; returns it (None for other messages)."""
+        if msg[0] != MSG_SNAPSHOT:
+            return None
+        try:
+            seq, snap = decode_snapshot(msg, self.baselines, WIDTHS)
+        except KeyError:
+            return None  # baseline already dropped; the next one will use a newer ack
+        self.baselines[seq] = snap
+        if len(self.baselines) > HISTORY:
+            del self.baselines[min(self.baselines)]
+        self.latest = seq
+        self.conn.send(ACK.pack(MSG_ACK, self.pid, seq), 0)
+        return snap
+
+
+class LockstepPeer:
+    """Input-only lockstep: frame F runs once every player's input for F is in."""
+
+    def __init__(self, pid, num_players, conn):
+        self.pid, self.num_players, self.conn = pid, num_players, conn
+        self.frame = 0
+        self.inputs = {}    # frame -> {player id: bits}
+        self.hashes = {}    # frame -> {player id: crc}
+        self.desyncs = 0
+        self.left = False   # another player has gone: frames waiting on them never come
+        for f in range(INPUT_DELAY):
+            self.inputs[f] = dict.fromkeys(range(num_players), 0)
+
+    def local_input(self, bits):
+        frame = self.frame + INPUT_DELAY
+        self.inputs.setdefault(frame, {})[self.pid] = bits
+        self.conn.send(INPUT.pack(MSG_INPUT, self.pid, frame, bits))
+
+    def handle(self, msg):
+        kind = msg[0]
+        if kind == MSG_INPUT:
+            _, pid, frame, bits = INPUT.unpack(msg)
+            self.inputs.setdefault(frame, {})[pid] = bits
+        elif kind == MSG_HASH:
+            _, pid, frame, crc = HASH.unpack(msg)
+            self._check_hash(frame, pid, crc)
+        elif kind == MSG_BYE:
+            self.left = True
+
+    def ready(self):
+        return len(self.inputs.get(self.frame, ())) == self.num_players
+
+    def advance(self):
+        """Inputs for the current frame as (left, right, jump) per player; moves to the next frame."""
+        frame_inputs = self.inputs.pop(self.frame)
+        self.frame += 1
+        return [unpack_input(frame_inputs[p]) for p in range(self.num_players)]
+
+    def share_hash(self, crc):
+        frame = self.frame
+        self.conn.send(HASH.pack(MSG_HASH, self.pid, frame, crc))
+        self._check_hash(frame, self.pid, crc)
+
+    def _check_hash(self, frame, pid, crc):
+        seen = self.hashes.setdefault(frame, {})
+        seen[pid] = crc
+        if len(seen) == self.num_players:
+            if len(set(seen.values())) > 1:
+                self.desyncs += 1
+            del self.hashes[frame]
+
+
+# ------------------------------
+# Relay (websocket stand-in) and connections
+# ------------------------------
+class Connection:
+    """One relay connection: send() frames, poll() whatever has arrived."""
+
+    def __init__(self, reader, writer):
+        self.reader, self.writer = reader, writer
+        self.inbox = deque()
+        self.bytes_out = 0
+        self.bytes_in = 0
+        self.closed = False
+        self._task = asyncio.ensure_future(self._read())
+
+    async def _read(self):
+        try:
+            while True:
+                length, _ = FRAME.unpack(await self.reader.readexactly(FRAME.size))
+                self.inbox.append(await self.reader.readexactly(length))
+                self.bytes_in += FRAME.size + length
+        except (asyncio.IncompleteReadError, ConnectionError):
+            self.closed = True
+
+    def send(self, payload, dest=BROADCAST):
+        self.writer.write(FRAME.pack(len(payload), dest) + payload)
+        self.bytes_out += FRAME.size + len(payload)
+
+    def poll(self):
+        msgs = list(self.inbox)
+        self.inbox.clear()
+        return msgs
+
+    async def recv(self):
+        while not self.inbox:
+            if self.closed:
+                raise ConnectionError("relay closed")
+            await asyncio.sleep(0.001)
+        return self.inbox.popleft()
+
+    async def flush(self):
+        await self.writer.drain()
+
+    def close(self):
+        self._task.cancel()
+        self.writer.close()
+
+
+async def connect(host, port):
+    reader, writer = await asyncio.open_connection(host, port)
+    return Connection(reader, writer)
+
+
+class RelayServer:
+    """Hands out player ids in connection order, says start once `players` are
+    connected, then forwards each frame to its destination (or every other
+    player). Frames for a player that is not connected are dropped; when a
+    player disconnects the others are sent a bye."""
+
+    def __init__(self, seed=0, players=2):
+        self.seed = seed
+        self.players = players
+        self.writers = {}
+        self.next_id = 0
+        self.server = None
+
+    async def start(self, host="127.0.0.1", port=0):
+        self.server = await asyncio.start_server(self._serve, host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def _serve(self, reader, writer):
+        pid = self.next_id
+        self.next_id += 1
+        self.writers[pid] = writer
+        payload = WELCOME.pack(MSG_WELCOME, pid, self.seed)
+        writer.write(FRAME.pack(len(payload), pid) + payload)
+        if len(self.writers) == self.players:
+            for w in self.writers.values():
+                w.write(FRAME.pack(1, BROADCAST) + bytes([MSG_START]))
+        try:
+            while True:
+                header = await reader.readexactly(FRAME.size)
+                length, dest = FRAME.unpack(header)
+                frame = header + await reader.readexactly(length)
+                for other, w in list(self.writers.items()):
+                    if other != pid and dest in (BROADCAST, other):
+                        w.write(frame)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.writers.pop(pid, None)
+            writer.close()
+            for w in self.writers.values():
+                w.write(FRAME.pack(1, BROADCAST) + bytes([MSG_BYE]))
+
+    def close(self):
+        self.server.close()
+
+
+# ------------------------------
+# Demo peers
+# ------------------------------
+def load_game():
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    os.environ.setdefault("SDL_NO_SIGNAL_HANDLERS", "1")  # SIGTERM ends a peer, not posts it a QUIT
+    here = os.path.dirname(os.path.abspath(__file__))
+    os.chdir(here)
+    if here not in sys.path:
+        sys.path.insert(0, here)
+    warnings.simplefilter("ignore")
+    with contextlib.redirect_stdout(io.StringIO()):
+        import main as game
+        game.load_content()
+    return game
+
+
+def start_level(game, players, seed, extra_enemies):
+    """Same level on every peer: reset, then the same extra enemies."""
+    random.seed(seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for p in players:
+            game.reset_game(p)
+    rng = random.Random(seed)
+    for _ in range(extra_enemies):
+        p = game.PLATFORMS[rng.randrange(len(game.PLATFORMS))]
+        game.ENEMIES.append(game.Enemy(p.left + rng.randrange(max(1, p.width)), p.top, rng.choice((1.0, 1.4, 1.8))))
+    game.enemy_scheduler.rebuild(game.ENEMIES)
+    return NetLevel(game)
+
+
+def demo_inputs(seed):
+    rng = random.Random(seed)
+    while True:
+        bits = pack_input(False, rng.random() < 0.7, rng.random() < 0.3)
+        for _ in range(rng.randint(4, 40)):
+            yield bits
+
+
+async def run_peer(args):
+    game = load_game()
+    conn = await connect("127.0.0.1", args.port)
+    _, pid, seed = WELCOME.unpack(await conn.recv())
+    players = [game.Player() for _ in range(2)]
+    level = start_level(game, players, seed, args.extra_enemies)
+    while (await conn.recv())[0] != MSG_START:
+        pass
+    inputs = demo_inputs(seed * 7919 + pid)
+    dt = 1.0 / game.FPS
+    every = max(1, game.FPS // SNAPSHOT_HZ)
+    mismatches = 0
+
+    if args.mode == "lockstep":
+        peer = LockstepPeer(pid, 2, conn)
+        while peer.frame < args.frames:
+            peer.local_input(next(inputs))
+            await conn.flush()
+            while not peer.ready():
+                for msg in conn.poll():
+                    peer.handle(msg)
+                if peer.ready():
+                    break
+                if conn.closed:
+                    raise ConnectionError("relay closed")
+                if peer.left:
+                    raise ConnectionError("the other player left")
+                await asyncio.sleep(0.0005)
+            step_coop(game, players, dt, peer.advance())
+            level.frame = peer.frame
+            if peer.frame % HASH_EVERY == 0:
+                peer.share_hash(state_hash(game, level, players))
+        for _ in range(200):  # let the last hashes arrive
+            for msg in conn.poll():
+                peer.handle(msg)
+            if conn.closed or peer.left:
+                break
+            await asyncio.sleep(0.005)
+        report = f"desyncs={peer.desyncs}"
+    elif pid == 0:
+        host = SnapshotHost(game, level, players, conn)
+        for frame in range(args.frames):
+            for msg in conn.poll():
+                host.handle(msg)
+            step_coop(game, players, dt, [unpack_input(next(inputs)), unpack_input(host.inputs.get(1, 0))])
+            level.frame = frame + 1
+            if frame % every == 0:
+                host.send_snapshots([1])
+            await conn.flush()
+            await asyncio.sleep(1.0 / game.FPS)  # real time, so acks come back at a real pace
+        conn.send(bytes([MSG_BYE]))
+        await conn.flush()
+        report = f"snapshots={host.seq}"
+    else:
+        client = SnapshotClient(pid, conn)
+        done = False
+        frame = 0
+        sent_bits = None
+        while not done:
+            for msg in conn.poll():
+                if msg[0] == MSG_BYE:
+                    done = True
+                snap = client.handle(msg)
+                if snap is not None:
+                    apply_snapshot(game, level, players, snap)
+                    # Everything sent must read back identically from the game
+                    again = capture(game, level, players)
+                    for name in SECTIONS:
+                        for eid, fields in snap[name].items():
+                            if name == "players":
+                                # velocities travel at 1/100 px
+                                same = fields[:2] + fields[4:] == again[name][eid][:2] + again[name][eid][4:]
+                            else:
+                                same = again[name].get(eid, fields) == fields
+                            mismatches += not same
+            # Inputs go out when they change, and once per snapshot period in case
+            bits = next(inputs)
+            frame += 1
+            if bits != sent_bits or frame % every == 0:
+                conn.send(INPUT.pack(MSG_INPUT, pid, level.frame, bits), 0)
+                sent_bits = bits
+            await conn.flush()
+            if conn.closed:
+                break
+            await asyncio.sleep(1.0 / game.FPS)
+        report = f"snapshots={client.latest} mismatches={mismatches}"
+
+    seconds = args.frames / game.FPS  # per second of play
+    print(f"peer {pid} ({args.mode}): sent {conn.bytes_out / seconds / 1024:.2f} KB/s, "
+          f"received {conn.bytes_in / seconds / 1024:.2f} KB/s | {report}", flush=True)
+    conn.close()
+
+
+async def run_demo(args):
+    relay = RelayServer(seed=args.seed)
+    port = await relay.start(port=args.port)
+    cmd = [sys.executable, os.path.abspath(__file__), "peer", "--port", str(port), "--mode", args.mode,
+           "--frames", str(args.frames), "--extra-enemies", str(args.extra_enemies)]
+    procs = []
+    loop, task = asyncio.get_running_loop(), asyncio.current_task()
+    with contextlib.suppress(NotImplementedError):  # no signal handlers on Windows' loop
+        loop.add_signal_handler(signal.SIGTERM, task.cancel)
+    try:
+        for _ in range(2):
+            procs.append(await asyncio.create_subprocess_exec(*cmd))
+            await asyncio.sleep(0.2)  # connection order = player id
+        for p in procs:
+            await p.wait()
+    finally:  # leaving early (Ctrl+C, an error) must not orphan the peers
+        for p in procs:
+            if p.returncode is None:
+                p.terminate()
+                await p.wait()
+        relay.close()
+
+
+async def run_relay(args):
+    relay = RelayServer(seed=args.seed)
+    port = await relay.start(port=args.port)
+    print(f"relay on 127.0.0.1:{port}", flush=True)
+    await asyncio.Event().wait()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Snapshot / lockstep sync with a loopback relay.")
+    parser.add_argument("command", choices=("serve", "demo", "peer"))
+    parser.add_argument("--port", type=int, default=0, help="relay port (default: any free port)")
+    parser.add_argument("--mode", choices=("snapshot", "lockstep"), default="snapshot")
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--extra-enemies", type=int, default=0, help="extra patrolling enemies on random platforms")
+    args = parser.parse_args(argv)
+    if args.command == "serve":
+        args.port = args.port or 8765
+        runner = run_relay
+    else:
+        runner = {"demo": run_demo, "peer": run_peer}[args.command]
+    try:
+        asyncio.run(runner(args))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+    except ConnectionError as exc:
+        sys.exit(f"{args.command}: {exc}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,419 @@
+"""
+Bevo vs. OU — Scenario Profiler
+===============================
+Runs a named scenario headless (dummy video/audio drivers) for a fixed number
+of frames, simulating and rendering exactly as the main loop does, and writes:
+
+  profiles/<scenario>.pstats      cProfile; open with pstats or snakeviz
+  profiles/<scenario>.collapsed   sampled stacks ("a;b;c count" lines) for
+                                  flamegraph.pl, speedscope or inferno
+
+Each scenario is run three times from the same seed and start state: plain, for
+ms/frame; under cProfile; and under a sampling profiler. The sampler is a
+thread that reads the main thread's stack every --interval ms, so it barely
+slows the frame. While it runs, the GIL switch interval is cut so that samples
+are not biased toward calls that release the GIL. The pygame calls that
+dominate a frame (transform.smoothscale, display.flip and co.) get thin
+Python wrappers while sampling, so they show up as frames of their own, e.g.
+  frame;render_frame;present_frame;present_virtual;pygame.transform.smoothscale
+Blits queued by draw_world and the *.queue_draw methods run in
+RenderQueue.flush.
+
+With --pipeline the game draws through the virtual canvas (as main.py
+--pipeline does) and each scenario is also timed pipelined: simulated on
+FramePipeline's thread while the frame before it is presented. That run
+reports the present-to-present interval.
+
+Usage (desktop only, not part of the web build):
+  python profile_scenarios.py zone7
+  python profile_scenarios.py all --frames 1200 --out /tmp/profiles
+  python profile_scenarios.py confetti4k --pipeline
+  python profile_scenarios.py --list
+"""
+import argparse
+import contextlib
+import cProfile
+import io
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+import warnings
+from collections import Counter
+
+DEFAULT_FRAMES = 600
+WARMUP_FRAMES = 60            # caches fill before measuring
+SAMPLE_INTERVAL_MS = 1.0
+SAMPLER_SWITCH_S = 2e-5       # GIL hand-over while sampling (default 5ms)
+TOP_FUNCTIONS = 15
+WRAPPED_CALLS = (
+    ("pygame.transform", ("smoothscale", "scale", "rotate", "rotozoom")),
+    ("pygame.display", ("flip",)),
+)
+
+
+def load_game(pipeline=False):
+    if pipeline:
+        os.environ["BEVO_PIPELINE"] = "1"
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    here = os.path.dirname(os.path.abspath(__file__))
+    os.chdir(here)
+    if here not in sys.path:
+        sys.path.insert(0, here)
+    warnings.simplefilter("ignore")
+    with contextlib.redirect_stdout(io.StringIO()):
+        import main as game
+        game.load_content()
+    return game
+
+
+# ------------------------------
+# Scenarios
+# ------------------------------
+class Scenario:
+    """setup() puts the game in the scenario's start state; inputs() yields
+    (left, right, jump) per frame and may nudge the game to stay on script."""
+
+    name = ""
+    about = ""
+    seed = 0
+    frames = DEFAULT_FRAMES
+    warmup = WARMUP_FRAMES
+
+    def setup(self, game, player):
+        random.seed(self.seed)
+        with contextlib.redirect_stdout(io.StringIO()):
+            game.reset_game(player)
+        player.lives = 99  # a hit must not end the run
+
+    def inputs(self, game, player):
+        while True:
+            yield False, True, False
+
+    def message(self, game):
+        return None
+
+
+class StartArea(Scenario):
+    name = "start"
+    about = "level 1 from the spawn point, running right and hopping"
+
+    def inputs(self, game, player):
+        frame = 0
+        while True:
+            yield False, True, frame % 50 == 0
+            frame += 1
+
+
+class Zone7(Scenario):
+    name = "zone7"
+    about = "the zone 7 gauntlet: dense platforms and awake defenders"
+    span = 6000, 7000  # level 1 world x of zone 7
+
+    def zone(self, game):
+        """Level 1's zone 7 platforms, in level order."""
+        lo, hi = self.span
+        return [p for p in game.PLATFORMS if lo <= p.x < hi]
+
+    def place(self, game, player):
+        p = self.zone(game)[0]
+        player.rect.midbottom = (p.centerx, p.top)
+        player.vx = player.vy = 0
+
+    def setup(self, game, player):
+        super().setup(game, player)
+        self.place(game, player)
+
+    def inputs(self, game, player):
+        rng = random.Random(self.seed)
+        zone = self.zone(game)
+        left_edge = zone[0].left - 200
+        right_edge = max(p.right for p in zone)
+        while True:
+            right = rng.random() < 0.6
+            jump = rng.random() < 0.4
+            for _ in range(rng.randint(6, 40)):
+                # Respawns and the far end would leave the gauntlet: back to its start
+                if not left_edge <= player.rect.x <= right_edge:
+                    self.place(game, player)
+                yield not right, right, jump
+
+
+def set_window(game, size):
+    import pygame
+    if game.screen.get_size() != size:
+        game.screen = pygame.display.set_mode(size)
+
+
+class Confetti(Scenario):
+    name = "confetti"
+    about = "the win screen from the first confetti burst on"
+    frames = 120  # each frame is slow enough already
+    warmup = 5
+
+    def setup(self, game, player):
+        super().setup(game, player)
+        game.flag_reached = True
+        game.spawn_confetti()
+
+    def inputs(self, game, player):
+        while True:
+            yield False, False, False
+
+    def message(self, game):
+        return "🏆 Bevo Wins the Red River Showdown! Tap R to replay"
+
+
+class Present4K(StartArea):
+    name = "4k"
+    about = "the start area drawn to a 3840x2160 window (BEVO_RENDER=virtual: via the canvas)"
+    size = (3840, 2160)
+
+    def setup(self, game, player):
+        set_window(game, self.size)
+        super().setup(game, player)
+
+
+class Confetti4K(Confetti):
+    name = "confetti4k"
+    about = "the win screen's confetti storm in a 3840x2160 window"
+    size = Present4K.size
+
+    def setup(self, game, player):
+        set_window(game, self.size)
+        super().setup(game, player)
+
+
+SCENARIOS = {s.name: s for s in (StartArea(), Zone7(), Confetti(), Present4K(), Confetti4K())}
+
+
+# ------------------------------
+# Running and profiling
+# ------------------------------
+def frame(game, player, controls, msg):
+    game.update_game(player, game.SIM_DT, *next(controls))
+    game.render_frame(player, msg)
+    game.pygame.display.flip()
+
+
+def start(game, player, scenario):
+    """Scenario start state plus warm-up; returns (controls, message) to go on with."""
+    scenario.setup(game, player)
+    controls = scenario.inputs(game, player)
+    msg = scenario.message(game)
+    for _ in range(scenario.warmup):
+        frame(game, player, controls, msg)
+    return controls, msg
+
+
+def measured(game, player, controls, msg, frames, timings=None):
+    """The profiled section: `frames` frames, optionally timed one by one."""
+    clock = time.perf_counter
+    for _ in range(frames):
+        t0 = clock()
+        frame(game, player, controls, msg)
+        if timings is not None:
+            timings.append(clock() - t0)
+
+
+def pipelined(game, player, controls, msg, frames, timings, sides):
+    """measured(), each frame simulated on a FramePipeline thread while the one
+    before it is presented. timings get present-to-present intervals, and
+    sides (simulate, present) the CPU time each thread spent on a frame: on
+    a single core the wall time of either includes waiting for the other."""
+    size = game.screen.get_size()
+    clock, cpu = time.perf_counter, time.thread_time
+    simulated, presented = [], []
+
+    def produce(n):
+        t0 = cpu()
+        game.update_game(player, game.SIM_DT, *next(controls))
+        game.queue_frame(player, msg)
+        snapshot = game.FrameSnapshot(game.rq.snapshot(), tuple(game.button_blits(size)), False, None)
+        simulated.append(cpu() - t0)  # read once the thread is closed
+        return snapshot
+
+    pipeline = game.FramePipeline(produce)
+    last = clock()
+    for n in range(frames + 1):
+        snapshot = pipeline.collect()
+        if n < frames:
+            pipeline.submit(n)
+        if snapshot is not None:
+            t0 = cpu()
+            game.present_snapshot(snapshot)
+            game.pygame.display.flip()
+            presented.append(cpu() - t0)
+            now = clock()
+            timings.append(now - last)
+            last = now
+    pipeline.close()
+    sides.extend((simulated, presented))
+
+
+class StackSampler:
+    """Samples one thread's Python stack every `interval` seconds from a helper
+    thread. Stacks are cut at the `root` function and kept as collapsed
+    "outer;...;inner" strings with counts."""
+
+    def __init__(self, interval, root):
+        self.interval = interval
+        self.root = root
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+
+    @staticmethod
+    def label(code):
+        base = os.path.basename(code.co_filename)
+        if base in ("main.py", "profile_scenarios.py", "<pygame>"):
+            return code.co_qualname
+        return f"{code.co_qualname} ({base})"
+
+    def _run(self, ident):
+        frames = sys._current_frames
+        while not self._stop.wait(self.interval):
+            f = frames().get(ident)
+            names = []
+            while f is not None and f.f_code is not self.root:
+                names.append(self.label(f.f_code))
+                f = f.f_back
+            if f is None or not names:
+                continue  # not inside the profiled section
+            names.reverse()
+            self.stacks[";".join(names)] += 1
+            self.samples += 1
+
+    @contextlib.contextmanager
+    def sampling(self):
+        switch = sys.getswitchinterval()
+        # Let the sampler in promptly when the main thread runs Python code
+        sys.setswitchinterval(SAMPLER_SWITCH_S)
+        thread = threading.Thread(target=self._run, args=(threading.get_ident(),), daemon=True)
+        thread.start()
+        try:
+            yield self
+        finally:
+            self._stop.set()
+            thread.join()
+            sys.setswitchinterval(switch)
+
+    def write(self, path):
+        with open(path, "w") as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write(f"{stack} {count}\n")
+
+    def top_self(self, n):
+        leaves = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        return leaves.most_common(n)
+
+
+def _wrap(module, name):
+    """A Python stand-in for a C function so stack samples name it."""
+    fn = getattr(module, name)
+
+    def wrapper(*args, **kwargs):
+        return fn(*args, **kwargs)
+
+    wrapper.__code__ = wrapper.__code__.replace(
+        co_name=name, co_qualname=f"{module.__name__}.{name}", co_filename="<pygame>")
+    setattr(module, name, wrapper)
+    return fn
+
+
+@contextlib.contextmanager
+def wrapped_calls():
+    import importlib
+    originals = []
+    for modname, names in WRAPPED_CALLS:
+        module = importlib.import_module(modname)
+        for name in names:
+            if hasattr(module, name):
+                originals.append((module, name, _wrap(module, name)))
+    try:
+        yield
+    finally:
+        for module, name, fn in originals:
+            setattr(module, name, fn)
+
+
+def percentiles(timings):
+    ms = sorted(t * 1000 for t in timings)
+    return f"p50 {ms[len(ms) // 2]:.2f}ms p95 {ms[int(len(ms) * 0.95)]:.2f}ms max {ms[-1]:.2f}ms"
+
+
+def profile(game, scenario, frames, out, interval, pipeline=False):
+    player = game.Player()
+    timings = []
+    measured(game, player, *start(game, player, scenario), frames, timings)
+    piped, sides = [], []
+    if pipeline:
+        pipelined(game, player, *start(game, player, scenario), frames, piped, sides)
+
+    prof = cProfile.Profile()
+    run = start(game, player, scenario)
+    prof.enable()
+    measured(game, player, *run, frames)
+    prof.disable()
+    pstats_path = os.path.join(out, f"{scenario.name}.pstats")
+    prof.dump_stats(pstats_path)
+
+    sampler = StackSampler(interval, measured.__code__)
+    run = start(game, player, scenario)
+    with wrapped_calls(), sampler.sampling():
+        measured(game, player, *run, frames)
+    collapsed_path = os.path.join(out, f"{scenario.name}.collapsed")
+    sampler.write(collapsed_path)
+
+    print(f"== {scenario.name}: {scenario.about}")
+    print(f"{frames} frames: {percentiles(timings)} (unprofiled)")
+    if piped:
+        simulated, presented = sides
+        print(f"pipelined: {percentiles(piped)} between presents, "
+              f"{sum(timings) / sum(piped):.2f}x the frame rate")
+        # The threads overlap where the GIL is released (transforms, flip), so
+        # with a core each a frame takes about as long as the slower side
+        print(f"  simulate {sum(simulated) / len(simulated) * 1000:.2f}ms, "
+              f"present {sum(presented) / len(presented) * 1000:.2f}ms CPU a frame on average "
+              f"(two cores: up to {(sum(simulated) + sum(presented)) / max(sum(simulated), sum(presented)):.2f}x)")
+    print(f"wrote {pstats_path} and {collapsed_path} ({sampler.samples} samples)")
+    print("sampled self time:")
+    for name, count in sampler.top_self(TOP_FUNCTIONS):
+        print(f"  {100 * count / max(1, sampler.samples):5.1f}%  {name}")
+    stream = io.StringIO()
+    pstats.Stats(pstats_path, stream=stream).strip_dirs().sort_stats("tottime").print_stats(TOP_FUNCTIONS)
+    print(stream.getvalue().split("\n", 4)[-1].rstrip())
+    print()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profile a headless game scenario.")
+    parser.add_argument("scenario", nargs="?", choices=(*SCENARIOS, "all"), default="all")
+    parser.add_argument("--frames", type=int, help="profiled frames per run (default: the scenario's)")
+    parser.add_argument("--interval", type=float, default=SAMPLE_INTERVAL_MS, help="sampling interval (ms)")
+    parser.add_argument("--out", default="profiles", help="directory for .pstats and .collapsed files")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="also time each scenario with simulation and presenting pipelined")
+    parser.add_argument("--list", action="store_true", help="list the scenarios and exit")
+    args = parser.parse_args(argv)
+    if args.list:
+        for s in SCENARIOS.values():
+            print(f"{s.name:10} {s.about}")
+        return
+    out = os.path.abspath(args.out)
+    game = load_game(args.pipeline)  # changes into the game's directory for its assets
+    os.makedirs(out, exist_ok=True)
+    names = list(SCENARIOS) if args.scenario == "all" else [args.scenario]
+    for name in names:
+        scenario = SCENARIOS[name]
+        profile(game, scenario, args.frames or scenario.frames, out, args.interval / 1000, args.pipeline)
+
+
+if __name__ == "__main__":
+    main()